@@ -1,9 +1,13 @@
-from flask import Flask, render_template, jsonify, request, send_file
+from flask import Flask, render_template, jsonify, request, send_file, send_from_directory
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
+from flask_migrate import Migrate, upgrade
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from werkzeug.local import LocalProxy
 from datetime import datetime, timedelta
 import pytz
 import os
+import threading
+import time
 import io
 import cairosvg
 from reportlab.lib.pagesizes import letter, A4, landscape
@@ -15,21 +19,70 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
-from mesas_config import get_mesas_config, get_layout_config, get_mesas_por_area as get_mesas_config_por_area, get_mesa_config
+from metricas import Metricas
+from compresion import Compresion
+from proveedor_json import instalar_proveedor_json
+from construir_layout import cargar_layout_build, DIRECTORIO_BUILD
+from cache import crear_cache, CachePorEspacio
+from busqueda import registrar_indice_busqueda, buscar
+from huespedes import normalizar_telefono, contadores_liberacion, minutos_estancia
+from estimador_espera import EstimadorEspera, grupo_personas, cubeta_minutos
+from archivo_historial import ArchivoHistorial
+from eventos import RegistroEventos
+from reconciliacion_mesas import reconciliar_mesas, total_cambios
+from asignacion_mesas import AsignadorMesas
+from importacion_reservaciones import leer_csv, leer_xlsx, leer_json, validar_filas
+from franjas_ocupacion import DURACION_RESERVACION, MINUTOS_FRANJA, a_bytes, de_bytes, franjas, ocupacion_por_mesa, libre_exacto
+from sucursales import Sucursales, SesionSucursal
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///restaurant.db'
+# JSON con orjson; las fechas y horas se serializan sin pasar por strftime en to_dict()
+instalar_proveedor_json(app)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///restaurant.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Agregar el encabezado Server-Timing (tiempo total y de SQL) a cada respuesta
+app.config['METRICAS_SERVER_TIMING'] = os.environ.get('METRICAS_SERVER_TIMING') == '1'
+# Cache del servidor: 'redis://host:6379/0' (o REDIS_URL) para compartirlo entre workers, en memoria si no se define.
+# En memoria cada worker invalida solo su copia, así que el TTL por defecto es corto para que los
+# demás workers no sirvan el estado de las mesas viejo por mucho tiempo
+app.config['CACHE_URL'] = os.environ.get('CACHE_URL') or os.environ.get('REDIS_URL')
+app.config['CACHE_TTL'] = int(os.environ.get('CACHE_TTL', 300 if app.config['CACHE_URL'] else 5))  # segundos
+# JSON con las sucursales adicionales (layout, zona horaria y base de datos de cada una)
+app.config['SUCURSALES_ARCHIVO'] = os.environ.get('SUCURSALES_ARCHIVO')
+# Cada cuánto se vuelve a leer el histograma de estancias de la lista de espera (segundos)
+app.config['ESPERA_RECARGA'] = int(os.environ.get('ESPERA_RECARGA', 600))
 
-db = SQLAlchemy(app)
-migrate = Migrate(app, db)
+# Antes de SQLAlchemy: registra la base de cada sucursal como bind con su propio pool
+sucursales = Sucursales(app)
+db = SQLAlchemy(app, session_options={'class_': SesionSucursal})
+# Esquema versionado en migrations/ (flask db upgrade); render_as_batch porque SQLite no altera columnas
+migrate = Migrate(app, db, directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations'),
+                  render_as_batch=True)
+metricas = Metricas(app)
+# Registrada después de Metricas para que comprima antes de que se mida el tamaño de la respuesta
+compresion = Compresion(app)
+# Historial por meses: la tabla guarda los meses recientes y el resto vive en particiones
+archivo_historial = ArchivoHistorial(app, db, espacio=lambda: sucursales.actual.subdirectorio)
+# Las entradas de cada sucursal van en su propio espacio de claves y etiquetas
+cache = CachePorEspacio(crear_cache(
+    app.config['CACHE_URL'],
+    serializar=lambda valor: app.json.dumps(valor),
+    deserializar=lambda valor: app.json.loads(valor)
+), espacio=lambda: sucursales.actual.clave)
+if not app.config['CACHE_URL']:
+    app.logger.warning('Cache en memoria por proceso (TTL %ss): con varios workers define CACHE_URL o REDIS_URL '
+                       'para que las invalidaciones lleguen a todos', app.config['CACHE_TTL'])
 
-# Configurar zona horaria del restaurante (GMT-7)
-RESTAURANT_TIMEZONE = pytz.timezone('America/Phoenix')  # GMT-7 (sin horario de verano)
+# Configuración de mesas (mesas_config) de la sucursal de la petición
+config_mesas = LocalProxy(lambda: sucursales.actual.config)
 
 def get_restaurant_now():
-    """Obtiene la fecha y hora actual en la zona horaria del restaurante"""
-    return datetime.now(RESTAURANT_TIMEZONE)
+    """Obtiene la fecha y hora actual en la zona horaria del restaurante (de la sucursal actual)"""
+    return datetime.now(sucursales.actual.zona_horaria)
+
+def invalidar_cache_reservaciones(*fechas):
+    """Invalida el estado de mesas y las listas de reservaciones de las fechas dadas"""
+    cache.invalidar('mesas', *(f'reservaciones:{fecha}' for fecha in fechas))
 
 class Mesa(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -41,20 +94,100 @@ class Mesa(db.Model):
     posicion_y = db.Column(db.Integer)  # Para posicionamiento en el layout
     grupo_id = db.Column(db.Integer, nullable=True)  # Para agrupar mesas
     fecha = db.Column(db.Date, nullable=True)  # Fecha de ocupación (en GMT-7)
+    activa = db.Column(db.Boolean, nullable=False, default=True, server_default=db.text('1'))  # False si ya no está en mesas_config
+    ocupada_desde = db.Column(db.DateTime, nullable=True)  # UTC, cuando se marcó ocupada (estimación de espera)
+
+    # Un solo registro activo por número (lo mantiene reconciliar_mesas_config)
+    __table_args__ = (
+        db.Index('ux_mesa_numero_activa', 'numero', unique=True, sqlite_where=db.text('activa')),
+    )
+
+    # El grupo se carga con la misma consulta de la mesa (LEFT JOIN), así leer
+    # la capacidad o los miembros del grupo no genera consultas adicionales
+    grupo = db.relationship(
+        'GrupoMesas',
+        primaryjoin='foreign(Mesa.grupo_id) == GrupoMesas.id',
+        lazy='joined',
+        backref=db.backref('mesas', lazy=True)
+    )
 
     @property
     def capacidad_total(self):
-        if self.grupo_id:
-            mesas_grupo = Mesa.query.filter_by(grupo_id=self.grupo_id).all()
-            return sum(mesa.capacidad for mesa in mesas_grupo)
+        if self.grupo:
+            return self.grupo.capacidad_total
         return self.capacidad
 
     @property
     def mesas_grupo(self):
-        if self.grupo_id:
-            return Mesa.query.filter_by(grupo_id=self.grupo_id).all()
+        if self.grupo:
+            return self.grupo.mesas
         return [self]
 
+class GrupoMesas(db.Model):
+    """Grupo de mesas unidas con la lista de miembros y la capacidad total precalculadas"""
+    __tablename__ = 'grupo_mesas'
+    id = db.Column(db.Integer, primary_key=True)
+    ubicacion = db.Column(db.String(50), nullable=False)
+    mesa_principal_id = db.Column(db.Integer, nullable=False)
+    mesas_ids = db.Column(db.String(200), nullable=False, default='')  # IDs separados por coma
+    mesas_numeros = db.Column(db.String(200), nullable=False, default='')  # Números separados por coma
+    capacidad_total = db.Column(db.Integer, nullable=False, default=0)
+    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def recalcular(self, mesas):
+        """Actualiza los miembros y la capacidad cacheados a partir de las mesas del grupo"""
+        mesas = sorted(mesas, key=lambda mesa: mesa.numero)
+        self.mesas_ids = ','.join(str(mesa.id) for mesa in mesas)
+        self.mesas_numeros = ','.join(str(mesa.numero) for mesa in mesas)
+        self.capacidad_total = sum(mesa.capacidad for mesa in mesas)
+
+    @property
+    def lista_ids(self):
+        return [int(mesa_id) for mesa_id in self.mesas_ids.split(',') if mesa_id]
+
+    @property
+    def lista_numeros(self):
+        return [int(numero) for numero in self.mesas_numeros.split(',') if numero]
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'ubicacion': self.ubicacion,
+            'mesa_principal_id': self.mesa_principal_id,
+            'mesas_ids': self.lista_ids,
+            'mesas_numeros': self.lista_numeros,
+            'capacidad_total': self.capacidad_total
+        }
+
+class Huesped(db.Model):
+    """Perfil de cliente identificado por su teléfono normalizado. Los contadores se
+    actualizan al crear y liberar reservaciones, sin recorrer el historial"""
+    id = db.Column(db.Integer, primary_key=True)
+    telefono = db.Column(db.String(20), nullable=False, unique=True)  # Solo dígitos (ver normalizar_telefono)
+    nombre = db.Column(db.String(100), nullable=False)  # Último nombre con el que reservó
+    reservaciones = db.Column(db.Integer, nullable=False, default=0)  # Reservaciones creadas
+    visitas = db.Column(db.Integer, nullable=False, default=0)  # Liberadas manualmente (el cliente asistió)
+    no_presentados = db.Column(db.Integer, nullable=False, default=0)  # Liberadas automáticamente por fecha pasada
+    total_personas = db.Column(db.Integer, nullable=False, default=0)  # Personas sumadas de las visitas
+    minutos_estancia = db.Column(db.Integer, nullable=False, default=0)  # Suma de estancias con hora de salida
+    estancias_medidas = db.Column(db.Integer, nullable=False, default=0)
+    ultima_visita = db.Column(db.Date, nullable=True)
+    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'telefono': self.telefono,
+            'nombre': self.nombre,
+            'reservaciones': self.reservaciones,
+            'visitas': self.visitas,
+            'no_presentados': self.no_presentados,
+            'total_personas': self.total_personas,
+            'promedio_personas': round(self.total_personas / self.visitas, 1) if self.visitas else 0,
+            'promedio_estancia': round(self.minutos_estancia / self.estancias_medidas) if self.estancias_medidas else 0,
+            'ultima_visita': self.ultima_visita
+        }
+
 class Reservacion(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     mesa_id = db.Column(db.Integer, db.ForeignKey('mesa.id'), nullable=False)
@@ -66,23 +199,40 @@ class Reservacion(db.Model):
     nota = db.Column(db.Text, nullable=True)  # Nuevo campo
     fecha_reservacion = db.Column(db.Date, nullable=False)
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+    huesped_id = db.Column(db.Integer, db.ForeignKey('huesped.id'), nullable=True, index=True)
+    # Mesas vecinas que se unen a mesa_id para grupos grandes (IDs separados por coma)
+    mesas_unidas = db.Column(db.String(200), nullable=False, default='', server_default='')
     
     # Relación con la mesa
     mesa = db.relationship('Mesa', backref=db.backref('reservaciones', lazy=True))
     
+    # Las consultas por día (listas, vista del día, limpieza) filtran por fecha y agrupan por mesa
+    __table_args__ = (db.Index('ix_reservacion_fecha_mesa', 'fecha_reservacion', 'mesa_id'),)
+    
+    @property
+    def lista_mesas_unidas(self):
+        return [int(mesa_id) for mesa_id in (self.mesas_unidas or '').split(',') if mesa_id]
+    
+    @property
+    def mesas_ids(self):
+        """Mesa principal y mesas unidas"""
+        return [self.mesa_id] + self.lista_mesas_unidas
+    
     def to_dict(self):
         return {
             'id': self.id,
             'mesa_id': self.mesa_id,
             'mesa_numero': self.mesa.numero if self.mesa else None,
-            'hora_reservacion': self.hora_reservacion.strftime('%H:%M') if self.hora_reservacion else None,
+            'hora_reservacion': self.hora_reservacion,
             'area': self.area,
             'cantidad_personas': self.cantidad_personas,
             'nombre_reservador': self.nombre_reservador,
             'telefono': self.telefono,
             'nota': self.nota,
-            'fecha_reservacion': self.fecha_reservacion.strftime('%Y-%m-%d') if self.fecha_reservacion else None,
-            'fecha_creacion': self.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S') if self.fecha_creacion else None
+            'fecha_reservacion': self.fecha_reservacion,
+            'fecha_creacion': self.fecha_creacion,
+            'huesped_id': self.huesped_id,
+            'mesas_unidas': self.lista_mesas_unidas
         }
 
 class HistorialReservacion(db.Model):
@@ -102,6 +252,11 @@ class HistorialReservacion(db.Model):
     fecha_liberacion = db.Column(db.DateTime, default=datetime.utcnow)
     hora_liberacion = db.Column(db.Time, nullable=True)  # Hora exacta de liberación
     motivo_liberacion = db.Column(db.String(200), default='Liberada por el usuario')
+    huesped_id = db.Column(db.Integer, db.ForeignKey('huesped.id'), nullable=True, index=True)
+    
+    # Los ids archivados en las particiones (y en el índice de búsqueda) no se vuelven a
+    # usar aunque ya no estén en la tabla: AUTOINCREMENT en lugar del max(id) + 1 de SQLite
+    __table_args__ = {'sqlite_autoincrement': True}
     
     def to_dict(self):
         return {
@@ -109,47 +264,328 @@ class HistorialReservacion(db.Model):
             'reservacion_id_original': self.reservacion_id_original,
             'mesa_id': self.mesa_id,
             'mesa_numero': self.mesa_numero,
-            'hora_reservacion': self.hora_reservacion.strftime('%H:%M') if self.hora_reservacion else None,
+            'hora_reservacion': self.hora_reservacion,
             'area': self.area,
             'cantidad_personas': self.cantidad_personas,
             'nombre_reservador': self.nombre_reservador,
             'telefono': self.telefono,
             'nota': self.nota,
-            'fecha_reservacion': self.fecha_reservacion.strftime('%Y-%m-%d') if self.fecha_reservacion else None,
-            'fecha_creacion_original': self.fecha_creacion_original.strftime('%Y-%m-%d %H:%M:%S') if self.fecha_creacion_original else None,
-            'fecha_liberacion': self.fecha_liberacion.strftime('%Y-%m-%d %H:%M:%S') if self.fecha_liberacion else None,
-            'hora_liberacion': self.hora_liberacion.strftime('%H:%M') if self.hora_liberacion else None,
-            'motivo_liberacion': self.motivo_liberacion
+            'fecha_reservacion': self.fecha_reservacion,
+            'fecha_creacion_original': self.fecha_creacion_original,
+            'fecha_liberacion': self.fecha_liberacion,
+            'hora_liberacion': self.hora_liberacion,
+            'motivo_liberacion': self.motivo_liberacion,
+            'huesped_id': self.huesped_id
         }
 
+class ListaEspera(db.Model):
+    """Grupos sin reservación esperando mesa. La cola se atiende por prioridad y hora de llegada"""
+    __tablename__ = 'lista_espera'
+    id = db.Column(db.Integer, primary_key=True)
+    nombre = db.Column(db.String(100), nullable=False)
+    telefono = db.Column(db.String(20), nullable=True)
+    cantidad_personas = db.Column(db.Integer, nullable=False)
+    area = db.Column(db.String(50), nullable=True)  # Área preferida; None = cualquiera
+    prioridad = db.Column(db.Integer, nullable=False, default=0)  # Mayor prioridad se atiende primero
+    nota = db.Column(db.Text, nullable=True)
+    estado = db.Column(db.String(20), nullable=False, default='esperando', index=True)  # esperando, sentado, cancelado
+    hora_llegada = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # UTC
+    hora_asignacion = db.Column(db.DateTime, nullable=True)  # UTC, cuando se le asignó mesa
+    hora_salida = db.Column(db.DateTime, nullable=True)  # UTC, cuando se liberó su mesa
+    mesa_id = db.Column(db.Integer, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'nombre': self.nombre,
+            'telefono': self.telefono,
+            'cantidad_personas': self.cantidad_personas,
+            'area': self.area,
+            'prioridad': self.prioridad,
+            'nota': self.nota,
+            'estado': self.estado,
+            'hora_llegada': self.hora_llegada,
+            'hora_asignacion': self.hora_asignacion,
+            'mesa_id': self.mesa_id
+        }
+
+class EstanciaCubeta(db.Model):
+    """Histograma de duración de las visitas por área y tamaño de grupo (ver estimador_espera.py)"""
+    __tablename__ = 'estancia_cubeta'
+    area = db.Column(db.String(50), primary_key=True)
+    grupo = db.Column(db.Integer, primary_key=True)  # grupo_personas(): 2, 4, 6 u 8
+    cubeta = db.Column(db.Integer, primary_key=True)  # minutos // 15
+    cantidad = db.Column(db.Integer, nullable=False, default=0)
+
+class OcupacionMesa(db.Model):
+    """Franjas de 15 minutos ocupadas por las reservaciones de una mesa en una fecha (ver
+    franjas_ocupacion.py). Las mantiene actualizar_ocupacion(); sin fila = mesa libre todo el día"""
+    __tablename__ = 'ocupacion_mesa'
+    fecha = db.Column(db.Date, primary_key=True)
+    mesa_id = db.Column(db.Integer, db.ForeignKey('mesa.id'), primary_key=True)
+    franjas = db.Column(db.LargeBinary(12), nullable=False)
+
+def registrar_reservacion_huesped(reservacion):
+    """Asocia la reservación al huésped de su teléfono (creándolo si es nuevo) y cuenta la
+    reservación. La búsqueda es por el índice único del teléfono normalizado"""
+    telefono = normalizar_telefono(reservacion.telefono)
+    if telefono is None:
+        return None
+    huesped = Huesped.query.filter_by(telefono=telefono).first()
+    if huesped is None:
+        huesped = Huesped(telefono=telefono, nombre=reservacion.nombre_reservador, reservaciones=0)
+        db.session.add(huesped)
+        db.session.flush()
+    huesped.nombre = reservacion.nombre_reservador
+    # Incrementos en SQL para no perder conteos con peticiones concurrentes
+    huesped.reservaciones = Huesped.reservaciones + 1
+    reservacion.huesped_id = huesped.id
+    return huesped
+
+def registrar_huespedes_en_lote(reservaciones):
+    """registrar_reservacion_huesped() para muchas reservaciones (dicts) con un UPSERT por
+    teléfono: el conteo de cada huésped sube una vez con el total del lote.
+    Retorna {teléfono normalizado: huesped_id}"""
+    por_telefono = {}
+    for reservacion in reservaciones:
+        telefono = normalizar_telefono(reservacion['telefono'])
+        if telefono is not None:
+            nombre, cantidad = por_telefono.get(telefono, (None, 0))
+            por_telefono[telefono] = (reservacion['nombre_reservador'], cantidad + 1)
+    if not por_telefono:
+        return {}
+    sentencia = sqlite_insert(Huesped).values([
+        {'telefono': telefono, 'nombre': nombre, 'reservaciones': cantidad}
+        for telefono, (nombre, cantidad) in por_telefono.items()
+    ])
+    db.session.execute(sentencia.on_conflict_do_update(
+        index_elements=['telefono'],
+        set_={'nombre': sentencia.excluded.nombre,
+              'reservaciones': Huesped.reservaciones + sentencia.excluded.reservaciones}
+    ))
+    return dict(db.session.query(Huesped.telefono, Huesped.id).filter(Huesped.telefono.in_(list(por_telefono))).all())
+
+def registrar_liberacion_huesped(historial):
+    """Suma la visita (o el no presentado) del registro de historial a su huésped"""
+    if historial.huesped_id is None:
+        return
+    contadores = contadores_liberacion(
+        historial.cantidad_personas, historial.hora_reservacion,
+        historial.hora_liberacion, historial.motivo_liberacion
+    )
+    valores = {campo: getattr(Huesped, campo) + incremento for campo, incremento in contadores.items()}
+    if 'visitas' in contadores:
+        valores['ultima_visita'] = db.func.max(db.func.coalesce(Huesped.ultima_visita, historial.fecha_reservacion), historial.fecha_reservacion)
+    db.session.execute(db.update(Huesped).where(Huesped.id == historial.huesped_id).values(**valores))
+
+def registrar_liberaciones_huespedes(liberaciones, fecha):
+    """registrar_liberacion_huesped() para muchas reservaciones de una fecha: los contadores se
+    suman por huésped y se aplican con un solo UPDATE (executemany). `liberaciones` son
+    (huesped_id, cantidad_personas, hora_reservacion, hora_liberacion, motivo)"""
+    campos = ('visitas', 'no_presentados', 'total_personas', 'minutos_estancia', 'estancias_medidas')
+    por_huesped = {}
+    for huesped_id, personas, hora_reservacion, hora_liberacion, motivo in liberaciones:
+        if huesped_id is None:
+            continue
+        totales = por_huesped.setdefault(huesped_id, dict.fromkeys(campos, 0))
+        for campo, incremento in contadores_liberacion(personas, hora_reservacion, hora_liberacion, motivo).items():
+            totales[campo] += incremento
+    if not por_huesped:
+        return
+    tabla = Huesped.__table__
+    valores = {campo: tabla.c[campo] + db.bindparam(f'p_{campo}') for campo in campos}
+    valores['ultima_visita'] = db.case(
+        (db.bindparam('p_visitas') > 0, db.func.max(db.func.coalesce(tabla.c.ultima_visita, fecha), fecha)),
+        else_=tabla.c.ultima_visita
+    )
+    db.session.execute(
+        db.update(tabla).where(tabla.c.id == db.bindparam('p_id')).values(**valores),
+        [{'p_id': huesped_id, **{f'p_{campo}': valor for campo, valor in totales.items()}}
+         for huesped_id, totales in por_huesped.items()]
+    )
+
+_estimadores = {}
+
+def estimador_espera():
+    """Estimador de la sucursal actual; se carga del histograma guardado y se recarga cada
+    ESPERA_RECARGA segundos para incluir las visitas registradas por otros procesos"""
+    clave = sucursales.actual.clave
+    estimador, cargado = _estimadores.get(clave, (None, 0))
+    if estimador is None or time.monotonic() - cargado > app.config['ESPERA_RECARGA']:
+        estimador = EstimadorEspera(db.session.query(
+            EstanciaCubeta.area, EstanciaCubeta.grupo, EstanciaCubeta.cubeta, EstanciaCubeta.cantidad
+        ).all())
+        _estimadores[clave] = (estimador, time.monotonic())
+    return estimador
+
+def registrar_estancia(area, personas, minutos):
+    """Suma una visita terminada al histograma (un UPSERT) y al estimador en memoria"""
+    registrar_estancias([(area, personas, minutos)])
+
+def registrar_estancias(visitas):
+    """registrar_estancia() para varias visitas (área, personas, minutos): las que caen en la
+    misma cubeta se suman antes y todas se guardan con un solo UPSERT"""
+    visitas = [visita for visita in visitas if visita[2] is not None]
+    if not visitas:
+        return
+    cubetas = {}
+    for area, personas, minutos in visitas:
+        clave = (area, grupo_personas(personas), cubeta_minutos(minutos))
+        cubetas[clave] = cubetas.get(clave, 0) + 1
+    sentencia = sqlite_insert(EstanciaCubeta).values([
+        {'area': area, 'grupo': grupo, 'cubeta': cubeta, 'cantidad': cantidad}
+        for (area, grupo, cubeta), cantidad in cubetas.items()
+    ])
+    db.session.execute(sentencia.on_conflict_do_update(
+        index_elements=['area', 'grupo', 'cubeta'],
+        set_={'cantidad': EstanciaCubeta.cantidad + sentencia.excluded.cantidad}
+    ))
+    # Si la transacción se revierte, el estimador queda con visitas de más hasta la siguiente recarga
+    estimador = estimador_espera()
+    for area, personas, minutos in visitas:
+        estimador.registrar(area, personas, minutos)
+
+def registrar_salida_espera(mesa):
+    """Al liberar una mesa, cierra la visita del grupo de la lista de espera sentado en ella"""
+    grupo = ListaEspera.query.filter_by(mesa_id=mesa.id, estado='sentado', hora_salida=None).order_by(
+        ListaEspera.hora_asignacion.desc()
+    ).first()
+    if grupo is None:
+        return
+    grupo.hora_salida = datetime.utcnow()
+    registrar_estancia(mesa.ubicacion, grupo.cantidad_personas,
+                       int((grupo.hora_salida - grupo.hora_asignacion).total_seconds() // 60) or None)
+
+def reconciliar_mesas_config(simular=False):
+    """Sincroniza la tabla Mesa con mesas_config (ver reconciliacion_mesas.py). Retorna los cambios"""
+    cambios = reconciliar_mesas(db.session, Mesa, config_mesas.get_mesas_config(), simular=simular)
+    if total_cambios(cambios) and not simular:
+        cache.invalidar('mesas', 'reservaciones')
+    return cambios
+
+# Índice FTS5 de nombre, teléfono y nota; se crea con db.create_all() y lo mantienen triggers
+registrar_indice_busqueda(db.metadata)
+
+# Cada cambio confirmado de estado de mesa o de reservaciones se agrega a instance/eventos.db
+registro_eventos = RegistroEventos(app, db, {
+    'Mesa': Mesa,
+    'Reservacion': Reservacion,
+    'HistorialReservacion': HistorialReservacion
+}, espacio=lambda: sucursales.actual.subdirectorio)
+
+# Layout precompilado por construir_layout.py (None si falta o no corresponde a mesas_config.py)
+LAYOUT_BUILD = cargar_layout_build()
+if LAYOUT_BUILD is None:
+    app.logger.warning('static/build no tiene el layout vigente; ejecuta construir_layout.py')
+
 @app.route('/')
 def home():
-    mesas = Mesa.query.all()
-    return render_template('index.html', mesas=mesas)
+    """Página principal con el layout de las mesas incrustado, sin consultar la BD"""
+    if LAYOUT_BUILD is not None and sucursales.actual.principal:
+        layout_json = LAYOUT_BUILD[1]
+    else:
+        layout_json = app.json.dumps(config_mesas.get_layout_compacto())
+    return render_template('index.html', layout_json=layout_json)
+
+@app.route('/build/<path:nombre>')
+def archivo_build(nombre):
+    """Archivos generados por construir_layout.py; el nombre incluye la huella, así que no caducan"""
+    response = send_from_directory(DIRECTORIO_BUILD, nombre, max_age=31536000)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+@app.route('/sw.js')
+def service_worker():
+    """Service worker servido desde la raíz para que su alcance cubra toda la aplicación"""
+    response = send_from_directory(app.static_folder, 'sw.js', max_age=0)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/reservaciones-futuras')
 def reservaciones_futuras():
     return render_template('reservaciones_futuras.html')
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Métricas de latencia, consultas SQL y tamaño de respuesta en formato Prometheus"""
+    return metricas.respuesta_prometheus()
+
 @app.route('/api/fecha-actual', methods=['GET'])
 def get_fecha_actual():
     """Obtiene la fecha actual en la zona horaria del restaurante"""
     fecha_actual = get_restaurant_now().date()
     return jsonify({
         'fecha': fecha_actual.strftime('%Y-%m-%d'),
-        'zona_horaria': 'America/Phoenix (GMT-7)'
+        'zona_horaria': sucursales.actual.zona_horaria.zone
+    })
+
+@app.route('/api/reloj', methods=['GET'])
+def get_reloj():
+    """Sincronización del reloj: hora del servidor y zona horaria del restaurante.
+    El cliente calcula la fecha localmente a partir de aquí (ver static/js/reloj.js)"""
+    ahora = get_restaurant_now()
+    return jsonify({
+        'epoch_ms': int(ahora.timestamp() * 1000),
+        'fecha': ahora.strftime('%Y-%m-%d'),
+        'hora': ahora.strftime('%H:%M:%S'),
+        'offset_minutos': int(ahora.utcoffset().total_seconds() // 60),
+        'zona_horaria': sucursales.actual.zona_horaria.zone
     })
 
+@app.route('/api/sucursales', methods=['GET'])
+def get_sucursales():
+    """Sucursales configuradas y la sucursal de esta petición"""
+    return jsonify({
+        'actual': sucursales.actual.clave,
+        'sucursales': [sucursal.to_dict() for sucursal in sucursales.por_clave.values()]
+    })
+
+@app.after_request
+def agregar_hora_servidor(response):
+    """Hora del servidor en milisegundos para que los clientes corrijan la deriva de su reloj"""
+    response.headers['Server-Time'] = str(int(time.time() * 1000))
+    return response
+
+_mesas_reconciliadas = set()
+_reconciliando = threading.Lock()
+
+@app.before_request
+def reconciliar_mesas_al_iniciar():
+    """La primera petición de cada proceso (por sucursal) sincroniza las mesas con
+    mesas_config, así la combinación de configuración y estado puede suponer que existen todas.
+    Si falla, la sucursal no queda marcada: se responde 503 y la siguiente petición lo reintenta"""
+    clave = sucursales.actual.clave
+    if clave in _mesas_reconciliadas or request.endpoint == 'static':
+        return
+    with _reconciliando:
+        if clave in _mesas_reconciliadas:
+            return
+        try:
+            cambios = reconciliar_mesas_config()
+            if total_cambios(cambios):
+                app.logger.info(f"Mesas reconciliadas con mesas_config: {', '.join(f'{len(filas)} {accion}' for accion, filas in cambios.items())}")
+        except Exception:
+            db.session.rollback()
+            app.logger.exception('No se pudieron reconciliar las mesas con mesas_config')
+            return jsonify({'error': 'No se pudieron sincronizar las mesas con la configuración, intenta de nuevo'}), 503
+        _mesas_reconciliadas.add(clave)
+
 @app.route('/api/mesas', methods=['GET'])
 def get_mesas():
-    """API optimizada que combina configuración estática con estados dinámicos de BD"""
-    fecha_actual = get_restaurant_now().date()
+    """API optimizada que combina configuración estática con estados dinámicos de BD.
+    Con ?formato=compacto retorna solo los arreglos de estado (ver get_mesas_compacto)"""
+    if request.args.get('formato') == 'compacto':
+        return get_mesas_compacto()
+    
+    mesas_data = cache.get('mesas:todas')
+    if mesas_data is not None:
+        return jsonify(mesas_data)
     
     # Obtener configuración estática de todas las mesas
-    mesas_config = get_mesas_config()
+    mesas_config = config_mesas.get_mesas_config()
     
-    # Obtener estados dinámicos de la base de datos (una sola consulta)
-    mesas_db = Mesa.query.all()
+    # Obtener estados dinámicos de la base de datos (una sola consulta, grupos incluidos)
+    mesas_db = Mesa.query.filter_by(activa=True).all()
     
     # Crear diccionario de estados por número de mesa para acceso rápido
     estados_mesas = {}
@@ -158,7 +594,8 @@ def get_mesas():
             'id': mesa_db.id,
             'estado': mesa_db.estado,
             'grupo_id': mesa_db.grupo_id,
-            'fecha': mesa_db.fecha.strftime('%Y-%m-%d') if mesa_db.fecha else None
+            'fecha': mesa_db.fecha.strftime('%Y-%m-%d') if mesa_db.fecha else None,
+            'mesas_grupo': mesa_db.grupo.lista_numeros if mesa_db.grupo else None
         }
     
     # Combinar configuración estática con estados dinámicos
@@ -166,12 +603,7 @@ def get_mesas():
     for area, mesas_area in mesas_config.items():
         for mesa_config in mesas_area:
             numero = mesa_config['numero']
-            estado_mesa = estados_mesas.get(numero, {
-                'id': None,
-                'estado': 'disponible',
-                'grupo_id': None,
-                'fecha': None
-            })
+            estado_mesa = estados_mesas[numero]
             
             mesa_data = {
                 'id': estado_mesa['id'],
@@ -183,20 +615,68 @@ def get_mesas():
                 'posicion_y': mesa_config['posicion_y'],
                 'grupo_id': estado_mesa['grupo_id'],
                 'fecha': estado_mesa['fecha'],
-                'mesas_grupo': None,  # Se calcula dinámicamente si es necesario
+                'mesas_grupo': estado_mesa['mesas_grupo'],  # Números de las mesas del grupo (precalculados)
                 'reservaciones': []  # Se carga por separado si es necesario
             }
             
             mesas_data.append(mesa_data)
     
+    cache.set('mesas:todas', mesas_data, ttl=app.config['CACHE_TTL'], tags=('mesas',))
     return jsonify(mesas_data)
 
+def get_mesas_compacto():
+    """Formato columnar: arreglos paralelos de estado, grupo y fecha en el orden del
+    layout identificado por 'layout', que se descarga una sola vez desde /api/mesas/layout/<huella>"""
+    datos = cache.get('mesas:compacto')
+    if datos is None:
+        layout = config_mesas.get_layout_compacto()
+        estados_mesas = {
+            numero: (mesa_id, estado, grupo_id, fecha)
+            for numero, mesa_id, estado, grupo_id, fecha in db.session.query(
+                Mesa.numero, Mesa.id, Mesa.estado, Mesa.grupo_id, Mesa.fecha
+            ).filter(Mesa.activa)
+        }
+        
+        datos = {'layout': layout['huella'], 'ids': [], 'estados': [], 'grupos': [], 'fechas': []}
+        for numero in layout['numeros']:
+            mesa_id, estado, grupo_id, fecha = estados_mesas[numero]
+            datos['ids'].append(mesa_id)
+            datos['estados'].append(estado)
+            datos['grupos'].append(grupo_id)
+            datos['fechas'].append(fecha.strftime('%Y-%m-%d') if fecha else None)
+        
+        cache.set('mesas:compacto', datos, ttl=app.config['CACHE_TTL'], tags=('mesas',))
+    return jsonify(datos)
+
+@app.route('/api/mesas/layout/<huella>', methods=['GET'])
+def get_mesas_layout(huella):
+    """Layout estático de las mesas; la huella cambia con la configuración, así que se cachea indefinidamente"""
+    layout = config_mesas.get_layout_compacto()
+    if huella != layout['huella']:
+        return jsonify({'error': 'Layout no encontrado', 'layout': layout['huella']}), 404
+    
+    response = jsonify(layout)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
 @app.route('/api/mesas/<int:mesa_id>', methods=['PUT'])
 def actualizar_estado_mesa(mesa_id):
     mesa = db.session.get(Mesa, mesa_id)
+    if not mesa:
+        return jsonify({'error': 'Mesa no encontrada'}), 404
     data = request.get_json()
     
+    # Los cambios hechos sin conexión (static/sw.js) indican el estado que vio la tableta;
+    # si la mesa cambió desde entonces en otro dispositivo, el cambio se rechaza
+    if 'estado_anterior' in data and data['estado_anterior'] != mesa.estado:
+        return jsonify({
+            'error': 'La mesa cambió de estado en otro dispositivo',
+            'estado_actual': mesa.estado
+        }), 409
+    
     if 'estado' in data:
+        if data['estado'] == 'ocupada' and mesa.estado != 'ocupada':
+            mesa.ocupada_desde = datetime.utcnow()
         mesa.estado = data['estado']
         # Si la mesa se marca como ocupada, asignar la fecha enviada o la fecha actual en GMT-7
         if data['estado'] == 'ocupada':
@@ -207,53 +687,88 @@ def actualizar_estado_mesa(mesa_id):
         # Si la mesa se marca como disponible, limpiar la fecha
         elif data['estado'] == 'disponible':
             mesa.fecha = None
+            mesa.ocupada_desde = None
+            registrar_salida_espera(mesa)
     
-    if 'grupo_id' in data:
+    if 'grupo_id' in data and data['grupo_id'] != mesa.grupo_id:
+        if data['grupo_id'] and not db.session.get(GrupoMesas, data['grupo_id']):
+            return jsonify({'error': 'Grupo no encontrado'}), 404
+        grupo_anterior_id = mesa.grupo_id
         mesa.grupo_id = data['grupo_id']
+        db.session.flush()
+        # Mantener sincronizado el cache de los grupos afectados
+        for grupo_id in (grupo_anterior_id, mesa.grupo_id):
+            if grupo_id:
+                recalcular_grupo(grupo_id)
     
     db.session.commit()
+    cache.invalidar('mesas')
     return jsonify({'mensaje': 'Estado actualizado correctamente'})
 
 @app.route('/api/mesas/grupo', methods=['POST'])
 def unir_mesas():
+    """Une N mesas en un grupo. Acepta 'mesas_ids' (la primera es la principal)
+    o el par 'mesa_principal_id'/'mesa_secundaria_id'"""
     data = request.get_json()
-    mesa_principal_id = data.get('mesa_principal_id')
-    mesa_secundaria_id = data.get('mesa_secundaria_id')
+    mesas_ids = data.get('mesas_ids')
+    if not mesas_ids:
+        mesas_ids = [data.get('mesa_principal_id'), data.get('mesa_secundaria_id')]
     
-    mesa_principal = Mesa.query.get_or_404(mesa_principal_id)
-    mesa_secundaria = Mesa.query.get_or_404(mesa_secundaria_id)
+    # Eliminar duplicados conservando el orden (la primera mesa es la principal)
+    mesas_ids = list(dict.fromkeys(mesas_ids))
+    if len(mesas_ids) < 2 or None in mesas_ids:
+        return jsonify({'error': 'Se requieren al menos dos mesas para unir'}), 400
+    
+    # Obtener todas las mesas en una sola consulta
+    mesas_por_id = {mesa.id: mesa for mesa in Mesa.query.filter(Mesa.id.in_(mesas_ids)).all()}
+    if len(mesas_por_id) != len(mesas_ids):
+        return jsonify({'error': 'Mesa no encontrada'}), 404
+    mesas = [mesas_por_id[mesa_id] for mesa_id in mesas_ids]
+    mesa_principal = mesas[0]
     
     # Verificar que las mesas estén en la misma ubicación
-    if mesa_principal.ubicacion != mesa_secundaria.ubicacion:
+    if any(mesa.ubicacion != mesa_principal.ubicacion for mesa in mesas):
         return jsonify({'error': 'Las mesas deben estar en la misma ubicación'}), 400
     
-    # Si la mesa secundaria ya está en un grupo, no permitir la unión
-    if mesa_secundaria.grupo_id and mesa_secundaria.grupo_id != mesa_principal_id:
-        return jsonify({'error': 'La mesa secundaria ya pertenece a otro grupo'}), 400
+    # Si la mesa principal ya está en un grupo, las demás se agregan a ese grupo
+    grupo = mesa_principal.grupo
+    
+    # Si alguna mesa secundaria ya está en otro grupo, no permitir la unión
+    for mesa in mesas[1:]:
+        if mesa.grupo_id and (grupo is None or mesa.grupo_id != grupo.id):
+            return jsonify({'error': f'La mesa {mesa.numero} ya pertenece a otro grupo'}), 400
     
-    # Si la mesa principal ya está en un grupo, usar ese grupo_id
-    # Si no, crear un nuevo grupo_id usando el ID de la mesa principal
-    grupo_id = mesa_principal.grupo_id or mesa_principal.id
+    if grupo is None:
+        grupo = GrupoMesas(ubicacion=mesa_principal.ubicacion, mesa_principal_id=mesa_principal.id)
+        db.session.add(grupo)
     
     # Unir las mesas
-    mesa_principal.grupo_id = grupo_id
-    mesa_secundaria.grupo_id = grupo_id
+    for mesa in mesas:
+        mesa.grupo = grupo
     
-    # Si la mesa principal está ocupada, la secundaria adopta ese estado y fecha
+    # Si la mesa principal está ocupada, las demás adoptan ese estado y fecha.
+    # Si no, las mesas disponibles adoptan el estado de la primera mesa ocupada
     if mesa_principal.estado == 'ocupada':
-        mesa_secundaria.estado = mesa_principal.estado
-        mesa_secundaria.fecha = mesa_principal.fecha
-    # Si la mesa secundaria está ocupada y la principal no, la principal adopta ese estado y fecha
-    elif mesa_secundaria.estado == 'ocupada' and mesa_principal.estado == 'disponible':
-        mesa_principal.estado = mesa_secundaria.estado
-        mesa_principal.fecha = mesa_secundaria.fecha
+        referencia = mesa_principal
+    else:
+        referencia = next((mesa for mesa in mesas[1:] if mesa.estado == 'ocupada'), None)
+    if referencia:
+        for mesa in mesas:
+            if mesa is not referencia and (referencia is mesa_principal or mesa.estado == 'disponible'):
+                mesa.estado = referencia.estado
+                mesa.fecha = referencia.fecha
+    
+    # Recalcular miembros y capacidad cacheados del grupo
+    grupo.recalcular(grupo.mesas)
     
     db.session.commit()
+    cache.invalidar('mesas')
     
     return jsonify({
         'mensaje': 'Mesas unidas correctamente',
-        'grupo_id': grupo_id,
-        'capacidad_total': mesa_principal.capacidad_total
+        'grupo_id': grupo.id,
+        'mesas_numeros': grupo.lista_numeros,
+        'capacidad_total': grupo.capacidad_total
     })
 
 @app.route('/api/mesas/grupo/<int:mesa_id>', methods=['DELETE'])
@@ -263,24 +778,44 @@ def separar_mesas(mesa_id):
     if not mesa.grupo_id:
         return jsonify({'error': 'La mesa no está en un grupo'}), 400
     
-    # Obtener todas las mesas del grupo
-    mesas_grupo = Mesa.query.filter_by(grupo_id=mesa.grupo_id).all()
+    grupo_id = mesa.grupo_id
     
-    # Separar todas las mesas del grupo
-    for mesa_grupo in mesas_grupo:
-        mesa_grupo.grupo_id = None
-        # Mantener el estado y fecha actuales al separar
+    # Separar todas las mesas del grupo en una sola sentencia
+    # (se mantienen el estado y fecha actuales al separar)
+    separadas = db.session.execute(
+        db.update(Mesa).where(Mesa.grupo_id == grupo_id).values(grupo_id=None)
+        .returning(Mesa.id, Mesa.estado, Mesa.fecha)
+        .execution_options(synchronize_session=False)
+    ).all()
+    registro_eventos.registrar_mesas(db.session, separadas, grupo_id=None, anterior={'grupo_id': grupo_id})
+    GrupoMesas.query.filter_by(id=grupo_id).delete(synchronize_session=False)
     
     db.session.commit()
+    cache.invalidar('mesas')
     return jsonify({'mensaje': 'Grupo separado correctamente'})
 
+def recalcular_grupo(grupo_id):
+    """Recalcula el cache de un grupo tras un cambio de miembros; lo elimina si queda con menos de dos mesas"""
+    grupo = db.session.get(GrupoMesas, grupo_id)
+    if not grupo:
+        return
+    mesas = Mesa.query.filter_by(grupo_id=grupo_id).all()
+    if len(mesas) < 2:
+        for mesa in mesas:
+            mesa.grupo_id = None
+        db.session.delete(grupo)
+    else:
+        grupo.recalcular(mesas)
+
 @app.route('/api/mesas/area/<area>', methods=['GET'])
 def get_mesas_por_area(area):
     """API optimizada para obtener mesas por área usando configuración estática"""
-    fecha_actual = get_restaurant_now().date()
+    mesas_data = cache.get(f'mesas:area:{area}')
+    if mesas_data is not None:
+        return jsonify(mesas_data)
     
     # Obtener configuración estática para el área
-    mesas_config_area = get_mesas_config_por_area(area)
+    mesas_config_area = config_mesas.get_mesas_por_area(area)
     if not mesas_config_area:
         return jsonify([])
     
@@ -288,7 +823,7 @@ def get_mesas_por_area(area):
     numeros_mesas_area = [mesa['numero'] for mesa in mesas_config_area]
     
     # Obtener estados dinámicos solo para las mesas de este área
-    mesas_db = Mesa.query.filter(Mesa.numero.in_(numeros_mesas_area)).all()
+    mesas_db = Mesa.query.filter(Mesa.numero.in_(numeros_mesas_area), Mesa.activa).all()
     
     # Crear diccionario de estados por número de mesa
     estados_mesas = {}
@@ -297,19 +832,15 @@ def get_mesas_por_area(area):
             'id': mesa_db.id,
             'estado': mesa_db.estado,
             'grupo_id': mesa_db.grupo_id,
-            'fecha': mesa_db.fecha.strftime('%Y-%m-%d') if mesa_db.fecha else None
+            'fecha': mesa_db.fecha.strftime('%Y-%m-%d') if mesa_db.fecha else None,
+            'mesas_grupo': mesa_db.grupo.lista_numeros if mesa_db.grupo else None
         }
     
     # Combinar configuración estática con estados dinámicos
     mesas_data = []
     for mesa_config in mesas_config_area:
         numero = mesa_config['numero']
-        estado_mesa = estados_mesas.get(numero, {
-            'id': None,
-            'estado': 'disponible',
-            'grupo_id': None,
-            'fecha': None
-        })
+        estado_mesa = estados_mesas[numero]
         
         mesa_data = {
             'id': estado_mesa['id'],
@@ -321,12 +852,13 @@ def get_mesas_por_area(area):
             'posicion_y': mesa_config['posicion_y'],
             'grupo_id': estado_mesa['grupo_id'],
             'fecha': estado_mesa['fecha'],
-            'mesas_grupo': None,  # Se calcula dinámicamente si es necesario
+            'mesas_grupo': estado_mesa['mesas_grupo'],  # Números de las mesas del grupo (precalculados)
             'reservaciones': []  # Se carga por separado si es necesario
         }
         
         mesas_data.append(mesa_data)
     
+    cache.set(f'mesas:area:{area}', mesas_data, ttl=app.config['CACHE_TTL'], tags=('mesas',))
     return jsonify(mesas_data)
 
 # Endpoints para reservaciones
@@ -336,64 +868,154 @@ def get_reservaciones():
     if fecha:
         try:
             fecha_parseada = datetime.strptime(fecha, '%Y-%m-%d').date()
-            reservaciones = Reservacion.query.filter_by(fecha_reservacion=fecha_parseada).all()
         except ValueError:
             return jsonify({'error': 'Formato de fecha inválido'}), 400
-    else:
-        reservaciones = Reservacion.query.all()
+        
+        # Las listas por fecha se cachean y se invalidan al escribir reservaciones de esa fecha
+        clave = f'reservaciones:fecha:{fecha_parseada}'
+        reservaciones_data = cache.get(clave)
+        if reservaciones_data is None:
+            reservaciones = Reservacion.query.filter_by(fecha_reservacion=fecha_parseada).all()
+            reservaciones_data = [reservacion.to_dict() for reservacion in reservaciones]
+            cache.set(clave, reservaciones_data, ttl=app.config['CACHE_TTL'],
+                      tags=('reservaciones', f'reservaciones:{fecha_parseada}'))
+        return jsonify(reservaciones_data)
     
+    reservaciones = Reservacion.query.all()
     return jsonify([reservacion.to_dict() for reservacion in reservaciones])
 
+def minuto_del_dia(hora):
+    return hora.hour * 60 + hora.minute
+
+def asignadores_por_fecha(fechas, con_agenda=True):
+    """AsignadorMesas por fecha con las mesas activas con capacidad y, con `con_agenda`, las
+    reservaciones existentes de esas fechas (una sola consulta para todas)"""
+    mesas = [
+        {'id': mesa.id, 'numero': mesa.numero, 'capacidad': mesa.capacidad, 'area': mesa.ubicacion,
+         'posicion_x': mesa.posicion_x, 'posicion_y': mesa.posicion_y}
+        for mesa in db.session.query(
+            Mesa.id, Mesa.numero, Mesa.capacidad, Mesa.ubicacion, Mesa.posicion_x, Mesa.posicion_y
+        ).filter(Mesa.activa, Mesa.capacidad > 0)
+    ]
+    turnos = config_mesas.get_turnos_reservacion()
+    base = AsignadorMesas(mesas, DURACION_RESERVACION, (turnos[0], turnos[-1]))
+    asignadores = {fecha: base.copia_vacia() for fecha in fechas}
+    if con_agenda and asignadores:
+        for fecha, mesa_id, mesas_unidas, hora in db.session.query(
+            Reservacion.fecha_reservacion, Reservacion.mesa_id, Reservacion.mesas_unidas, Reservacion.hora_reservacion
+        ).filter(Reservacion.fecha_reservacion.in_(list(asignadores))):
+            mesas_ids = [mesa_id] + [int(unida) for unida in mesas_unidas.split(',') if unida]
+            asignadores[fecha].ocupar(mesas_ids, minuto_del_dia(hora))
+    return asignadores
+
+def actualizar_ocupacion(fechas, mesas_ids=None):
+    """Recalcula las franjas de ocupación de esas fechas (solo de `mesas_ids` si se dan) a
+    partir de sus reservaciones. Se llama antes del commit en cada alta o baja; las
+    inserciones en bloque por fuera de la API deben llamarla con sus fechas"""
+    fechas = list(set(fechas))
+    if not fechas:
+        return
+    filas = db.session.query(
+        Reservacion.fecha_reservacion, Reservacion.mesa_id, Reservacion.mesas_unidas, Reservacion.hora_reservacion
+    ).filter(Reservacion.fecha_reservacion.in_(fechas))
+    ocupacion = ocupacion_por_mesa(
+        ((fecha, mesa_id, mesas_unidas, minuto_del_dia(hora)) for fecha, mesa_id, mesas_unidas, hora in filas),
+        DURACION_RESERVACION
+    )
+    borrar = db.delete(OcupacionMesa).where(OcupacionMesa.fecha.in_(fechas))
+    if mesas_ids is not None:
+        mesas_ids = set(mesas_ids)
+        borrar = borrar.where(OcupacionMesa.mesa_id.in_(mesas_ids))
+        ocupacion = {clave: bits for clave, bits in ocupacion.items() if clave[1] in mesas_ids}
+    db.session.execute(borrar.execution_options(synchronize_session=False))
+    if ocupacion:
+        db.session.execute(db.insert(OcupacionMesa), [
+            {'fecha': fecha, 'mesa_id': mesa_id, 'franjas': a_bytes(bits)}
+            for (fecha, mesa_id), bits in ocupacion.items()
+        ])
+
+def ocupacion_de(fechas, mesas_ids=None):
+    """{(fecha, mesa_id): bits} de las mesas con alguna reservación en esas fechas"""
+    consulta = db.session.query(OcupacionMesa.fecha, OcupacionMesa.mesa_id, OcupacionMesa.franjas).filter(
+        OcupacionMesa.fecha.in_(list(fechas))
+    )
+    if mesas_ids is not None:
+        consulta = consulta.filter(OcupacionMesa.mesa_id.in_(list(mesas_ids)))
+    return {(fecha, mesa_id): de_bytes(datos) for fecha, mesa_id, datos in consulta}
+
+def asignador_del_dia(fecha, con_agenda=True):
+    return asignadores_por_fecha([fecha], con_agenda)[fecha]
+
+def mesas_bloqueadas(fecha):
+    """Mesas que hoy no aceptan otra reservación por su estado (mismas reglas que crear_reservacion)"""
+    if fecha != get_restaurant_now().date():
+        return set()
+    return {mesa_id for mesa_id, in db.session.query(Mesa.id).filter(
+        Mesa.activa,
+        db.or_(Mesa.estado == 'ocupada', db.and_(Mesa.estado == 'reservada', Mesa.fecha == fecha))
+    )}
+
 @app.route('/api/reservaciones', methods=['POST'])
 def crear_reservacion():
+    """Crea una reservación. Sin 'mesa_id' la mesa (o grupo de mesas vecinas) la elige el
+    asignador de mesas; 'area' es entonces opcional y limita la búsqueda a esa área"""
     data = request.get_json()
+    asignar = not data.get('mesa_id')
     
     # Validar datos requeridos
-    required_fields = ['mesa_id', 'hora_reservacion', 'area', 'cantidad_personas', 'nombre_reservador', 'fecha_reservacion']
+    required_fields = ['hora_reservacion', 'cantidad_personas', 'nombre_reservador', 'fecha_reservacion']
+    if not asignar:
+        required_fields += ['mesa_id', 'area']
     for field in required_fields:
         if field not in data or not data[field]:
             return jsonify({'error': f'Campo requerido: {field}'}), 400
     
-    # Verificar que la mesa existe
-    mesa = Mesa.query.get(data['mesa_id'])
-    if not mesa:
-        return jsonify({'error': 'Mesa no encontrada'}), 404
-    
-    # Verificar que la mesa esté disponible para la fecha específica
     # Una mesa puede estar "disponible" pero tener reservaciones en otras fechas
     fecha_reservacion = datetime.strptime(data['fecha_reservacion'], '%Y-%m-%d').date()
-    
-    # Si la mesa está ocupada, no se puede reservar
-    if mesa.estado == 'ocupada':
-        return jsonify({'error': 'La mesa está ocupada y no se puede reservar'}), 400
-    
-    # Si la mesa está reservada, verificar si es para la misma fecha
-    if mesa.estado == 'reservada' and mesa.fecha == fecha_reservacion:
-        return jsonify({'error': 'La mesa ya está reservada para esta fecha'}), 400
-    
-    # Verificar que no haya conflicto de horarios para la misma mesa y fecha
     hora_reservacion = datetime.strptime(data['hora_reservacion'], '%H:%M').time()
+    minuto = minuto_del_dia(hora_reservacion)
     
-    # Buscar reservaciones existentes para la misma mesa y fecha
-    reservaciones_existentes = Reservacion.query.filter_by(
-        mesa_id=data['mesa_id'],
-        fecha_reservacion=fecha_reservacion
-    ).all()
-    
-    # Verificar conflictos de horario (asumiendo que una reservación dura 2 horas)
-    for reservacion_existente in reservaciones_existentes:
-        hora_existente = reservacion_existente.hora_reservacion
-        # Calcular si hay solapamiento de horarios
-        if abs((hora_reservacion.hour * 60 + hora_reservacion.minute) - 
-               (hora_existente.hour * 60 + hora_existente.minute)) < 120:
+    candidato = None
+    if asignar:
+        # Agenda del día (incluye las mesas unidas de otras reservaciones)
+        asignador = asignador_del_dia(fecha_reservacion)
+        candidato = asignador.mejor(int(data['cantidad_personas']), minuto,
+                                    data.get('area') or None, bloqueadas=mesas_bloqueadas(fecha_reservacion))
+        if candidato is None:
+            return jsonify({'error': 'No hay mesas disponibles para ese grupo en ese horario'}), 409
+        mesas = Mesa.query.filter(Mesa.id.in_(candidato.mesas_ids)).all()
+        mesa = next(mesa for mesa in mesas if mesa.id == candidato.mesas_ids[0])
+    else:
+        # Verificar que la mesa existe
+        mesa = Mesa.query.get(data['mesa_id'])
+        if not mesa or not mesa.activa:
+            return jsonify({'error': 'Mesa no encontrada'}), 404
+        mesas = [mesa]
+        
+        # Si la mesa está ocupada, no se puede reservar
+        if mesa.estado == 'ocupada':
+            return jsonify({'error': 'La mesa está ocupada y no se puede reservar'}), 400
+        
+        # Si la mesa está reservada, verificar si es para la misma fecha
+        if mesa.estado == 'reservada' and mesa.fecha == fecha_reservacion:
+            return jsonify({'error': 'La mesa ya está reservada para esta fecha'}), 400
+        
+        # Verificar conflictos de horario (una reservación dura DURACION_RESERVACION minutos):
+        # las franjas de la mesa deciden casi siempre; si no, se revisa la agenda del día
+        bits = ocupacion_de([fecha_reservacion], [mesa.id]).get((fecha_reservacion, mesa.id), 0)
+        libre = libre_exacto(bits, minuto, DURACION_RESERVACION)
+        if libre is None:
+            libre = asignador_del_dia(fecha_reservacion).libre(mesa.id, minuto)
+        if not libre:
             return jsonify({'error': 'Ya existe una reservación para esta mesa en ese horario'}), 400
     
     try:
         # Crear la reservación
         nueva_reservacion = Reservacion(
-            mesa_id=data['mesa_id'],
+            mesa_id=mesa.id,
+            mesas_unidas=','.join(str(mesa_id) for mesa_id in candidato.mesas_ids[1:]) if candidato else '',
             hora_reservacion=hora_reservacion,
-            area=data['area'],
+            area=candidato.area if candidato else data['area'],
             cantidad_personas=data['cantidad_personas'],
             nombre_reservador=data['nombre_reservador'],
             telefono=data.get('telefono'),  # Campo opcional
@@ -404,40 +1026,210 @@ def crear_reservacion():
         # Cambiar el estado de la mesa solo si la reservación es para hoy
         fecha_actual = get_restaurant_now().date()
         if fecha_reservacion == fecha_actual:
-            # Si la reservación es para hoy, marcar como reservada
-            mesa.estado = 'reservada'
-            mesa.fecha = fecha_reservacion
-        else:
+            # Si la reservación es para hoy, marcar como reservadas
+            for mesa_reservada in mesas:
+                mesa_reservada.estado = 'reservada'
+                mesa_reservada.fecha = fecha_reservacion
+        elif not asignar:
             # Si la reservación es para una fecha futura, mantener como disponible
             # La mesa se marcará como reservada automáticamente cuando llegue el día
             mesa.estado = 'disponible'
             mesa.fecha = None
         
         db.session.add(nueva_reservacion)
+        registrar_reservacion_huesped(nueva_reservacion)
+        actualizar_ocupacion([fecha_reservacion], nueva_reservacion.mesas_ids)
         db.session.commit()
+        invalidar_cache_reservaciones(fecha_reservacion)
         
-        return jsonify({
+        respuesta = {
             'mensaje': 'Reservación creada exitosamente',
             'reservacion': nueva_reservacion.to_dict()
-        }), 201
+        }
+        if candidato:
+            respuesta['asignacion'] = candidato.to_dict()
+        return jsonify(respuesta), 201
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Error al crear la reservación: {str(e)}'}), 500
 
+@app.route('/api/reservaciones/asignacion', methods=['GET'])
+def sugerir_mesa():
+    """Mesa o grupo de mesas vecinas que el asignador elegiría para fecha, hora y personas"""
+    try:
+        fecha = datetime.strptime(request.args['fecha'], '%Y-%m-%d').date()
+        hora = datetime.strptime(request.args['hora'], '%H:%M').time()
+    except (KeyError, ValueError):
+        return jsonify({'error': 'Se requieren fecha (AAAA-MM-DD) y hora (HH:MM)'}), 400
+    personas = request.args.get('personas', type=int)
+    if not personas or personas < 1:
+        return jsonify({'error': 'La cantidad de personas debe ser mayor a 0'}), 400
+    
+    candidato = asignador_del_dia(fecha).mejor(personas, minuto_del_dia(hora), request.args.get('area') or None,
+                                               bloqueadas=mesas_bloqueadas(fecha))
+    if candidato is None:
+        return jsonify({'error': 'No hay mesas disponibles para ese grupo en ese horario'}), 409
+    return jsonify(candidato.to_dict())
+
+@app.route('/api/reservaciones/optimizar', methods=['POST'])
+def optimizar_reservaciones():
+    """Reacomoda todas las reservaciones de una fecha con el asignador de mesas para dejar
+    menos asientos sobrantes. Quedan fijas las que ya empezaron, las que tienen una mesa
+    ocupada y las asignadas a mano fuera de los candidatos del asignador o con más personas
+    que asientos. Con 'simular' solo retorna el plan"""
+    data = request.get_json() or {}
+    try:
+        fecha = datetime.strptime(data['fecha'], '%Y-%m-%d').date()
+    except (KeyError, ValueError):
+        return jsonify({'error': 'Formato de fecha inválido'}), 400
+    
+    reservaciones = Reservacion.query.filter_by(fecha_reservacion=fecha).all()
+    asignador = asignador_del_dia(fecha, con_agenda=False)
+    ahora = get_restaurant_now()
+    iniciadas = minuto_del_dia(ahora) if fecha == ahora.date() else -1
+    ocupadas = {mesa_id for mesa_id, in db.session.query(Mesa.id).filter(Mesa.estado == 'ocupada')} if iniciadas >= 0 else set()
+    
+    por_id = {reservacion.id: reservacion for reservacion in reservaciones}
+    entradas = []
+    for reservacion in reservaciones:
+        actual = asignador.por_mesas.get(frozenset(reservacion.mesas_ids))
+        entradas.append({
+            'id': reservacion.id,
+            'personas': reservacion.cantidad_personas,
+            'minuto': minuto_del_dia(reservacion.hora_reservacion),
+            'area': reservacion.area,
+            'mesas_ids': reservacion.mesas_ids,
+            'fija': (actual is None or actual.area != reservacion.area
+                     or actual.capacidad < reservacion.cantidad_personas
+                     or minuto_del_dia(reservacion.hora_reservacion) <= iniciadas
+                     or any(mesa_id in ocupadas for mesa_id in reservacion.mesas_ids))
+        })
+    plan = asignador.optimizar(entradas)
+    
+    sobrantes_antes = sobrantes_despues = 0
+    movimientos = []
+    for reservacion_id, candidato in plan.items():
+        reservacion = por_id[reservacion_id]
+        sobrantes_antes += asignador.por_mesas[frozenset(reservacion.mesas_ids)].capacidad - reservacion.cantidad_personas
+        sobrantes_despues += candidato.capacidad - reservacion.cantidad_personas
+        if set(candidato.mesas_ids) != set(reservacion.mesas_ids):
+            movimientos.append({'reservacion_id': reservacion_id, 'antes': reservacion.mesas_ids, **candidato.to_dict()})
+    
+    resultado = {
+        'fecha': fecha,
+        'reservaciones': len(reservaciones),
+        'fijas': len(reservaciones) - len(plan),
+        'movimientos': movimientos,
+        'asientos_sobrantes_antes': sobrantes_antes,
+        'asientos_sobrantes_despues': sobrantes_despues,
+        'aplicado': False
+    }
+    if data.get('simular') or not movimientos:
+        return jsonify(resultado)
+    
+    for movimiento in movimientos:
+        reservacion = por_id[movimiento['reservacion_id']]
+        reservacion.mesa_id = movimiento['mesas_ids'][0]
+        reservacion.mesas_unidas = ','.join(str(mesa_id) for mesa_id in movimiento['mesas_ids'][1:])
+    
+    # Hoy el estado 'reservada' sigue a las reservaciones: se actualizan las mesas que ganaron o perdieron
+    if fecha == ahora.date():
+        con_reservacion = {mesa_id for reservacion in reservaciones for mesa_id in reservacion.mesas_ids}
+        for mesa in Mesa.query.filter(Mesa.estado.in_(('disponible', 'reservada'))):
+            if mesa.id in con_reservacion and mesa.estado == 'disponible':
+                mesa.estado = 'reservada'
+                mesa.fecha = fecha
+            elif mesa.id not in con_reservacion and mesa.estado == 'reservada' and mesa.fecha == fecha:
+                mesa.estado = 'disponible'
+                mesa.fecha = None
+    actualizar_ocupacion([fecha])
+    db.session.commit()
+    invalidar_cache_reservaciones(fecha)
+    resultado['aplicado'] = True
+    return jsonify(resultado)
+
+TAMANO_LOTE_IMPORTACION = 500  # reservaciones por transacción al importar
+
+@app.route('/api/reservaciones/importar', methods=['POST'])
+def importar_reservaciones():
+    """Importa reservaciones de un CSV o XLSX (campo 'archivo') o de un arreglo JSON.
+    Todas las filas se validan contra la agenda de su fecha (ver importacion_reservaciones.py)
+    y las inválidas se reportan con su número de fila; las válidas se insertan en lotes de
+    TAMANO_LOTE_IMPORTACION, una transacción por lote. Con ?simular=1 solo valida"""
+    try:
+        if 'archivo' in request.files:
+            archivo = request.files['archivo']
+            nombre = (archivo.filename or '').lower()
+            if nombre.endswith('.xlsx'):
+                filas = leer_xlsx(archivo.read())
+            elif nombre.endswith('.csv'):
+                filas = leer_csv(archivo.read())
+            else:
+                return jsonify({'error': 'Formato no soportado (CSV, XLSX o arreglo JSON)'}), 400
+        else:
+            datos = request.get_json(silent=True)
+            if not isinstance(datos, list):
+                return jsonify({'error': 'Se requiere un archivo CSV/XLSX o un arreglo JSON'}), 400
+            filas = leer_json(datos)
+    except Exception as e:
+        return jsonify({'error': f'No se pudo leer el archivo: {str(e)}'}), 400
+    
+    hoy = get_restaurant_now().date()
+    mesas = [{'id': mesa_id, 'numero': numero, 'area': area}
+             for mesa_id, numero, area in db.session.query(Mesa.id, Mesa.numero, Mesa.ubicacion).filter(Mesa.activa)]
+    validas, errores = validar_filas(filas, mesas, asignadores_por_fecha, {hoy: mesas_bloqueadas(hoy)})
+    resultado = {'filas': len(filas), 'validas': len(validas), 'insertadas': 0, 'errores': errores}
+    if request.args.get('simular') or not validas:
+        return jsonify(resultado)
+    
+    guardadas = []  # filas de los lotes confirmados
+    for inicio in range(0, len(validas), TAMANO_LOTE_IMPORTACION):
+        lote = validas[inicio:inicio + TAMANO_LOTE_IMPORTACION]
+        try:
+            huespedes = registrar_huespedes_en_lote(lote)
+            db.session.add_all([
+                Reservacion(huesped_id=huespedes.get(normalizar_telefono(fila['telefono'])),
+                            **{campo: valor for campo, valor in fila.items() if campo != 'fila'})
+                for fila in lote
+            ])
+            actualizar_ocupacion({fila['fecha_reservacion'] for fila in lote})
+            db.session.commit()
+            guardadas.extend(lote)
+        except Exception as e:
+            db.session.rollback()
+            errores.extend({'fila': fila['fila'], 'error': f'Error al guardar: {str(e)}'} for fila in lote)
+    resultado['insertadas'] = len(guardadas)
+    if not guardadas:
+        return jsonify(resultado)
+    
+    # Las mesas de las reservaciones de hoy pasan a reservadas (como en crear_reservacion)
+    mesas_hoy = {int(mesa_id) for fila in guardadas if fila['fecha_reservacion'] == hoy
+                 for mesa_id in [fila['mesa_id']] + fila['mesas_unidas'].split(',') if mesa_id}
+    if mesas_hoy:
+        for mesa in Mesa.query.filter(Mesa.id.in_(mesas_hoy), Mesa.estado == 'disponible'):
+            mesa.estado = 'reservada'
+            mesa.fecha = hoy
+        db.session.commit()
+    invalidar_cache_reservaciones(*{fila['fecha_reservacion'] for fila in guardadas})
+    return jsonify(resultado), 201
+
 @app.route('/api/reservaciones/<int:reservacion_id>', methods=['DELETE'])
 def eliminar_reservacion(reservacion_id):
     reservacion = Reservacion.query.get_or_404(reservacion_id)
     
     try:
-        # Cambiar el estado de la mesa de vuelta a disponible
-        mesa = Mesa.query.get(reservacion.mesa_id)
-        if mesa:
+        # Cambiar el estado de las mesas de vuelta a disponible
+        for mesa in Mesa.query.filter(Mesa.id.in_(reservacion.mesas_ids)):
             mesa.estado = 'disponible'
             mesa.fecha = None
         
+        fecha_reservacion = reservacion.fecha_reservacion
+        mesas_ids = reservacion.mesas_ids
         db.session.delete(reservacion)
+        actualizar_ocupacion([fecha_reservacion], mesas_ids)
         db.session.commit()
+        invalidar_cache_reservaciones(fecha_reservacion)
         
         return jsonify({'mensaje': 'Reservación eliminada exitosamente'})
         
@@ -468,19 +1260,25 @@ def liberar_reservacion(reservacion_id):
             fecha_reservacion=reservacion.fecha_reservacion,
             fecha_creacion_original=reservacion.fecha_creacion,
             hora_liberacion=hora_actual,
-            motivo_liberacion='Liberada manualmente por el usuario'
+            motivo_liberacion='Liberada manualmente por el usuario',
+            huesped_id=reservacion.huesped_id
         )
         
-        # Cambiar el estado de la mesa de vuelta a disponible
-        mesa = Mesa.query.get(reservacion.mesa_id)
-        if mesa:
+        # Cambiar el estado de las mesas de vuelta a disponible
+        for mesa in Mesa.query.filter(Mesa.id.in_(reservacion.mesas_ids)):
             mesa.estado = 'disponible'
             mesa.fecha = None
+            mesa.ocupada_desde = None
         
         # Agregar al historial y eliminar la reservación original
         db.session.add(historial)
         db.session.delete(reservacion)
+        registrar_liberacion_huesped(historial)
+        registrar_estancia(historial.area, historial.cantidad_personas,
+                           minutos_estancia(historial.hora_reservacion, historial.hora_liberacion))
+        actualizar_ocupacion([historial.fecha_reservacion], reservacion.mesas_ids)
         db.session.commit()
+        invalidar_cache_reservaciones(historial.fecha_reservacion)
         
         return jsonify({
             'mensaje': 'Reservación liberada exitosamente',
@@ -491,11 +1289,417 @@ def liberar_reservacion(reservacion_id):
         db.session.rollback()
         return jsonify({'error': f'Error al liberar la reservación: {str(e)}'}), 500
 
+@app.route('/api/reservaciones/liberar-lote', methods=['POST'])
+def liberar_reservaciones_lote():
+    """Libera de una vez las reservaciones de una fecha que cumplan el filtro (p. ej. al cerrar
+    el jardín por lluvia): {fecha, motivo, area, mesas: [ids], desde: 'HH:MM', hasta: 'HH:MM'}.
+    Todo en una transacción: INSERT ... SELECT al historial, un DELETE, las mesas de hoy a
+    disponible y los contadores de huéspedes y el histograma de estancias sumados por lote.
+    Las reservaciones que aún no empezaban cuentan como canceladas: no suman visita ni estancia"""
+    datos = request.get_json(silent=True) or {}
+    motivo = str(datos.get('motivo') or '').strip()[:200]
+    if not motivo:
+        return jsonify({'error': 'Se requiere el motivo de la liberación'}), 400
+    try:
+        fecha = datetime.strptime(datos['fecha'], '%Y-%m-%d').date()
+        desde = datetime.strptime(datos['desde'], '%H:%M').time() if datos.get('desde') else None
+        hasta = datetime.strptime(datos['hasta'], '%H:%M').time() if datos.get('hasta') else None
+        mesas = {int(mesa_id) for mesa_id in datos.get('mesas') or ()}
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'Se requiere fecha (AAAA-MM-DD); desde y hasta son HH:MM y mesas una lista de IDs'}), 400
+    
+    consulta = db.session.query(
+        Reservacion.id, Reservacion.mesa_id, Reservacion.mesas_unidas, Reservacion.hora_reservacion,
+        Reservacion.area, Reservacion.cantidad_personas, Reservacion.huesped_id
+    ).filter(Reservacion.fecha_reservacion == fecha)
+    if datos.get('area'):
+        consulta = consulta.filter(Reservacion.area == datos['area'])
+    if desde:
+        consulta = consulta.filter(Reservacion.hora_reservacion >= desde)
+    if hasta:
+        consulta = consulta.filter(Reservacion.hora_reservacion <= hasta)
+    filas = []
+    for fila in consulta:
+        mesas_ids = [fila.mesa_id] + [int(unida) for unida in fila.mesas_unidas.split(',') if unida]
+        if not mesas or mesas.intersection(mesas_ids):
+            filas.append((fila, mesas_ids))
+    if not filas:
+        return jsonify({'mensaje': 'No hay reservaciones que liberar', 'liberadas': 0, 'mesas_liberadas': 0})
+    
+    ahora = get_restaurant_now()
+    hora_actual = ahora.time()
+    ids = [fila.id for fila, _ in filas]
+    try:
+        db.session.execute(db.insert(HistorialReservacion).from_select(
+            ['reservacion_id_original', 'mesa_id', 'mesa_numero', 'hora_reservacion', 'area',
+             'cantidad_personas', 'nombre_reservador', 'telefono', 'nota', 'fecha_reservacion',
+             'fecha_creacion_original', 'fecha_liberacion', 'hora_liberacion', 'motivo_liberacion', 'huesped_id'],
+            db.select(
+                Reservacion.id, Reservacion.mesa_id, db.func.coalesce(Mesa.numero, 0), Reservacion.hora_reservacion,
+                Reservacion.area, Reservacion.cantidad_personas, Reservacion.nombre_reservador, Reservacion.telefono,
+                Reservacion.nota, Reservacion.fecha_reservacion, Reservacion.fecha_creacion,
+                db.literal(datetime.utcnow(), db.DateTime), db.literal(hora_actual, db.Time),
+                db.literal(motivo), Reservacion.huesped_id
+            ).outerjoin(Mesa, Mesa.id == Reservacion.mesa_id).where(Reservacion.id.in_(ids))
+        ))
+        db.session.execute(
+            db.delete(Reservacion).where(Reservacion.id.in_(ids)).execution_options(synchronize_session=False)
+        )
+        registro_eventos.registrar_reservaciones(
+            db.session, 'reservacion_liberada', [(fila.id, fila.mesa_id, fecha) for fila, _ in filas]
+        )
+        
+        # Solo las que ya empezaron fueron visitas
+        iniciadas = [fila for fila, _ in filas
+                     if fecha < ahora.date() or (fecha == ahora.date() and fila.hora_reservacion <= hora_actual)]
+        registrar_liberaciones_huespedes(
+            [(fila.huesped_id, fila.cantidad_personas, fila.hora_reservacion, hora_actual, motivo) for fila in iniciadas],
+            fecha
+        )
+        registrar_estancias([
+            (fila.area, fila.cantidad_personas, minutos_estancia(fila.hora_reservacion, hora_actual))
+            for fila in iniciadas
+        ])
+        
+        # El estado de las mesas solo corresponde a las reservaciones de hoy
+        mesas_liberadas = 0
+        if fecha == ahora.date():
+            for mesa in Mesa.query.filter(Mesa.id.in_({mesa_id for _, mesas_ids in filas for mesa_id in mesas_ids}),
+                                          db.or_(Mesa.estado != 'disponible', Mesa.fecha.isnot(None))):
+                mesa.estado = 'disponible'
+                mesa.fecha = None
+                mesa.ocupada_desde = None
+                mesas_liberadas += 1
+        actualizar_ocupacion([fecha], {mesa_id for _, mesas_ids in filas for mesa_id in mesas_ids})
+        db.session.commit()
+        invalidar_cache_reservaciones(fecha)
+        
+        return jsonify({
+            'mensaje': f'Se liberaron {len(filas)} reservaciones',
+            'liberadas': len(filas),
+            'mesas_liberadas': mesas_liberadas
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Error al liberar las reservaciones: {str(e)}'}), 500
+
 @app.route('/api/reservaciones/mesa/<int:mesa_id>', methods=['GET'])
 def get_reservaciones_mesa(mesa_id):
     reservaciones = Reservacion.query.filter_by(mesa_id=mesa_id).all()
     return jsonify([reservacion.to_dict() for reservacion in reservaciones])
 
+@app.route('/api/dia/<fecha>', methods=['GET'])
+def get_dia(fecha):
+    """Vista de un día: mesas con sus reservaciones y estadísticas por área, en una sola
+    consulta (mesas LEFT JOIN reservaciones de la fecha). Se cachea por fecha"""
+    try:
+        fecha_dia = datetime.strptime(fecha, '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'error': 'Formato de fecha inválido'}), 400
+    
+    clave = f'dia:{fecha_dia}'
+    datos = cache.get(clave)
+    if datos is not None:
+        return jsonify(datos)
+    
+    filas = db.session.query(Mesa, Reservacion).outerjoin(
+        Reservacion,
+        db.and_(Reservacion.mesa_id == Mesa.id, Reservacion.fecha_reservacion == fecha_dia)
+    ).filter(Mesa.activa).order_by(Reservacion.hora_reservacion).all()
+    
+    mesas_db = {}
+    reservaciones_por_mesa = {}
+    # Las reservaciones de grupos también se muestran en sus mesas unidas (sin contarlas dos veces)
+    reservaciones_unidas = {}
+    for mesa, reservacion in filas:
+        mesas_db[mesa.numero] = mesa
+        if reservacion is not None:
+            reservacion_data = reservacion.to_dict()
+            reservaciones_por_mesa.setdefault(mesa.id, []).append(reservacion_data)
+            for mesa_id in reservacion_data['mesas_unidas']:
+                reservaciones_unidas.setdefault(mesa_id, []).append(reservacion_data)
+    
+    mesas_data = []
+    por_area = {}
+    for area, mesas_area in config_mesas.get_mesas_config().items():
+        estadisticas_area = por_area.setdefault(area, {'mesas': 0, 'mesas_reservadas': 0, 'reservaciones': 0, 'personas': 0})
+        for mesa_config in mesas_area:
+            mesa = mesas_db[mesa_config['numero']]
+            reservaciones = reservaciones_por_mesa.get(mesa.id, [])
+            unidas = reservaciones_unidas.get(mesa.id)
+            mesas_data.append({
+                'id': mesa.id,
+                'numero': mesa.numero,
+                'capacidad': mesa_config['capacidad'],
+                'ubicacion': area,
+                'posicion_x': mesa_config['posicion_x'],
+                'posicion_y': mesa_config['posicion_y'],
+                'reservaciones': sorted(reservaciones + unidas, key=lambda r: r['hora_reservacion']) if unidas else reservaciones
+            })
+            estadisticas_area['mesas'] += 1
+            estadisticas_area['mesas_reservadas'] += 1 if reservaciones or unidas else 0
+            estadisticas_area['reservaciones'] += len(reservaciones)
+            estadisticas_area['personas'] += sum(r['cantidad_personas'] for r in reservaciones)
+    
+    datos = {
+        'fecha': fecha_dia,
+        'mesas': mesas_data,
+        'estadisticas': {
+            'total_reservaciones': sum(area['reservaciones'] for area in por_area.values()),
+            'total_personas': sum(area['personas'] for area in por_area.values()),
+            'mesas_reservadas': sum(area['mesas_reservadas'] for area in por_area.values()),
+            'por_area': por_area
+        }
+    }
+    cache.set(clave, datos, ttl=app.config['CACHE_TTL'], tags=('reservaciones', f'reservaciones:{fecha_dia}'))
+    return jsonify(datos)
+
+@app.route('/api/ocupacion/<fecha>', methods=['GET'])
+def get_ocupacion(fecha):
+    """Franjas ocupadas de cada mesa con reservaciones en la fecha, como hexadecimal de 96
+    bits (bit i = franja que empieza en el minuto i * minutos_franja). Las mesas sin
+    reservaciones no aparecen"""
+    try:
+        fecha_dia = datetime.strptime(fecha, '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'error': 'Formato de fecha inválido'}), 400
+    
+    return jsonify({
+        'fecha': fecha_dia,
+        'minutos_franja': MINUTOS_FRANJA,
+        'mesas': {mesa_id: f'{bits:024x}' for (_, mesa_id), bits in ocupacion_de([fecha_dia]).items()}
+    })
+
+@app.route('/api/calendario', methods=['GET'])
+def get_calendario():
+    """Disponibilidad por día y área para un rango de fechas: asientos libres y turnos
+    en los que un grupo de 'personas' todavía puede reservar. Una sola consulta a las
+    franjas de ocupación del rango (un AND por mesa y turno, exacto con turnos en múltiplos
+    de 15 minutos); las capacidades salen de mesas_config"""
+    try:
+        desde = datetime.strptime(request.args['desde'], '%Y-%m-%d').date() if request.args.get('desde') else get_restaurant_now().date()
+        hasta = datetime.strptime(request.args['hasta'], '%Y-%m-%d').date() if request.args.get('hasta') else desde + timedelta(days=30)
+    except ValueError:
+        return jsonify({'error': 'Formato de fecha inválido'}), 400
+    personas = request.args.get('personas', 1, type=int)
+    area_filtro = request.args.get('area')
+    
+    mesas_config = config_mesas.get_mesas_config()
+    if area_filtro and area_filtro not in mesas_config:
+        return jsonify({'error': 'Área no válida'}), 400
+    if hasta < desde or (hasta - desde).days > 92:
+        return jsonify({'error': 'El rango debe ser de 0 a 92 días'}), 400
+    if not personas or personas < 1:
+        return jsonify({'error': 'La cantidad de personas debe ser mayor a 0'}), 400
+    
+    dias = [desde + timedelta(days=i) for i in range((hasta - desde).days + 1)]
+    clave = f'calendario:{desde}:{hasta}:{personas}:{area_filtro or "todas"}'
+    datos = cache.get(clave)
+    if datos is not None:
+        return jsonify(datos)
+    
+    # Franjas ocupadas por (fecha, número de mesa), contando las mesas unidas
+    numeros = dict(db.session.query(Mesa.id, Mesa.numero).all())
+    ocupacion = {(fecha, numeros[mesa_id]): bits for (fecha, mesa_id), bits in ocupacion_de(dias).items()}
+    
+    ahora = get_restaurant_now()
+    minuto_actual = ahora.hour * 60 + ahora.minute
+    areas = {area: mesas for area, mesas in mesas_config.items() if not area_filtro or area == area_filtro}
+    
+    calendario = []
+    for fecha in dias:
+        dia = {'fecha': fecha, 'areas': {}}
+        # Para hoy solo cuentan los turnos que aún no pasan
+        turnos = [turno for turno in config_mesas.get_turnos_reservacion() if fecha != ahora.date() or turno > minuto_actual]
+        for area, mesas_area in areas.items():
+            asientos_por_turno = []
+            turnos_disponibles = []
+            ocupacion_area = [ocupacion.get((fecha, mesa_config['numero']), 0) for mesa_config in mesas_area]
+            for turno in turnos:
+                mascara = franjas(turno, DURACION_RESERVACION)
+                asientos = 0
+                mesa_para_grupo = False
+                for mesa_config, bits in zip(mesas_area, ocupacion_area):
+                    if bits & mascara:
+                        continue
+                    asientos += mesa_config['capacidad']
+                    # Capacidad 0 significa sin límite (reservados)
+                    if mesa_config['capacidad'] == 0 or mesa_config['capacidad'] >= personas:
+                        mesa_para_grupo = True
+                asientos_por_turno.append(asientos)
+                if mesa_para_grupo:
+                    turnos_disponibles.append(f'{turno // 60:02d}:{turno % 60:02d}')
+            dia['areas'][area] = {
+                'asientos_libres': max(asientos_por_turno, default=0),
+                'turnos': turnos_disponibles
+            }
+        dia['disponible'] = any(area['turnos'] for area in dia['areas'].values())
+        calendario.append(dia)
+    
+    datos = {'desde': desde, 'hasta': hasta, 'personas': personas, 'dias': calendario}
+    cache.set(clave, datos, ttl=app.config['CACHE_TTL'],
+              tags=('reservaciones', *(f'reservaciones:{fecha}' for fecha in dias)))
+    return jsonify(datos)
+
+@app.route('/api/buscar', methods=['GET'])
+def buscar_reservaciones():
+    """Busca por nombre, teléfono o nota en reservaciones activas y en el historial (incluido
+    el archivado). Cada palabra se trata como prefijo y sin acentos ('per 662' encuentra a Pérez, 662-...)"""
+    texto = request.args.get('q', '').strip()
+    if not texto:
+        return jsonify({'error': 'El parámetro q es requerido'}), 400
+    limite = min(request.args.get('limite', 20, type=int), 100)
+    
+    resultados = buscar(db.session.connection(), texto, limite)
+    
+    # Dos consultas IN (una por tabla) y se conserva el orden de relevancia del índice
+    ids = {'reservacion': [], 'historial_reservacion': []}
+    for tabla, registro_id in resultados:
+        ids[tabla].append(registro_id)
+    registros = {}
+    if ids['reservacion']:
+        for reservacion in Reservacion.query.filter(Reservacion.id.in_(ids['reservacion'])):
+            registros[('reservacion', reservacion.id)] = dict(reservacion.to_dict(), tipo='reservacion')
+    if ids['historial_reservacion']:
+        historial = HistorialReservacion.query.filter(HistorialReservacion.id.in_(ids['historial_reservacion'])).all()
+        # Los que ya no están en la tabla activa se archivaron en las particiones mensuales
+        faltantes = set(ids['historial_reservacion']) - {registro.id for registro in historial}
+        if faltantes:
+            historial += archivo_historial.por_ids(HistorialReservacion, faltantes)
+        for registro in historial:
+            registros[('historial_reservacion', registro.id)] = dict(registro.to_dict(), tipo='historial')
+    
+    return jsonify([registros[clave] for clave in resultados if clave in registros])
+
+@app.route('/api/huespedes/<telefono>', methods=['GET'])
+def get_huesped(telefono):
+    """Perfil del cliente por teléfono (cualquier formato) para mostrarlo al reservar"""
+    clave = normalizar_telefono(telefono)
+    if clave is None:
+        return jsonify({'error': 'Teléfono inválido'}), 400
+    huesped = Huesped.query.filter_by(telefono=clave).first()
+    if huesped is None:
+        return jsonify({'error': 'Huésped no encontrado'}), 404
+    return jsonify(huesped.to_dict())
+
+def a_utc(fecha, hora):
+    """Fecha y hora del restaurante a datetime UTC sin zona (como las columnas DateTime)"""
+    return sucursales.actual.zona_horaria.localize(datetime.combine(fecha, hora)).astimezone(pytz.utc).replace(tzinfo=None)
+
+def mesas_para_espera(ahora):
+    """(mesa_id, capacidad, area, libre_desde) de las mesas activas para el estimador.
+    Las ocupadas se liberan según lo que les falta dado el tiempo que llevan ocupadas; las
+    que tienen una reservación que empieza antes de DURACION_RESERVACION quedan apartadas"""
+    estimador = estimador_espera()
+    hoy = get_restaurant_now().date()
+    reservaciones = {}
+    for mesa_id, mesas_unidas, hora, personas in db.session.query(
+        Reservacion.mesa_id, Reservacion.mesas_unidas, Reservacion.hora_reservacion, Reservacion.cantidad_personas
+    ).filter(Reservacion.fecha_reservacion == hoy).order_by(Reservacion.hora_reservacion):
+        for mesa_reservada in [mesa_id] + [int(unida) for unida in mesas_unidas.split(',') if unida]:
+            reservaciones.setdefault(mesa_reservada, []).append((a_utc(hoy, hora), personas))
+    
+    mesas = []
+    for mesa in db.session.query(Mesa.id, Mesa.capacidad, Mesa.ubicacion, Mesa.estado, Mesa.ocupada_desde).filter(
+        Mesa.activa, Mesa.capacidad > 0
+    ):
+        libre_desde = ahora
+        if mesa.estado == 'ocupada':
+            iniciadas = [r for r in reservaciones.get(mesa.id, []) if r[0] <= ahora]
+            inicio, personas = iniciadas[-1] if iniciadas else (mesa.ocupada_desde or ahora, mesa.capacidad)
+            transcurridos = (ahora - (mesa.ocupada_desde or inicio)).total_seconds() / 60
+            libre_desde = ahora + timedelta(minutes=estimador.restante(mesa.ubicacion, personas, transcurridos))
+        else:
+            for inicio, personas in reservaciones.get(mesa.id, []):
+                if ahora <= inicio < ahora + timedelta(minutes=DURACION_RESERVACION):
+                    libre_desde = inicio + timedelta(minutes=estimador.restante(mesa.ubicacion, personas))
+                    break
+        mesas.append((mesa.id, mesa.capacidad, mesa.ubicacion, libre_desde))
+    return mesas
+
+def lista_espera_actual():
+    """Grupos esperando (de hoy) en orden de atención, con su espera estimada"""
+    ahora = datetime.utcnow()
+    inicio_dia = a_utc(get_restaurant_now().date(), datetime.min.time())
+    grupos = ListaEspera.query.filter(
+        ListaEspera.estado == 'esperando', ListaEspera.hora_llegada >= inicio_dia
+    ).order_by(ListaEspera.prioridad.desc(), ListaEspera.hora_llegada, ListaEspera.id).all()
+    estimaciones = estimador_espera().estimar(
+        [(grupo.id, grupo.cantidad_personas, grupo.area) for grupo in grupos],
+        mesas_para_espera(ahora), ahora
+    ) if grupos else {}
+    
+    lista = []
+    for posicion, grupo in enumerate(grupos, start=1):
+        datos = grupo.to_dict()
+        datos['posicion'] = posicion
+        datos['minutos_esperando'] = int((ahora - grupo.hora_llegada).total_seconds() // 60)
+        datos['minutos_estimados'] = estimaciones.get(grupo.id)
+        lista.append(datos)
+    return lista
+
+@app.route('/api/espera', methods=['GET'])
+def get_lista_espera():
+    """Lista de espera en orden de atención con el tiempo estimado de cada grupo"""
+    return jsonify(lista_espera_actual())
+
+@app.route('/api/espera', methods=['POST'])
+def agregar_lista_espera():
+    data = request.get_json() or {}
+    for campo in ('nombre', 'cantidad_personas'):
+        if not data.get(campo):
+            return jsonify({'error': f'Campo requerido: {campo}'}), 400
+    if data.get('area') and data['area'] not in config_mesas.get_mesas_config():
+        return jsonify({'error': 'Área no encontrada'}), 400
+    
+    grupo = ListaEspera(
+        nombre=data['nombre'],
+        telefono=data.get('telefono'),
+        cantidad_personas=int(data['cantidad_personas']),
+        area=data.get('area') or None,
+        prioridad=int(data.get('prioridad') or 0),
+        nota=data.get('nota')
+    )
+    db.session.add(grupo)
+    db.session.commit()
+    
+    datos = next((item for item in lista_espera_actual() if item['id'] == grupo.id), grupo.to_dict())
+    return jsonify(datos), 201
+
+@app.route('/api/espera/<int:espera_id>/sentar', methods=['POST'])
+def sentar_lista_espera(espera_id):
+    """Asigna una mesa al grupo: la mesa queda ocupada y el grupo sale de la cola"""
+    grupo = db.session.get(ListaEspera, espera_id)
+    if grupo is None or grupo.estado != 'esperando':
+        return jsonify({'error': 'Grupo no encontrado en la lista de espera'}), 404
+    data = request.get_json() or {}
+    mesa = db.session.get(Mesa, data.get('mesa_id')) if data.get('mesa_id') else None
+    if mesa is None or not mesa.activa:
+        return jsonify({'error': 'Mesa no encontrada'}), 404
+    if mesa.estado == 'ocupada':
+        return jsonify({'error': 'La mesa está ocupada', 'estado_actual': mesa.estado}), 409
+    
+    ahora = datetime.utcnow()
+    grupo.estado = 'sentado'
+    grupo.mesa_id = mesa.id
+    grupo.hora_asignacion = ahora
+    mesa.estado = 'ocupada'
+    mesa.fecha = get_restaurant_now().date()
+    mesa.ocupada_desde = ahora
+    db.session.commit()
+    cache.invalidar('mesas')
+    return jsonify(grupo.to_dict())
+
+@app.route('/api/espera/<int:espera_id>', methods=['DELETE'])
+def cancelar_lista_espera(espera_id):
+    grupo = db.session.get(ListaEspera, espera_id)
+    if grupo is None or grupo.estado != 'esperando':
+        return jsonify({'error': 'Grupo no encontrado en la lista de espera'}), 404
+    grupo.estado = 'cancelado'
+    db.session.commit()
+    return jsonify({'mensaje': 'Grupo retirado de la lista de espera'})
+
 @app.route('/api/mesas/especifica/<int:mesa_id>', methods=['GET'])
 def get_mesa_especifica(mesa_id):
     """API optimizada para obtener una mesa específica por ID"""
@@ -506,7 +1710,7 @@ def get_mesa_especifica(mesa_id):
             return jsonify({'error': 'Mesa no encontrada'}), 404
         
         # Obtener configuración estática de la mesa
-        mesa_config = get_mesa_config(mesa_db.numero)
+        mesa_config = config_mesas.get_mesa_config(mesa_db.numero)
         if not mesa_config:
             return jsonify({'error': 'Configuración de mesa no encontrada'}), 404
         
@@ -540,15 +1744,17 @@ def actualizar_mesas_reservadas():
         
         actualizadas = 0
         for reservacion in reservaciones_hoy:
-            mesa = Mesa.query.get(reservacion.mesa_id)
-            if mesa and mesa.estado == 'disponible':
-                # Cambiar el estado de la mesa a reservada
-                mesa.estado = 'reservada'
-                mesa.fecha = fecha_actual
-                actualizadas += 1
+            for mesa_id in reservacion.mesas_ids:
+                mesa = Mesa.query.get(mesa_id)
+                if mesa and mesa.estado == 'disponible':
+                    # Cambiar el estado de la mesa a reservada
+                    mesa.estado = 'reservada'
+                    mesa.fecha = fecha_actual
+                    actualizadas += 1
         
         if actualizadas > 0:
             db.session.commit()
+            cache.invalidar('mesas')
             return {
                 'mensaje': f'Se actualizaron {actualizadas} mesas a estado reservado',
                 'actualizadas': actualizadas
@@ -590,21 +1796,27 @@ def limpiar_reservaciones_pasadas():
                 fecha_reservacion=reservacion.fecha_reservacion,
                 fecha_creacion_original=reservacion.fecha_creacion,
                 hora_liberacion=hora_actual,
-                motivo_liberacion='Liberación automática por fecha pasada'
+                motivo_liberacion='Liberación automática por fecha pasada',
+                huesped_id=reservacion.huesped_id
             )
             
-            # Liberar la mesa
-            mesa = Mesa.query.get(reservacion.mesa_id)
-            if mesa:
-                mesa.estado = 'disponible'
-                mesa.fecha = None
+            # Liberar las mesas
+            for mesa_id in reservacion.mesas_ids:
+                mesa = Mesa.query.get(mesa_id)
+                if mesa:
+                    mesa.estado = 'disponible'
+                    mesa.fecha = None
             
             # Agregar al historial y eliminar la reservación
             db.session.add(historial)
             db.session.delete(reservacion)
+            registrar_liberacion_huesped(historial)
             liberadas += 1
         
+        # Las franjas de días pasados ya no se consultan
+        OcupacionMesa.query.filter(OcupacionMesa.fecha < fecha_actual).delete(synchronize_session=False)
         db.session.commit()
+        cache.invalidar('mesas', 'reservaciones')
         return {
             'mensaje': f'Se liberaron {liberadas} mesas automáticamente',
             'liberadas': liberadas
@@ -690,6 +1902,76 @@ def exportar_reservaciones():
     except Exception as e:
         return jsonify({'error': f'Error al exportar: {str(e)}'}), 500
 
+def calcular_estadisticas_reporte(todas_reservaciones, historial_reservaciones):
+    """Calcula los agregados de los reportes (totales, estancia promedio, ocupación por área
+    y horarios) a partir de las reservaciones ya cargadas"""
+    # Calcular estadísticas básicas (incluyendo todas las reservaciones)
+    total_reservaciones = len(todas_reservaciones)
+    total_personas = 0
+    for item in todas_reservaciones:
+        if item['tipo'] == 'activa':
+            total_personas += item['reservacion'].cantidad_personas
+        else:
+            total_personas += item['historial'].cantidad_personas
+    
+    promedio_personas = total_personas / total_reservaciones if total_reservaciones > 0 else 0
+    
+    # Calcular tiempo promedio de estancia
+    tiempos_estancia = []
+    for historial in historial_reservaciones:
+        if historial.hora_liberacion and historial.hora_reservacion:
+            # Calcular diferencia en minutos
+            hora_inicio = historial.hora_reservacion
+            hora_fin = historial.hora_liberacion
+    
+            # Convertir a minutos para facilitar el cálculo
+            inicio_minutos = hora_inicio.hour * 60 + hora_inicio.minute
+            fin_minutos = hora_fin.hour * 60 + hora_fin.minute
+    
+            # Si la hora de fin es menor que la de inicio, asumir que es del día siguiente
+            if fin_minutos < inicio_minutos:
+                fin_minutos += 24 * 60  # Agregar 24 horas
+    
+            duracion_minutos = fin_minutos - inicio_minutos
+            if duracion_minutos > 0:
+                tiempos_estancia.append(duracion_minutos)
+    
+    tiempo_promedio_estancia = sum(tiempos_estancia) / len(tiempos_estancia) if tiempos_estancia else 0
+    
+    # Calcular factor de ocupación por área
+    ocupacion_por_area = {}
+    for item in todas_reservaciones:
+        if item['tipo'] == 'activa':
+            area = item['reservacion'].area
+            cantidad = item['reservacion'].cantidad_personas
+        else:
+            area = item['historial'].area
+            cantidad = item['historial'].cantidad_personas
+    
+        if area not in ocupacion_por_area:
+            ocupacion_por_area[area] = {'reservaciones': 0, 'personas': 0}
+        ocupacion_por_area[area]['reservaciones'] += 1
+        ocupacion_por_area[area]['personas'] += cantidad
+    
+    # Reservaciones por horario
+    horarios = {}
+    for item in todas_reservaciones:
+        if item['tipo'] == 'activa':
+            hora = item['reservacion'].hora_reservacion.strftime('%H:%M')
+        else:
+            hora = item['historial'].hora_reservacion.strftime('%H:%M')
+        horarios[hora] = horarios.get(hora, 0) + 1
+    
+    return {
+        'total_reservaciones': total_reservaciones,
+        'total_personas': total_personas,
+        'promedio_personas': promedio_personas,
+        'tiempo_promedio_estancia': tiempo_promedio_estancia,
+        'reservaciones_completadas': len(historial_reservaciones),
+        'ocupacion_por_area': ocupacion_por_area,
+        'horarios': horarios
+    }
+
 def generar_pdf_reservaciones(reservaciones, fecha_inicio, fecha_fin):
     """Genera un PDF con las reservaciones"""
     try:
@@ -750,10 +2032,7 @@ def generar_pdf_reservaciones(reservaciones, fecha_inicio, fecha_fin):
         story.append(Spacer(1, 5))
         
         # Obtener datos del historial para cálculos adicionales
-        historial_reservaciones = HistorialReservacion.query.filter(
-            HistorialReservacion.fecha_reservacion >= fecha_inicio,
-            HistorialReservacion.fecha_reservacion <= fecha_fin
-        ).all()
+        historial_reservaciones = archivo_historial.consultar(HistorialReservacion, fecha_inicio, fecha_fin)
         
         # Combinar reservaciones activas y del historial para mostrar todas
         todas_reservaciones = []
@@ -782,53 +2061,13 @@ def generar_pdf_reservaciones(reservaciones, fecha_inicio, fecha_fin):
                 return (item['historial'].fecha_reservacion, item['historial'].hora_reservacion)
         todas_reservaciones.sort(key=get_fecha_hora)
 
-        # Calcular estadísticas básicas (incluyendo todas las reservaciones)
-        total_reservaciones = len(todas_reservaciones)
-        total_personas = 0
-        for item in todas_reservaciones:
-            if item['tipo'] == 'activa':
-                total_personas += item['reservacion'].cantidad_personas
-            else:
-                total_personas += item['historial'].cantidad_personas
-        
-        promedio_personas = total_personas / total_reservaciones if total_reservaciones > 0 else 0
-        
-        # Calcular tiempo promedio de estancia
-        tiempos_estancia = []
-        for historial in historial_reservaciones:
-            if historial.hora_liberacion and historial.hora_reservacion:
-                # Calcular diferencia en minutos
-                hora_inicio = historial.hora_reservacion
-                hora_fin = historial.hora_liberacion
-                
-                # Convertir a minutos para facilitar el cálculo
-                inicio_minutos = hora_inicio.hour * 60 + hora_inicio.minute
-                fin_minutos = hora_fin.hour * 60 + hora_fin.minute
-                
-                # Si la hora de fin es menor que la de inicio, asumir que es del día siguiente
-                if fin_minutos < inicio_minutos:
-                    fin_minutos += 24 * 60  # Agregar 24 horas
-                
-                duracion_minutos = fin_minutos - inicio_minutos
-                if duracion_minutos > 0:
-                    tiempos_estancia.append(duracion_minutos)
-        
-        tiempo_promedio_estancia = sum(tiempos_estancia) / len(tiempos_estancia) if tiempos_estancia else 0
-        
-        # Calcular factor de ocupación por área
-        ocupacion_por_area = {}
-        for item in todas_reservaciones:
-            if item['tipo'] == 'activa':
-                area = item['reservacion'].area
-                cantidad = item['reservacion'].cantidad_personas
-            else:
-                area = item['historial'].area
-                cantidad = item['historial'].cantidad_personas
-            
-            if area not in ocupacion_por_area:
-                ocupacion_por_area[area] = {'reservaciones': 0, 'personas': 0}
-            ocupacion_por_area[area]['reservaciones'] += 1
-            ocupacion_por_area[area]['personas'] += cantidad
+        # Agregados del reporte, calculados a partir de las reservaciones ya cargadas
+        estadisticas = calcular_estadisticas_reporte(todas_reservaciones, historial_reservaciones)
+        total_reservaciones = estadisticas['total_reservaciones']
+        total_personas = estadisticas['total_personas']
+        promedio_personas = estadisticas['promedio_personas']
+        tiempo_promedio_estancia = estadisticas['tiempo_promedio_estancia']
+        ocupacion_por_area = estadisticas['ocupacion_por_area']
         
         # Estadísticas básicas como lista compacta
         stats_text = f"""
@@ -972,14 +2211,7 @@ def generar_pdf_reservaciones(reservaciones, fecha_inicio, fecha_fin):
             ])
         
         # Horario más popular
-        horarios = {}
-        for item in todas_reservaciones:
-            if item['tipo'] == 'activa':
-                hora = item['reservacion'].hora_reservacion.strftime('%H:%M')
-            else:
-                hora = item['historial'].hora_reservacion.strftime('%H:%M')
-            horarios[hora] = horarios.get(hora, 0) + 1
-        
+        horarios = estadisticas['horarios']
         if horarios:
             hora_mas_popular = max(horarios, key=horarios.get)
             info_adicional.append([
@@ -1072,10 +2304,7 @@ def generar_excel_reservaciones(reservaciones, fecha_inicio, fecha_fin):
         ws['A2'].alignment = Alignment(horizontal="center", vertical="center")
         
         # Obtener datos del historial para cálculos adicionales
-        historial_reservaciones = HistorialReservacion.query.filter(
-            HistorialReservacion.fecha_reservacion >= fecha_inicio,
-            HistorialReservacion.fecha_reservacion <= fecha_fin
-        ).all()
+        historial_reservaciones = archivo_historial.consultar(HistorialReservacion, fecha_inicio, fecha_fin)
         
         # Combinar reservaciones activas y del historial para mostrar todas
         todas_reservaciones = []
@@ -1104,38 +2333,13 @@ def generar_excel_reservaciones(reservaciones, fecha_inicio, fecha_fin):
                 return (item['historial'].fecha_reservacion, item['historial'].hora_reservacion)
         todas_reservaciones.sort(key=get_fecha_hora)
 
-        # Calcular estadísticas básicas (incluyendo todas las reservaciones)
-        total_reservaciones = len(todas_reservaciones)
-        total_personas = 0
-        for item in todas_reservaciones:
-            if item['tipo'] == 'activa':
-                total_personas += item['reservacion'].cantidad_personas
-            else:
-                total_personas += item['historial'].cantidad_personas
-        
-        promedio_personas = total_personas / total_reservaciones if total_reservaciones > 0 else 0
-        
-        # Calcular tiempo promedio de estancia
-        tiempos_estancia = []
-        for historial in historial_reservaciones:
-            if historial.hora_liberacion and historial.hora_reservacion:
-                # Calcular diferencia en minutos
-                hora_inicio = historial.hora_reservacion
-                hora_fin = historial.hora_liberacion
-                
-                # Convertir a minutos para facilitar el cálculo
-                inicio_minutos = hora_inicio.hour * 60 + hora_inicio.minute
-                fin_minutos = hora_fin.hour * 60 + hora_fin.minute
-                
-                # Si la hora de fin es menor que la de inicio, asumir que es del día siguiente
-                if fin_minutos < inicio_minutos:
-                    fin_minutos += 24 * 60  # Agregar 24 horas
-                
-                duracion_minutos = fin_minutos - inicio_minutos
-                if duracion_minutos > 0:
-                    tiempos_estancia.append(duracion_minutos)
-        
-        tiempo_promedio_estancia = sum(tiempos_estancia) / len(tiempos_estancia) if tiempos_estancia else 0
+        # Agregados del reporte, calculados a partir de las reservaciones ya cargadas
+        estadisticas = calcular_estadisticas_reporte(todas_reservaciones, historial_reservaciones)
+        total_reservaciones = estadisticas['total_reservaciones']
+        total_personas = estadisticas['total_personas']
+        promedio_personas = estadisticas['promedio_personas']
+        tiempo_promedio_estancia = estadisticas['tiempo_promedio_estancia']
+        ocupacion_por_area = estadisticas['ocupacion_por_area']
         
         # Estadísticas básicas
         ws.merge_cells('A4:B4')
@@ -1231,21 +2435,6 @@ def generar_excel_reservaciones(reservaciones, fecha_inicio, fecha_fin):
         # Crear hoja de información adicional
         ws_info = wb.create_sheet("Información Adicional")
         
-        # Calcular factor de ocupación por área
-        ocupacion_por_area = {}
-        for item in todas_reservaciones:
-            if item['tipo'] == 'activa':
-                area = item['reservacion'].area
-                cantidad = item['reservacion'].cantidad_personas
-            else:
-                area = item['historial'].area
-                cantidad = item['historial'].cantidad_personas
-            
-            if area not in ocupacion_por_area:
-                ocupacion_por_area[area] = {'reservaciones': 0, 'personas': 0}
-            ocupacion_por_area[area]['reservaciones'] += 1
-            ocupacion_por_area[area]['personas'] += cantidad
-        
         # Título de la hoja de información
         ws_info.merge_cells('A1:D1')
         ws_info['A1'] = "INFORMACIÓN ADICIONAL - MÓNACO BAR & GRILL"
@@ -1274,7 +2463,7 @@ def generar_excel_reservaciones(reservaciones, fecha_inicio, fecha_fin):
             row += 1
         
         # Factor de eficiencia
-        reservaciones_completadas = len(historial_reservaciones)
+        reservaciones_completadas = estadisticas['reservaciones_completadas']
         factor_eficiencia = (reservaciones_completadas / total_reservaciones * 100) if total_reservaciones > 0 else 0
         ws_info.cell(row=row, column=1, value="Factor de Eficiencia")
         ws_info.cell(row=row, column=2, value=f"{reservaciones_completadas}/{total_reservaciones}")
@@ -1283,14 +2472,7 @@ def generar_excel_reservaciones(reservaciones, fecha_inicio, fecha_fin):
         row += 1
         
         # Horario más popular
-        horarios = {}
-        for item in todas_reservaciones:
-            if item['tipo'] == 'activa':
-                hora = item['reservacion'].hora_reservacion.strftime('%H:%M')
-            else:
-                hora = item['historial'].hora_reservacion.strftime('%H:%M')
-            horarios[hora] = horarios.get(hora, 0) + 1
-        
+        horarios = estadisticas['horarios']
         if horarios:
             hora_mas_popular = max(horarios, key=horarios.get)
             ws_info.cell(row=row, column=1, value="Horario Más Popular")
@@ -1333,5 +2515,8 @@ def generar_excel_reservaciones(reservaciones, fecha_inicio, fecha_fin):
 
 if __name__ == '__main__':
     with app.app_context():
-        db.create_all()
+        for sucursal in sucursales.por_clave.values():
+            upgrade(x_arg=[f'sucursal={sucursal.clave}'])
+            sucursales.activar(sucursal.clave)
+            reconciliar_mesas_config()
     app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Mueve el historial de reservaciones anterior a los meses activos a sus particiones
+mensuales (instance/historial/historial_AAAA_MM.db) y comprime las más antiguas.
+Las exportaciones y reportes siguen consultando todo el rango a través de
+archivo_historial.consultar(). Pensado para ejecutarse una vez al día o al mes:
+    python archivar_historial.py
+    python archivar_historial.py --meses-activos 6 --meses-sin-comprimir 24
+    python archivar_historial.py --sucursal centro
+"""
+
+import argparse
+
+from app import app, archivo_historial, sucursales, HistorialReservacion, get_restaurant_now
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Archiva el historial de reservaciones por mes')
+    parser.add_argument('--meses-activos', type=int, default=None,
+                        help='Meses (incluido el actual) que se conservan en la base principal')
+    parser.add_argument('--meses-sin-comprimir', type=int, default=None,
+                        help='Antigüedad en meses a partir de la cual se comprimen las particiones')
+    parser.add_argument('--sucursal', default=None, help='Clave de la sucursal (por defecto la principal)')
+    args = parser.parse_args()
+
+    if args.meses_activos is not None:
+        app.config['HISTORIAL_MESES_ACTIVOS'] = args.meses_activos
+    if args.meses_sin_comprimir is not None:
+        app.config['HISTORIAL_MESES_SIN_COMPRIMIR'] = args.meses_sin_comprimir
+
+    with app.app_context():
+        if args.sucursal:
+            sucursales.activar(args.sucursal)
+        hoy = get_restaurant_now().date()
+        print("📦 Archivando historial de reservaciones...")
+        movidos = archivo_historial.archivar(HistorialReservacion, hoy)
+        for mes, total in movidos.items():
+            print(f"   - {mes.strftime('%Y-%m')}: {total} registros")
+        comprimidos = archivo_historial.compactar(hoy)
+        for mes in comprimidos:
+            print(f"   - {mes.strftime('%Y-%m')}: partición comprimida")
+
+        print("✅ Historial archivado exitosamente!")
+        print(f"   - Registros movidos: {sum(movidos.values())}")
+        print(f"   - Particiones comprimidas: {len(comprimidos)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+# Archivo del historial de reservaciones particionado por mes.
+# La tabla historial_reservacion de la base principal solo conserva los meses recientes
+# (HISTORIAL_MESES_ACTIVOS); los meses anteriores se mueven a un archivo SQLite por mes
+# (historial_AAAA_MM.db) con el mismo esquema, compactado con VACUUM y de solo lectura.
+# Las particiones más antiguas (HISTORIAL_MESES_SIN_COMPRIMIR) se guardan comprimidas
+# con gzip y se descomprimen a un directorio temporal la primera vez que se consultan.
+# consultar() envía cada rango de fechas solo a las particiones que lo cubren y por_ids()
+# encuentra los registros archivados que devuelve el índice de búsqueda, que los conserva.
+# Con varias sucursales, las particiones de cada una van en su propio subdirectorio.
+
+import gzip
+import os
+import re
+import shutil
+import stat
+import tempfile
+from datetime import date
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from busqueda import reindexar_filas
+
+PATRON_PARTICION = re.compile(r'^historial_(\d{4})_(\d{2})\.db(\.gz)?$')
+
+
+def inicio_de_mes(fecha, meses_atras=0):
+    """Primer día del mes de `fecha`, desplazado `meses_atras` meses hacia el pasado"""
+    indice = fecha.year * 12 + fecha.month - 1 - meses_atras
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+class ArchivoHistorial:
+    """Enrutador de consultas por rango entre la tabla activa y las particiones mensuales"""
+
+    def __init__(self, app=None, db=None, espacio=None):
+        self._motores = {}
+        if app is not None:
+            self.init_app(app, db, espacio)
+
+    def init_app(self, app, db, espacio=None):
+        """`espacio` retorna el subdirectorio de la sucursal actual (None para el directorio base)"""
+        app.config.setdefault('HISTORIAL_ARCHIVO_DIR', os.path.join(app.instance_path, 'historial'))
+        app.config.setdefault('HISTORIAL_MESES_ACTIVOS', 3)  # mes actual y los dos anteriores
+        app.config.setdefault('HISTORIAL_MESES_SIN_COMPRIMIR', 12)
+        self.app = app
+        self.db = db
+        self.espacio = espacio or (lambda: None)
+        app.extensions['archivo_historial'] = self
+
+    @property
+    def directorio(self):
+        subdirectorio = self.espacio()
+        if subdirectorio:
+            return os.path.join(self.app.config['HISTORIAL_ARCHIVO_DIR'], subdirectorio)
+        return self.app.config['HISTORIAL_ARCHIVO_DIR']
+
+    def _ruta(self, mes, comprimida=False):
+        nombre = f'historial_{mes.year:04d}_{mes.month:02d}.db'
+        return os.path.join(self.directorio, nombre + ('.gz' if comprimida else ''))
+
+    def particiones(self, fecha_inicio=None, fecha_fin=None):
+        """Retorna {mes: ruta} de las particiones que se solapan con el rango (todas si no se indica)"""
+        if not os.path.isdir(self.directorio):
+            return {}
+        encontradas = {}
+        for nombre in os.listdir(self.directorio):
+            coincidencia = PATRON_PARTICION.match(nombre)
+            if not coincidencia:
+                continue
+            mes = date(int(coincidencia.group(1)), int(coincidencia.group(2)), 1)
+            if fecha_inicio is not None and mes < inicio_de_mes(fecha_inicio):
+                continue
+            if fecha_fin is not None and mes > fecha_fin:
+                continue
+            # Si quedaron ambas versiones (compactación interrumpida) se usa la descomprimida
+            if mes not in encontradas or not coincidencia.group(3):
+                encontradas[mes] = os.path.join(self.directorio, nombre)
+        return dict(sorted(encontradas.items()))
+
+    def _motor(self, ruta):
+        """Motor de solo lectura de una partición; las comprimidas se descomprimen una vez a /tmp"""
+        if ruta.endswith('.gz'):
+            destino = os.path.join(tempfile.gettempdir(), 'monaco-historial', self.espacio() or '', os.path.basename(ruta)[:-3])
+            if not os.path.exists(destino) or os.path.getmtime(destino) < os.path.getmtime(ruta):
+                os.makedirs(os.path.dirname(destino), exist_ok=True)
+                with gzip.open(ruta, 'rb') as origen, open(destino + '.tmp', 'wb') as archivo:
+                    shutil.copyfileobj(origen, archivo)
+                os.replace(destino + '.tmp', destino)
+                self._descartar_motor(ruta)
+            ruta_sqlite = destino
+        else:
+            ruta_sqlite = ruta
+        if ruta not in self._motores:
+            self._motores[ruta] = create_engine(f'sqlite:///file:{ruta_sqlite}?mode=ro&uri=true')
+        return self._motores[ruta]
+
+    def _descartar_motor(self, ruta):
+        motor = self._motores.pop(ruta, None)
+        if motor is not None:
+            motor.dispose()
+
+    def consultar(self, modelo, fecha_inicio, fecha_fin):
+        """Registros del historial con fecha_reservacion en [fecha_inicio, fecha_fin], de la
+        tabla activa y de las particiones del rango. Retorna instancias del modelo"""
+        filtro = (modelo.fecha_reservacion >= fecha_inicio, modelo.fecha_reservacion <= fecha_fin)
+        registros = []
+        for ruta in self.particiones(fecha_inicio, fecha_fin).values():
+            with Session(self._motor(ruta)) as sesion:
+                registros.extend(sesion.scalars(select(modelo).where(*filtro)))
+        # Las instancias quedan desligadas de su sesión; solo se leen sus columnas
+        registros.extend(modelo.query.filter(*filtro).all())
+        return registros
+
+    def por_ids(self, modelo, ids):
+        """Registros archivados con los ids dados. Recorre las particiones de la más reciente
+        a la más antigua y se detiene al encontrarlos todos; retorna instancias del modelo"""
+        pendientes = set(ids)
+        registros = []
+        for ruta in reversed(self.particiones().values()):
+            if not pendientes:
+                break
+            with Session(self._motor(ruta)) as sesion:
+                encontrados = sesion.scalars(select(modelo).where(modelo.id.in_(pendientes))).all()
+            registros.extend(encontrados)
+            pendientes.difference_update(registro.id for registro in encontrados)
+        return registros
+
+    def mayor_id(self, tabla):
+        """Mayor id de `tabla` en las particiones (0 si no hay ninguna)"""
+        mayor = 0
+        for ruta in self.particiones().values():
+            with self._motor(ruta).connect() as conexion:
+                mayor = max(mayor, conexion.execute(select(func.max(tabla.c.id))).scalar() or 0)
+        return mayor
+
+    def filas_archivadas(self, consulta):
+        """Ejecuta una consulta SELECT en cada partición, de la más antigua a la más reciente,
+        y genera sus filas (para procesos en lote que recorren todo el historial)"""
+        for ruta in self.particiones().values():
+            with self._motor(ruta).connect() as conexion:
+                yield from conexion.execute(consulta)
+
+    def _abrir_para_escritura(self, mes, tabla):
+        """Motor de escritura de la partición del mes (la crea si no existe)"""
+        os.makedirs(self.directorio, exist_ok=True)
+        ruta = self._ruta(mes)
+        comprimida = self._ruta(mes, comprimida=True)
+        if not os.path.exists(ruta) and os.path.exists(comprimida):
+            # Llegaron registros de un mes ya comprimido: se vuelve a trabajar sobre el .db
+            with gzip.open(comprimida, 'rb') as origen, open(ruta, 'wb') as archivo:
+                shutil.copyfileobj(origen, archivo)
+            os.remove(comprimida)
+            self._descartar_motor(comprimida)
+        if os.path.exists(ruta):
+            os.chmod(ruta, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH)
+        self._descartar_motor(ruta)
+        motor = create_engine(f'sqlite:///{ruta}')
+        tabla.create(motor, checkfirst=True)
+        return ruta, motor
+
+    def archivar(self, modelo, hoy):
+        """Mueve a sus particiones los registros anteriores a los meses activos. Los ids se
+        conservan (la tabla no los reutiliza, ver HistorialReservacion), así que repetir la
+        operación tras una interrupción no duplica filas; un id ya archivado con otro
+        contenido es un error y no se sobrescribe. Retorna {mes: registros movidos}"""
+        limite = inicio_de_mes(hoy, self.app.config['HISTORIAL_MESES_ACTIVOS'] - 1)
+        tabla = modelo.__table__
+        sesion = self.db.session
+
+        meses = sesion.execute(
+            select(modelo.fecha_reservacion).where(modelo.fecha_reservacion < limite).distinct()
+        ).scalars()
+        movidos = {}
+        for mes in sorted({inicio_de_mes(fecha) for fecha in meses}):
+            siguiente = date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+            filtro = (tabla.c.fecha_reservacion >= mes, tabla.c.fecha_reservacion < siguiente)
+            filas = [dict(fila._mapping) for fila in sesion.execute(select(*tabla.columns).where(*filtro))]
+
+            ruta, motor = self._abrir_para_escritura(mes, tabla)
+            try:
+                with motor.begin() as conexion:
+                    # Las que ya están (una corrida interrumpida antes de borrarlas) se omiten
+                    archivadas = {fila.id: dict(fila._mapping) for fila in conexion.execute(select(*tabla.columns))}
+                    distintas = [fila['id'] for fila in filas if archivadas.get(fila['id'], fila) != fila]
+                    if distintas:
+                        raise RuntimeError(f'Ids ya archivados con otro registro en {ruta}: {distintas[:10]}')
+                    nuevas = [fila for fila in filas if fila['id'] not in archivadas]
+                    if nuevas:
+                        conexion.execute(tabla.insert(), nuevas)
+                with motor.connect() as conexion:
+                    conexion.exec_driver_sql('VACUUM')
+            finally:
+                motor.dispose()
+                os.chmod(ruta, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+            # Solo se borran de la tabla activa después de que la partición quedó escrita.
+            # El trigger de borrado los quita del índice de búsqueda; se vuelven a indexar
+            # en la misma transacción para que /api/buscar los siga encontrando
+            sesion.execute(tabla.delete().where(*filtro))
+            reindexar_filas(sesion.connection(), tabla.name, filas)
+            sesion.commit()
+            movidos[mes] = len(filas)
+        return movidos
+
+    def compactar(self, hoy):
+        """Comprime con gzip las particiones más antiguas que HISTORIAL_MESES_SIN_COMPRIMIR.
+        Retorna los meses comprimidos"""
+        limite = inicio_de_mes(hoy, self.app.config['HISTORIAL_MESES_SIN_COMPRIMIR'])
+        comprimidos = []
+        for mes, ruta in self.particiones(fecha_fin=limite).items():
+            if mes >= limite or ruta.endswith('.gz'):
+                continue
+            destino = self._ruta(mes, comprimida=True)
+            with open(ruta, 'rb') as origen, gzip.open(destino + '.tmp', 'wb', compresslevel=9) as archivo:
+                shutil.copyfileobj(origen, archivo)
+            os.replace(destino + '.tmp', destino)
+            os.chmod(destino, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            self._descartar_motor(ruta)
+            os.chmod(ruta, stat.S_IRUSR | stat.S_IWUSR)
+            os.remove(ruta)
+            comprimidos.append(mes)
+        return comprimidos
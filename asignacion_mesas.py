@@ -0,0 +1,175 @@
+# Asignación automática de mesas para reservaciones.
+# Un candidato es una mesa o un grupo de hasta MAX_MESAS_UNIDAS mesas vecinas en el layout
+# (misma área, posiciones a distancia 1 en la cuadrícula de mesas_config). Los candidatos
+# se generan una vez por día y se recorren ordenados por capacidad, así que el primero
+# libre con menos asientos sobrantes es el mejor ajuste (bin packing). La agenda de cada
+# mesa son los minutos de inicio ordenados de sus reservaciones del día; comprobar si está
+# libre es una búsqueda binaria con la regla de DURACION_RESERVACION (franjas_ocupacion.py).
+# optimizar() reacomoda una noche completa: coloca las reservaciones fijas (ya iniciadas o
+# con mesa ocupada), arma un plan nuevo por hora de inicio y, si alguna no cabe, parte del
+# plan actual; después mueve una reservación a la vez mientras haya un candidato mejor.
+
+from bisect import bisect_left, insort
+
+MAX_MESAS_UNIDAS = 3
+
+
+class Candidato:
+    __slots__ = ('mesas_ids', 'numeros', 'capacidad', 'area')
+
+    def __init__(self, mesas):
+        mesas = sorted(mesas, key=lambda mesa: mesa['numero'])
+        self.mesas_ids = tuple(mesa['id'] for mesa in mesas)
+        self.numeros = tuple(mesa['numero'] for mesa in mesas)
+        self.capacidad = sum(mesa['capacidad'] for mesa in mesas)
+        self.area = mesas[0]['area']
+
+    def to_dict(self):
+        return {
+            'mesa_id': self.mesas_ids[0],
+            'mesas_ids': list(self.mesas_ids),
+            'mesas_numeros': list(self.numeros),
+            'capacidad': self.capacidad,
+            'area': self.area
+        }
+
+
+def generar_candidatos(mesas, max_mesas=MAX_MESAS_UNIDAS):
+    """Mesas solas y grupos conexos de mesas vecinas, ordenados por capacidad.
+    `mesas` son dicts con id, numero, capacidad, area, posicion_x y posicion_y"""
+    por_posicion = {(mesa['area'], mesa['posicion_x'], mesa['posicion_y']): mesa for mesa in mesas}
+    vecinas = {}
+    for mesa in mesas:
+        x, y = mesa['posicion_x'], mesa['posicion_y']
+        vecinas[mesa['id']] = [
+            por_posicion[(mesa['area'], x + dx, y + dy)]['id']
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+            if (mesa['area'], x + dx, y + dy) in por_posicion
+        ]
+
+    grupos = {frozenset([mesa['id']]) for mesa in mesas}
+    nivel = grupos
+    for _ in range(max_mesas - 1):
+        nivel = {grupo | {vecina} for grupo in nivel for mesa_id in grupo for vecina in vecinas[mesa_id]
+                 if vecina not in grupo}
+        grupos |= nivel
+
+    por_id = {mesa['id']: mesa for mesa in mesas}
+    candidatos = [Candidato([por_id[mesa_id] for mesa_id in grupo]) for grupo in grupos]
+    candidatos.sort(key=lambda candidato: (candidato.capacidad, len(candidato.mesas_ids), candidato.numeros))
+    return candidatos
+
+
+class AsignadorMesas:
+    """Candidatos de un layout y agenda de un día"""
+
+    def __init__(self, mesas, duracion, ventana, max_mesas=MAX_MESAS_UNIDAS):
+        """`duracion` en minutos; `ventana` = (primer minuto, último minuto) del servicio"""
+        self.duracion = duracion
+        self.ventana = ventana
+        self.candidatos = generar_candidatos(mesas, max_mesas)
+        self.por_mesas = {frozenset(candidato.mesas_ids): candidato for candidato in self.candidatos}
+        self.agenda = {}
+
+    def copia_vacia(self):
+        """Asignador con los mismos candidatos y la agenda vacía (para otra fecha)"""
+        copia = object.__new__(AsignadorMesas)
+        copia.duracion, copia.ventana = self.duracion, self.ventana
+        copia.candidatos, copia.por_mesas = self.candidatos, self.por_mesas
+        copia.agenda = {}
+        return copia
+
+    def ocupar(self, mesas_ids, minuto):
+        for mesa_id in mesas_ids:
+            insort(self.agenda.setdefault(mesa_id, []), minuto)
+
+    def liberar(self, mesas_ids, minuto):
+        for mesa_id in mesas_ids:
+            self.agenda[mesa_id].remove(minuto)
+
+    def libre(self, mesa_id, minuto):
+        """True si ninguna reservación de la mesa empieza a menos de `duracion` de `minuto`"""
+        inicios = self.agenda.get(mesa_id)
+        if not inicios:
+            return True
+        i = bisect_left(inicios, minuto - self.duracion + 1)
+        return i == len(inicios) or inicios[i] >= minuto + self.duracion
+
+    def holgura(self, mesa_id, minuto):
+        """Minutos libres que quedarían pegados a la reservación (antes y después).
+        Menos holgura deja bloques largos libres en otras mesas"""
+        inicios = self.agenda.get(mesa_id, ())
+        i = bisect_left(inicios, minuto)
+        anterior = inicios[i - 1] + self.duracion if i else self.ventana[0]
+        siguiente = inicios[i] if i < len(inicios) else self.ventana[1] + self.duracion
+        return max(minuto - anterior, 0) + max(siguiente - minuto - self.duracion, 0)
+
+    def mejor(self, personas, minuto, area=None, bloqueadas=(), preferidas=()):
+        """Candidato libre con menos asientos sobrantes y menos mesas; empata por holgura.
+        `preferidas` (las mesas actuales de la reservación) gana los empates para no moverla"""
+        preferidas = frozenset(preferidas)
+        mejor, mejor_clave = None, None
+        for candidato in self.candidatos:
+            if candidato.capacidad < personas or (area is not None and candidato.area != area):
+                continue
+            if mejor is not None and candidato.capacidad > mejor.capacidad:
+                break  # ya no puede tener menos asientos sobrantes
+            if any(mesa_id in bloqueadas or not self.libre(mesa_id, minuto) for mesa_id in candidato.mesas_ids):
+                continue
+            clave = (
+                len(candidato.mesas_ids),
+                frozenset(candidato.mesas_ids) != preferidas,
+                sum(self.holgura(mesa_id, minuto) for mesa_id in candidato.mesas_ids)
+            )
+            if mejor_clave is None or clave < mejor_clave:
+                mejor, mejor_clave = candidato, clave
+        return mejor
+
+    def optimizar(self, reservaciones, pasadas=3):
+        """Reacomoda las reservaciones de un día sobre una agenda vacía.
+
+        `reservaciones` son dicts con id, personas, minuto, area, mesas_ids (actuales) y fija.
+        Las mesas actuales de las que no son fijas deben ser un candidato (ver por_mesas).
+        Las fijas conservan sus mesas y no aparecen en el resultado. Retorna {id: Candidato}"""
+        for reservacion in reservaciones:
+            if reservacion['fija']:
+                self.ocupar(reservacion['mesas_ids'], reservacion['minuto'])
+        pendientes = [reservacion for reservacion in reservaciones if not reservacion['fija']]
+
+        # Plan nuevo en orden de inicio (como en la partición de intervalos)
+        plan = {}
+        for reservacion in sorted(pendientes, key=lambda r: (r['minuto'], -r['personas'], r['id'])):
+            candidato = self.mejor(reservacion['personas'], reservacion['minuto'], reservacion['area'],
+                                   preferidas=reservacion['mesas_ids'])
+            if candidato is None:
+                break
+            self.ocupar(candidato.mesas_ids, reservacion['minuto'])
+            plan[reservacion['id']] = candidato
+        if len(plan) < len(pendientes):
+            # Alguna no cupo: se deshace el plan nuevo y se parte del actual, que es válido
+            for reservacion in pendientes:
+                if reservacion['id'] in plan:
+                    self.liberar(plan[reservacion['id']].mesas_ids, reservacion['minuto'])
+            plan = {}
+            for reservacion in pendientes:
+                plan[reservacion['id']] = self.por_mesas[frozenset(reservacion['mesas_ids'])]
+                self.ocupar(reservacion['mesas_ids'], reservacion['minuto'])
+
+        # Mejoras de una reservación a la vez, de mayor a menor: su lugar actual sigue libre
+        # al quitarla, así que nunca se queda sin mesa y solo cambia por uno estrictamente mejor
+        pendientes.sort(key=lambda r: (-r['personas'], r['minuto'], r['id']))
+        for _ in range(pasadas):
+            cambios = 0
+            for reservacion in pendientes:
+                actual = plan[reservacion['id']]
+                self.liberar(actual.mesas_ids, reservacion['minuto'])
+                # Si el plan actual ya traía un traslape, la reservación se queda donde está
+                candidato = self.mejor(reservacion['personas'], reservacion['minuto'], reservacion['area'],
+                                       preferidas=actual.mesas_ids) or actual
+                self.ocupar(candidato.mesas_ids, reservacion['minuto'])
+                if candidato is not actual:
+                    plan[reservacion['id']] = candidato
+                    cambios += 1
+            if not cambios:
+                break
+        return plan
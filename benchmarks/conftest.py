@@ -0,0 +1,145 @@
+"""
+Fixtures de la suite de benchmarks: base de datos SQLite generada de tamaño
+configurable, cliente de pruebas de Flask y medición con líneas base en JSON.
+
+Variables de entorno:
+    BENCH_MESAS                Mesas de la configuración a usar (por defecto todas)
+    BENCH_DIAS                 Días de datos alrededor de hoy (por defecto 30)
+    BENCH_RESERVACIONES_DIA    Reservaciones por día (por defecto 40)
+    BENCH_REPETICIONES         Repeticiones medidas por caso (por defecto 15)
+    BENCH_TOLERANCIA           Regresión permitida sobre la mediana base (por defecto 0.25)
+    BENCH_GUARDAR_BASE         Si es 1, guarda los resultados como nueva línea base
+"""
+
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pytest
+
+# La base de datos debe configurarse antes de importar la app
+DIRECTORIO_BENCH = os.path.dirname(os.path.abspath(__file__))
+RUTA_BD = os.path.join(tempfile.mkdtemp(prefix='monaco_bench_'), 'benchmark.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{RUTA_BD}'
+sys.path.insert(0, os.path.dirname(DIRECTORIO_BENCH))
+
+from app import app, db  # noqa: E402
+from generador_datos import generar_datos  # noqa: E402
+
+# El registro de eventos también va al directorio temporal, no a instance/
+app.config['EVENTOS_DB'] = os.path.join(os.path.dirname(RUTA_BD), 'eventos.db')
+
+RUTA_BASE = os.path.join(DIRECTORIO_BENCH, 'baseline.json')
+RUTA_RESULTADOS = os.path.join(DIRECTORIO_BENCH, 'resultados.json')
+
+DATASET = {
+    'mesas': int(os.environ.get('BENCH_MESAS', 0)) or None,
+    'dias': int(os.environ.get('BENCH_DIAS', 30)),
+    'reservaciones_dia': int(os.environ.get('BENCH_RESERVACIONES_DIA', 40))
+}
+REPETICIONES = int(os.environ.get('BENCH_REPETICIONES', 15))
+TOLERANCIA = float(os.environ.get('BENCH_TOLERANCIA', 0.25))
+
+
+def generar_base_datos(mesas=None, dias=30, reservaciones_dia=40):
+    """Base de datos limpia con `dias` días de datos centrados en hoy: los días
+    pasados van al historial y los demás a reservaciones."""
+    db.drop_all()
+    db.create_all()
+    generar_datos(
+        dias_pasados=dias // 2,
+        dias_futuros=dias - dias // 2,
+        reservaciones_dia=reservaciones_dia,
+        mesas=mesas
+    )
+
+
+class Benchmark:
+    """Mide una función varias veces y compara la mediana y las consultas SQL con la línea base"""
+
+    def __init__(self, resultados, base):
+        self.resultados = resultados
+        self.base = base
+
+    def __call__(self, nombre, funcion, preparar=None, repeticiones=REPETICIONES):
+        # Una ejecución de calentamiento (caches de SQLAlchemy, plantillas, etc.)
+        if preparar:
+            preparar()
+        funcion()
+
+        tiempos, consultas = [], 0
+        resultado = None
+        for _ in range(repeticiones):
+            if preparar:
+                preparar()
+            inicio = time.perf_counter()
+            resultado = funcion()
+            tiempos.append(time.perf_counter() - inicio)
+            consultas = max(consultas, contar_consultas(resultado))
+
+        medicion = {
+            'mediana_ms': statistics.median(tiempos) * 1000,
+            'min_ms': min(tiempos) * 1000,
+            'max_ms': max(tiempos) * 1000,
+            'consultas_sql': consultas
+        }
+        self.resultados[nombre] = medicion
+
+        referencia = self.base.get(nombre)
+        if referencia:
+            limite = referencia['mediana_ms'] * (1 + TOLERANCIA)
+            if medicion['mediana_ms'] > limite:
+                pytest.fail(
+                    f"{nombre}: mediana {medicion['mediana_ms']:.2f}ms supera la línea base "
+                    f"{referencia['mediana_ms']:.2f}ms (+{TOLERANCIA:.0%})"
+                )
+            if medicion['consultas_sql'] > referencia['consultas_sql']:
+                pytest.fail(
+                    f"{nombre}: {medicion['consultas_sql']} consultas SQL, "
+                    f"la línea base tiene {referencia['consultas_sql']}"
+                )
+        return resultado
+
+
+def contar_consultas(respuesta):
+    """Lee el número de consultas SQL del encabezado Server-Timing de la respuesta"""
+    encabezado = getattr(respuesta, 'headers', {}).get('Server-Timing', '')
+    if 'desc="' not in encabezado:
+        return 0
+    return int(encabezado.split('desc="')[1].split(' ')[0])
+
+
+@pytest.fixture(scope='session')
+def cliente():
+    app.config['TESTING'] = True
+    app.config['METRICAS_SERVER_TIMING'] = True
+    with app.app_context():
+        # Nunca generar datos sobre una base distinta a la temporal
+        assert db.engine.url.database == RUTA_BD, 'La app no usa la base de datos de benchmarks'
+        generar_base_datos(**DATASET)
+        yield app.test_client()
+
+
+@pytest.fixture(scope='session')
+def benchmark(cliente):
+    base = {}
+    if os.path.exists(RUTA_BASE):
+        with open(RUTA_BASE, encoding='utf-8') as archivo:
+            contenido = json.load(archivo)
+        # Solo se compara contra líneas base del mismo tamaño de datos
+        if contenido.get('dataset') == DATASET:
+            base = contenido.get('resultados', {})
+
+    resultados = {}
+    yield Benchmark(resultados, base)
+
+    salida = {'dataset': DATASET, 'fecha': datetime.utcnow().isoformat(), 'resultados': resultados}
+    with open(RUTA_RESULTADOS, 'w', encoding='utf-8') as archivo:
+        json.dump(salida, archivo, indent=2, ensure_ascii=False)
+    if os.environ.get('BENCH_GUARDAR_BASE') == '1':
+        with open(RUTA_BASE, 'w', encoding='utf-8') as archivo:
+            json.dump(salida, archivo, indent=2, ensure_ascii=False)
@@ -0,0 +1,224 @@
+"""
+Benchmarks de las rutas críticas de la API con el cliente de pruebas de Flask.
+
+Ejecutar con:
+    python -m pytest benchmarks -q
+    BENCH_GUARDAR_BASE=1 python -m pytest benchmarks -q   # guardar línea base
+"""
+
+import io
+from datetime import datetime, timedelta, time as dt_time
+from itertools import count
+
+from app import db, Mesa, Reservacion, get_restaurant_now
+from conftest import DATASET
+
+
+def _reservaciones_pasadas():
+    """Inserta una reservación de ayer por mesa para que las tareas de limpieza tengan trabajo"""
+    ayer = get_restaurant_now().date() - timedelta(days=1)
+    db.session.execute(db.insert(Reservacion), [
+        {
+            'mesa_id': mesa.id,
+            'hora_reservacion': dt_time(20, 0),
+            'area': mesa.ubicacion,
+            'cantidad_personas': 2,
+            'nombre_reservador': 'Cliente pasado',
+            'fecha_reservacion': ayer,
+            'fecha_creacion': datetime.utcnow()
+        }
+        for mesa in Mesa.query.all()
+    ])
+    db.session.commit()
+
+
+def _rango_exportacion():
+    hoy = get_restaurant_now().date()
+    return {
+        'fecha_inicio': (hoy - timedelta(days=DATASET['dias'] // 2)).strftime('%Y-%m-%d'),
+        'fecha_fin': (hoy + timedelta(days=DATASET['dias'] // 2)).strftime('%Y-%m-%d')
+    }
+
+
+def test_api_mesas(cliente, benchmark):
+    respuesta = benchmark('api_mesas', lambda: cliente.get('/api/mesas'))
+    assert respuesta.status_code == 200
+
+
+def test_api_mesas_por_area(cliente, benchmark):
+    for area in ('interior', 'jardin', 'reservados'):
+        respuesta = benchmark(f'api_mesas_area_{area}', lambda: cliente.get(f'/api/mesas/area/{area}'))
+        assert respuesta.status_code == 200
+
+
+def test_api_reservaciones_por_fecha(cliente, benchmark):
+    fecha = get_restaurant_now().date().strftime('%Y-%m-%d')
+    respuesta = benchmark('api_reservaciones_fecha', lambda: cliente.get(f'/api/reservaciones?fecha={fecha}'))
+    assert respuesta.status_code == 200
+
+
+def test_api_dia(cliente, benchmark):
+    fecha = (get_restaurant_now().date() + timedelta(days=1)).strftime('%Y-%m-%d')
+    respuesta = benchmark('api_dia', lambda: cliente.get(f'/api/dia/{fecha}'))
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['mesas']
+
+
+def test_api_calendario(cliente, benchmark):
+    desde = get_restaurant_now().date().strftime('%Y-%m-%d')
+    respuesta = benchmark('api_calendario', lambda: cliente.get(f'/api/calendario?desde={desde}&personas=6'))
+    assert respuesta.status_code == 200
+    assert len(respuesta.get_json()['dias']) == 31
+
+
+def test_api_ocupacion(cliente, benchmark):
+    fecha = (get_restaurant_now().date() + timedelta(days=1)).strftime('%Y-%m-%d')
+    respuesta = benchmark('api_ocupacion', lambda: cliente.get(f'/api/ocupacion/{fecha}'))
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['mesas']
+
+
+def test_api_buscar(cliente, benchmark):
+    respuesta = benchmark('api_buscar', lambda: cliente.get('/api/buscar?q=clien 602'))
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()
+
+
+def test_crear_reservacion(cliente, benchmark):
+    mesa = Mesa.query.filter(Mesa.capacidad > 0).first()
+    # Cada iteración reserva un día distinto, lejos del rango generado, para no chocar
+    dias = count(DATASET['dias'] + 1)
+
+    def crear():
+        fecha = get_restaurant_now().date() + timedelta(days=next(dias))
+        return cliente.post('/api/reservaciones', json={
+            'mesa_id': mesa.id,
+            'hora_reservacion': '20:00',
+            'area': mesa.ubicacion,
+            'cantidad_personas': 2,
+            'nombre_reservador': 'Benchmark',
+            'fecha_reservacion': fecha.strftime('%Y-%m-%d')
+        })
+
+    respuesta = benchmark('crear_reservacion', crear)
+    assert respuesta.status_code == 201
+
+
+def test_sugerir_mesa(cliente, benchmark):
+    fecha = (get_restaurant_now().date() + timedelta(days=1)).strftime('%Y-%m-%d')
+    respuesta = benchmark('sugerir_mesa', lambda: cliente.get(f'/api/reservaciones/asignacion?fecha={fecha}&hora=20:00&personas=10'))
+    assert respuesta.status_code in (200, 409)
+
+
+def test_optimizar_noche(cliente, benchmark):
+    # Un sábado lleno, lejos del rango generado: reservaciones repartidas a mano en el
+    # primer turno libre de cada mesa, para que el optimizador tenga que reacomodar
+    fecha = get_restaurant_now().date() + timedelta(days=DATASET['dias'] + 400)
+    turnos = [dt_time(hora, minuto) for hora in range(13, 23) for minuto in (0, 30)]
+    mesas = Mesa.query.filter(Mesa.activa, Mesa.capacidad > 0).all()
+    filas = []
+    for mesa in mesas:
+        for i, turno in enumerate(turnos[::4]):
+            filas.append({
+                'mesa_id': mesa.id,
+                'hora_reservacion': turno,
+                'area': mesa.ubicacion,
+                'cantidad_personas': 2 + (mesa.id + i) % 3,
+                'nombre_reservador': 'Sábado',
+                'fecha_reservacion': fecha,
+                'fecha_creacion': datetime.utcnow()
+            })
+    db.session.execute(db.insert(Reservacion), filas)
+    db.session.commit()
+
+    datos = {'fecha': fecha.strftime('%Y-%m-%d'), 'simular': True}
+    respuesta = benchmark('optimizar_noche', lambda: cliente.post('/api/reservaciones/optimizar', json=datos), repeticiones=5)
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['reservaciones'] == len(filas)
+    # Una noche completa se reacomoda en menos de un segundo
+    assert benchmark.resultados['optimizar_noche']['mediana_ms'] < 1000
+
+
+def test_importar_reservaciones(cliente, benchmark):
+    # Un evento de agencia: 1000 filas repartidas en un mes lejano, la mitad con mesa fija
+    inicio = get_restaurant_now().date() + timedelta(days=DATASET['dias'] + 500)
+    mesas = Mesa.query.filter(Mesa.activa, Mesa.capacidad >= 4).all()
+    lineas = ['fecha;hora;personas;nombre;telefono;mesa']
+    for i in range(1000):
+        fecha = inicio + timedelta(days=i % 30)
+        mesa = mesas[i % len(mesas)].numero if i % 2 else ''
+        lineas.append(f'{fecha:%d/%m/%Y};{13 + (i // 30) % 10}:00;4;Agencia {i % 40};55{i % 300:08d};{mesa}')
+    contenido = '\n'.join(lineas).encode()
+
+    respuesta = benchmark(
+        'importar_reservaciones',
+        lambda: cliente.post('/api/reservaciones/importar?simular=1',
+                             data={'archivo': (io.BytesIO(contenido), 'evento.csv')},
+                             content_type='multipart/form-data'),
+        repeticiones=5
+    )
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['filas'] == 1000
+
+
+def test_limpiar_reservaciones_pasadas(cliente, benchmark):
+    respuesta = benchmark(
+        'limpiar_reservaciones_pasadas',
+        lambda: cliente.post('/api/limpiar-reservaciones-pasadas'),
+        preparar=_reservaciones_pasadas,
+        repeticiones=5
+    )
+    assert respuesta.status_code == 200
+
+
+def test_liberar_reservaciones_lote(cliente, benchmark):
+    # Cerrar un área completa: cuatro turnos por mesa en una fecha fuera del rango generado
+    fecha = get_restaurant_now().date() + timedelta(days=DATASET['dias'] + 600)
+
+    def reservaciones_del_area():
+        db.session.execute(db.insert(Reservacion), [
+            {
+                'mesa_id': mesa.id,
+                'hora_reservacion': dt_time(hora, 0),
+                'area': mesa.ubicacion,
+                'cantidad_personas': 2,
+                'nombre_reservador': 'Cliente jardín',
+                'fecha_reservacion': fecha,
+                'fecha_creacion': datetime.utcnow()
+            }
+            for mesa in Mesa.query.filter_by(ubicacion='jardin') for hora in (14, 16, 18, 20)
+        ])
+        db.session.commit()
+
+    datos = {'fecha': fecha.strftime('%Y-%m-%d'), 'area': 'jardin', 'motivo': 'Lluvia'}
+    respuesta = benchmark(
+        'liberar_reservaciones_lote',
+        lambda: cliente.post('/api/reservaciones/liberar-lote', json=datos),
+        preparar=reservaciones_del_area,
+        repeticiones=5
+    )
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['liberadas'] == 4 * Mesa.query.filter_by(ubicacion='jardin').count()
+
+
+def test_actualizar_estado_mesas(cliente, benchmark):
+    respuesta = benchmark(
+        'actualizar_estado_mesas',
+        lambda: cliente.post('/api/actualizar-estado-mesas'),
+        preparar=_reservaciones_pasadas,
+        repeticiones=5
+    )
+    assert respuesta.status_code == 200
+
+
+def test_exportar_pdf(cliente, benchmark):
+    datos = {'formato': 'pdf', **_rango_exportacion()}
+    respuesta = benchmark('exportar_pdf', lambda: cliente.post('/api/exportar-reservaciones', json=datos), repeticiones=3)
+    assert respuesta.status_code == 200
+    assert respuesta.mimetype == 'application/pdf'
+
+
+def test_exportar_excel(cliente, benchmark):
+    datos = {'formato': 'excel', **_rango_exportacion()}
+    respuesta = benchmark('exportar_excel', lambda: cliente.post('/api/exportar-reservaciones', json=datos), repeticiones=3)
+    assert respuesta.status_code == 200
@@ -0,0 +1,122 @@
+# Índice de búsqueda de texto completo (SQLite FTS5) sobre reservaciones e historial.
+# Indexa nombre_reservador, telefono (solo dígitos) y nota de ambas tablas en una
+# tabla virtual que los triggers mantienen sincronizada, incluso con inserciones en
+# bloque. El rowid identifica el origen: par = Reservacion, impar = HistorialReservacion.
+# La tokenización unicode61 con remove_diacritics hace que "perez" encuentre "Pérez".
+
+import re
+
+from sqlalchemy import event, text
+
+TABLA_BUSQUEDA = 'busqueda_reservaciones'
+
+# SQLite no tiene reemplazo por expresión regular; se quitan los separadores comunes
+_SOLO_DIGITOS = "replace(replace(replace(replace(replace(replace(coalesce({col}, ''), '-', ''), ' ', ''), '(', ''), ')', ''), '+', ''), '.', '')"
+
+_TABLAS = {
+    # tabla origen -> expresión del rowid en el índice
+    'reservacion': '{fila}.id * 2',
+    'historial_reservacion': '{fila}.id * 2 + 1'
+}
+
+
+def _sentencias_indice():
+    sentencias = [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA_BUSQUEDA} USING fts5(
+            nombre_reservador, telefono, nota,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )"""
+    ]
+    for tabla, rowid in _TABLAS.items():
+        valores = (
+            f"{rowid.format(fila='new')}, new.nombre_reservador, "
+            f"{_SOLO_DIGITOS.format(col='new.telefono')}, coalesce(new.nota, '')"
+        )
+        borrar = f"DELETE FROM {TABLA_BUSQUEDA} WHERE rowid = {rowid.format(fila='old')};"
+        insertar = f"INSERT INTO {TABLA_BUSQUEDA} (rowid, nombre_reservador, telefono, nota) VALUES ({valores});"
+        sentencias += [
+            f"CREATE TRIGGER IF NOT EXISTS {tabla}_busqueda_ai AFTER INSERT ON {tabla} BEGIN {insertar} END",
+            f"CREATE TRIGGER IF NOT EXISTS {tabla}_busqueda_ad AFTER DELETE ON {tabla} BEGIN {borrar} END",
+            f"CREATE TRIGGER IF NOT EXISTS {tabla}_busqueda_au AFTER UPDATE OF nombre_reservador, telefono, nota ON {tabla} "
+            f"BEGIN {borrar} {insertar} END"
+        ]
+    return sentencias
+
+
+def crear_indice_busqueda(conexion, reconstruir=False):
+    """Crea la tabla FTS5 y los triggers si no existen. Con reconstruir=True vuelve a
+    indexar todas las filas existentes (bases de datos creadas antes del índice)"""
+    for sentencia in _sentencias_indice():
+        conexion.execute(text(sentencia))
+    if reconstruir:
+        conexion.execute(text(f'DELETE FROM {TABLA_BUSQUEDA}'))
+        for tabla, rowid in _TABLAS.items():
+            conexion.execute(text(
+                f"INSERT INTO {TABLA_BUSQUEDA} (rowid, nombre_reservador, telefono, nota) "
+                f"SELECT {rowid.format(fila=tabla)}, nombre_reservador, "
+                f"{_SOLO_DIGITOS.format(col='telefono')}, coalesce(nota, '') FROM {tabla}"
+            ))
+
+
+def reindexar_filas(conexion, tabla, filas):
+    """Vuelve a indexar filas (dicts con id, nombre_reservador, telefono y nota) que el
+    trigger de borrado quitó del índice, p. ej. el historial movido a las particiones"""
+    if not filas or conexion.dialect.name != 'sqlite':
+        return
+    existe = conexion.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nombre"
+    ), {'nombre': TABLA_BUSQUEDA}).first()
+    if existe is None:
+        return
+    conexion.execute(text(
+        f"INSERT INTO {TABLA_BUSQUEDA} (rowid, nombre_reservador, telefono, nota) "
+        f"SELECT {_TABLAS[tabla].format(fila='fila')}, nombre_reservador, "
+        f"{_SOLO_DIGITOS.format(col='telefono')}, coalesce(nota, '') "
+        f"FROM (SELECT :id AS id, :nombre_reservador AS nombre_reservador, :telefono AS telefono, :nota AS nota) AS fila"
+    ), [{campo: fila[campo] for campo in ('id', 'nombre_reservador', 'telefono', 'nota')} for fila in filas])
+
+
+def eliminar_indice_busqueda(conexion):
+    conexion.execute(text(f'DROP TABLE IF EXISTS {TABLA_BUSQUEDA}'))
+
+
+def registrar_indice_busqueda(metadata):
+    """Crea/elimina el índice junto con las tablas en create_all/drop_all (solo SQLite)"""
+    @event.listens_for(metadata, 'after_create')
+    def _crear(target, conexion, **kw):
+        if conexion.dialect.name == 'sqlite':
+            crear_indice_busqueda(conexion)
+
+    @event.listens_for(metadata, 'before_drop')
+    def _eliminar(target, conexion, **kw):
+        if conexion.dialect.name == 'sqlite':
+            eliminar_indice_busqueda(conexion)
+
+
+def consulta_fts(texto):
+    """Convierte el texto del usuario en una expresión MATCH: cada palabra es un prefijo
+    y todas deben aparecer; las palabras numéricas se buscan en el teléfono"""
+    terminos = []
+    for palabra in texto.split():
+        digitos = re.sub(r'[-()+.]', '', palabra)
+        if digitos.isdigit():
+            terminos.append(f'telefono : "{digitos}"*')
+        else:
+            palabra = palabra.replace('"', '')
+            if palabra:
+                terminos.append(f'"{palabra}"*')
+    return ' AND '.join(terminos)
+
+
+def buscar(conexion, texto, limite=20):
+    """Retorna [(tabla, id)] ordenado por relevancia; tabla es 'reservacion' o 'historial_reservacion'"""
+    expresion = consulta_fts(texto)
+    if not expresion:
+        return []
+    filas = conexion.execute(text(
+        f'SELECT rowid FROM {TABLA_BUSQUEDA} WHERE {TABLA_BUSQUEDA} MATCH :expresion ORDER BY rank LIMIT :limite'
+    ), {'expresion': expresion, 'limite': limite})
+    return [
+        ('historial_reservacion' if rowid % 2 else 'reservacion', rowid // 2)
+        for (rowid,) in filas
+    ]
@@ -0,0 +1,154 @@
+# Cache del lado del servidor con backends intercambiables.
+# - CacheLRU: en memoria del proceso, sin dependencias (valor por defecto)
+# - CacheRedis: compartido entre workers; requiere el paquete `redis`
+#   (o un cliente compatible como fakeredis.FakeRedis para pruebas)
+# Cada entrada puede tener TTL y etiquetas; invalidar una etiqueta elimina
+# todas las entradas asociadas a ella.
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # Redis es opcional
+    redis = None
+
+
+class CacheLRU:
+    """Cache LRU en memoria con TTL e invalidación por etiquetas, seguro entre hilos"""
+
+    def __init__(self, max_entradas=1024):
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()  # clave -> (valor, expira, etiquetas)
+        self._etiquetas = {}  # etiqueta -> conjunto de claves
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            valor, expira, _ = entrada
+            if expira is not None and expira <= time.monotonic():
+                self._eliminar(clave)
+                return None
+            self._entradas.move_to_end(clave)
+            return valor
+
+    def set(self, clave, valor, ttl=None, tags=()):
+        expira = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if clave in self._entradas:
+                self._eliminar(clave)
+            self._entradas[clave] = (valor, expira, tuple(tags))
+            for tag in tags:
+                self._etiquetas.setdefault(tag, set()).add(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._eliminar(next(iter(self._entradas)))
+
+    def invalidar(self, *tags):
+        with self._lock:
+            for tag in tags:
+                for clave in self._etiquetas.pop(tag, ()):
+                    self._eliminar(clave)
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._etiquetas.clear()
+
+    def _eliminar(self, clave):
+        entrada = self._entradas.pop(clave, None)
+        if entrada is None:
+            return
+        for tag in entrada[2]:
+            claves = self._etiquetas.get(tag)
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del self._etiquetas[tag]
+
+
+class CacheRedis:
+    """Cache en Redis compartido entre procesos.
+
+    Las etiquetas se guardan como conjuntos de Redis con las claves asociadas.
+    Cada conjunto expira junto con la última entrada que lo usó, así que no
+    crecen indefinidamente aunque nunca se invaliden.
+    """
+
+    def __init__(self, cliente, prefijo='monaco:', serializar=json.dumps, deserializar=json.loads):
+        self.cliente = cliente
+        self.prefijo = prefijo
+        self.serializar = serializar
+        self.deserializar = deserializar
+
+    def _clave(self, clave):
+        return f'{self.prefijo}{clave}'
+
+    def _clave_tag(self, tag):
+        return f'{self.prefijo}tag:{tag}'
+
+    def get(self, clave):
+        valor = self.cliente.get(self._clave(clave))
+        return self.deserializar(valor) if valor is not None else None
+
+    def set(self, clave, valor, ttl=None, tags=()):
+        clave = self._clave(clave)
+        pipe = self.cliente.pipeline()
+        pipe.set(clave, self.serializar(valor), ex=ttl)
+        for tag in tags:
+            pipe.sadd(self._clave_tag(tag), clave)
+            if ttl:
+                pipe.expire(self._clave_tag(tag), ttl)
+        pipe.execute()
+
+    def invalidar(self, *tags):
+        for tag in tags:
+            clave_tag = self._clave_tag(tag)
+            claves = self.cliente.smembers(clave_tag)
+            pipe = self.cliente.pipeline()
+            if claves:
+                pipe.delete(*claves)
+            pipe.delete(clave_tag)
+            pipe.execute()
+
+    def limpiar(self):
+        claves = list(self.cliente.scan_iter(match=f'{self.prefijo}*'))
+        if claves:
+            self.cliente.delete(*claves)
+
+
+class CachePorEspacio:
+    """Separa las entradas de varios espacios (p. ej. sucursales) en un mismo backend:
+    prefija claves y etiquetas con el espacio que retorna `espacio()` en cada llamada"""
+
+    def __init__(self, backend, espacio):
+        self.backend = backend
+        self.espacio = espacio
+
+    def get(self, clave):
+        return self.backend.get(f'{self.espacio()}:{clave}')
+
+    def set(self, clave, valor, ttl=None, tags=()):
+        espacio = self.espacio()
+        self.backend.set(f'{espacio}:{clave}', valor, ttl=ttl, tags=[f'{espacio}:{tag}' for tag in tags])
+
+    def invalidar(self, *tags):
+        espacio = self.espacio()
+        self.backend.invalidar(*(f'{espacio}:{tag}' for tag in tags))
+
+    def limpiar(self):
+        self.backend.limpiar()
+
+
+def crear_cache(url=None, **opciones):
+    """Crea el backend según la URL: 'redis://...' usa Redis y cualquier otro valor
+    (o ninguno) usa el cache LRU en memoria. `opciones` se pasa al backend Redis."""
+    if url and url.startswith(('redis://', 'rediss://', 'unix://')):
+        if redis is None:
+            raise RuntimeError('CACHE_URL apunta a Redis pero el paquete redis no está instalado')
+        return CacheRedis(redis.Redis.from_url(url), **opciones)
+    return CacheLRU()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Generador de carga local: reproduce la mezcla de tráfico de una noche de servicio
+contra la API (varias tabletas consultando el plano, cambiando estados de mesas,
+creando y liberando reservaciones) y reporta la latencia por operación.
+
+Uso (con el servidor corriendo y datos de generador_datos.py):
+    python carga_local.py --url http://localhost:5000 --tabletas 8 --segundos 60
+"""
+
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+# Mezcla de operaciones de una noche de servicio (operación -> peso)
+MEZCLA_NOCHE = {
+    'ver_plano': 35,
+    'ver_area': 15,
+    'ver_reservaciones_hoy': 15,
+    'ver_reservaciones_mesa': 10,
+    'cambiar_estado_mesa': 12,
+    'crear_reservacion': 6,
+    'liberar_reservacion': 4,
+    'actualizar_estados': 3
+}
+
+AREAS = ('interior', 'jardin', 'reservados')
+
+
+class ClienteApi:
+    def __init__(self, url_base, timeout=10):
+        self.url_base = url_base.rstrip('/')
+        self.timeout = timeout
+
+    def llamar(self, metodo, ruta, datos=None):
+        """Ejecuta una petición y retorna (status, json o None)"""
+        cuerpo = json.dumps(datos).encode() if datos is not None else None
+        peticion = urllib.request.Request(
+            self.url_base + ruta, data=cuerpo, method=metodo,
+            headers={'Content-Type': 'application/json'} if cuerpo else {}
+        )
+        try:
+            with urllib.request.urlopen(peticion, timeout=self.timeout) as respuesta:
+                contenido = respuesta.read()
+                status = respuesta.status
+        except urllib.error.HTTPError as e:
+            contenido = e.read()
+            status = e.code
+        try:
+            return status, json.loads(contenido) if contenido else None
+        except ValueError:
+            return status, None
+
+
+class SimuladorNoche:
+    """Cada tableta es un hilo que ejecuta operaciones de la mezcla con un tiempo de espera entre ellas"""
+
+    def __init__(self, cliente, mezcla=MEZCLA_NOCHE, espera=0.2, semilla=None):
+        self.cliente = cliente
+        self.mezcla = mezcla
+        self.espera = espera
+        self.semilla = semilla
+        self.latencias = {operacion: [] for operacion in mezcla}
+        self.errores = {operacion: 0 for operacion in mezcla}
+        self._lock = threading.Lock()
+        self.mesas = []
+        self.reservaciones_creadas = []
+        self.fecha_hoy = datetime.now().strftime('%Y-%m-%d')
+
+    def preparar(self):
+        status, fecha = self.cliente.llamar('GET', '/api/fecha-actual')
+        if status == 200 and fecha:
+            self.fecha_hoy = fecha['fecha']
+        status, mesas = self.cliente.llamar('GET', '/api/mesas')
+        if status != 200:
+            raise RuntimeError(f'No se pudo obtener /api/mesas (status {status})')
+        self.mesas = [mesa for mesa in mesas if mesa['id'] is not None]
+
+    # ----- Operaciones -----
+
+    def ver_plano(self, rng):
+        return self.cliente.llamar('GET', '/api/mesas')
+
+    def ver_area(self, rng):
+        return self.cliente.llamar('GET', f'/api/mesas/area/{rng.choice(AREAS)}')
+
+    def ver_reservaciones_hoy(self, rng):
+        return self.cliente.llamar('GET', f'/api/reservaciones?fecha={self.fecha_hoy}')
+
+    def ver_reservaciones_mesa(self, rng):
+        return self.cliente.llamar('GET', f"/api/reservaciones/mesa/{rng.choice(self.mesas)['id']}")
+
+    def cambiar_estado_mesa(self, rng):
+        mesa = rng.choice(self.mesas)
+        estado = rng.choice(('ocupada', 'disponible'))
+        return self.cliente.llamar('PUT', f"/api/mesas/{mesa['id']}", {'estado': estado})
+
+    def crear_reservacion(self, rng):
+        mesa = rng.choice([mesa for mesa in self.mesas if mesa['capacidad'] > 0] or self.mesas)
+        fecha = datetime.strptime(self.fecha_hoy, '%Y-%m-%d') + timedelta(days=rng.randint(0, 30))
+        status, datos = self.cliente.llamar('POST', '/api/reservaciones', {
+            'mesa_id': mesa['id'],
+            'hora_reservacion': f'{rng.randint(13, 22)}:{rng.choice(("00", "30"))}',
+            'area': mesa['ubicacion'],
+            'cantidad_personas': rng.randint(2, max(2, mesa['capacidad'])),
+            'nombre_reservador': 'Carga local',
+            'fecha_reservacion': fecha.strftime('%Y-%m-%d')
+        })
+        if status == 201:
+            with self._lock:
+                self.reservaciones_creadas.append(datos['reservacion']['id'])
+        # Un conflicto de horario (400) es una respuesta válida bajo contención
+        return (200 if status == 400 else status), datos
+
+    def liberar_reservacion(self, rng):
+        with self._lock:
+            reservacion_id = self.reservaciones_creadas.pop() if self.reservaciones_creadas else None
+        if reservacion_id is None:
+            return self.ver_reservaciones_hoy(rng)
+        return self.cliente.llamar('POST', f'/api/reservaciones/{reservacion_id}/liberar')
+
+    def actualizar_estados(self, rng):
+        return self.cliente.llamar('POST', '/api/actualizar-estado-mesas')
+
+    # ----- Ejecución -----
+
+    def _tableta(self, indice, fin):
+        rng = random.Random(None if self.semilla is None else self.semilla + indice)
+        operaciones = list(self.mezcla)
+        pesos = [self.mezcla[operacion] for operacion in operaciones]
+        while time.monotonic() < fin:
+            operacion = rng.choices(operaciones, weights=pesos)[0]
+            inicio = time.perf_counter()
+            try:
+                status, _ = getattr(self, operacion)(rng)
+            except Exception:
+                # Errores de red o respuestas inesperadas cuentan como error de la operación
+                status = None
+            duracion = time.perf_counter() - inicio
+            with self._lock:
+                self.latencias[operacion].append(duracion)
+                if status is None or status >= 400:
+                    self.errores[operacion] += 1
+            time.sleep(rng.expovariate(1 / self.espera) if self.espera else 0)
+
+    def ejecutar(self, tabletas, segundos):
+        self.preparar()
+        fin = time.monotonic() + segundos
+        with ThreadPoolExecutor(max_workers=tabletas) as executor:
+            for indice in range(tabletas):
+                executor.submit(self._tableta, indice, fin)
+        return self.resumen(segundos)
+
+    def resumen(self, segundos):
+        resumen = {}
+        for operacion, tiempos in self.latencias.items():
+            if not tiempos:
+                continue
+            ordenados = sorted(tiempos)
+            percentil = lambda p: ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))] * 1000
+            resumen[operacion] = {
+                'peticiones': len(tiempos),
+                'errores': self.errores[operacion],
+                'por_segundo': len(tiempos) / segundos,
+                'p50_ms': statistics.median(tiempos) * 1000,
+                'p95_ms': percentil(0.95),
+                'p99_ms': percentil(0.99)
+            }
+        return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reproduce el tráfico de una noche de servicio contra la API')
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--tabletas', type=int, default=8, help='Clientes concurrentes')
+    parser.add_argument('--segundos', type=int, default=60, help='Duración de la prueba')
+    parser.add_argument('--espera', type=float, default=0.2, help='Espera media entre operaciones por tableta (s)')
+    parser.add_argument('--semilla', type=int, default=None)
+    parser.add_argument('--json', action='store_true', help='Imprimir el resumen como JSON')
+    args = parser.parse_args()
+
+    print(f"🚀 Simulando {args.tabletas} tabletas durante {args.segundos}s contra {args.url}")
+    simulador = SimuladorNoche(ClienteApi(args.url), espera=args.espera, semilla=args.semilla)
+    resumen = simulador.ejecutar(args.tabletas, args.segundos)
+
+    if args.json:
+        print(json.dumps(resumen, indent=2))
+        return
+
+    print("\n📊 Resultados por operación:")
+    print(f"   {'operación':<24}{'pet.':>7}{'err.':>6}{'pet/s':>8}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for operacion, datos in resumen.items():
+        print(
+            f"   {operacion:<24}{datos['peticiones']:>7}{datos['errores']:>6}{datos['por_segundo']:>8.1f}"
+            f"{datos['p50_ms']:>8.1f}ms{datos['p95_ms']:>7.1f}ms{datos['p99_ms']:>7.1f}ms"
+        )
+
+
+if __name__ == '__main__':
+    main()
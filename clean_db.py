@@ -5,6 +5,9 @@ with app.app_context():
     # Eliminar la tabla de reservaciones si existe
     try:
         db.session.execute(text('DROP TABLE IF EXISTS reservacion'))
+        # Sin reservaciones tampoco queda ocupación en las franjas
+        if db.inspect(db.engine).has_table('ocupacion_mesa'):
+            db.session.execute(text('DELETE FROM ocupacion_mesa'))
         db.session.commit()
         print("Tabla de reservaciones eliminada")
     except Exception as e:
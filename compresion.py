@@ -0,0 +1,68 @@
+# Compresión de respuestas de la API (brotli si está instalado, si no gzip).
+# Solo se comprimen respuestas de texto/JSON completas en memoria y de tamaño
+# suficiente para que valga la pena; las descargas (PDF/Excel) no se tocan.
+
+import gzip
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional, gzip siempre está disponible
+    brotli = None
+
+from flask import request
+
+TIPOS_COMPRIMIBLES = ('application/json', 'text/plain', 'text/html', 'text/css', 'application/javascript')
+
+
+class Compresion:
+    """Comprime el cuerpo de la respuesta según el Accept-Encoding del cliente"""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESION_TAMANO_MINIMO', 500)  # bytes
+        app.config.setdefault('COMPRESION_NIVEL_GZIP', 6)
+        app.config.setdefault('COMPRESION_NIVEL_BROTLI', 5)
+        self.app = app
+        app.after_request(self._comprimir)
+
+    def _codificacion_aceptada(self):
+        # Werkzeug interpreta los valores q (q=0 rechaza la codificación) y el comodín '*'
+        aceptadas = request.accept_encodings
+        calidad_br = aceptadas['br'] if brotli is not None else 0
+        calidad_gzip = aceptadas['gzip']
+        if calidad_br > 0 and calidad_br >= calidad_gzip:
+            return 'br'
+        if calidad_gzip > 0:
+            return 'gzip'
+        return None
+
+    def _comprimir(self, response):
+        if (response.direct_passthrough
+                or response.status_code < 200 or response.status_code >= 300
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in TIPOS_COMPRIMIBLES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        codificacion = self._codificacion_aceptada()
+        if codificacion is None:
+            return response
+
+        datos = response.get_data()
+        if len(datos) < self.app.config['COMPRESION_TAMANO_MINIMO']:
+            return response
+
+        if codificacion == 'br':
+            comprimido = brotli.compress(datos, quality=self.app.config['COMPRESION_NIVEL_BROTLI'])
+        else:
+            comprimido = gzip.compress(datos, compresslevel=self.app.config['COMPRESION_NIVEL_GZIP'])
+
+        response.set_data(comprimido)
+        response.headers['Content-Encoding'] = codificacion
+        # El ETag (si lo hay) identifica el cuerpo sin comprimir
+        if 'ETag' in response.headers:
+            response.set_etag(response.get_etag()[0], weak=True)
+        return response
@@ -0,0 +1,43 @@
+"""
+Fixtures compartidas de las pruebas: la app usa una base SQLite temporal, nunca
+instance/restaurant.db. DATABASE_URL se define aquí porque pytest carga este archivo
+antes que cualquier módulo de pruebas que importe app (test_actualizar_mesas.py lo
+hace al importarse).
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# La base de datos debe configurarse antes de importar la app
+DIRECTORIO_PRUEBAS = tempfile.mkdtemp(prefix='monaco_pruebas_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(DIRECTORIO_PRUEBAS, 'pruebas.db')}"
+
+
+def _es_temporal(ruta):
+    """La base está en un directorio de tempfile.mkdtemp(prefix='monaco_...') (el de aquí
+    o el de benchmarks/conftest.py)"""
+    directorio = os.path.dirname(os.path.realpath(ruta or ''))
+    return (os.path.basename(directorio).startswith('monaco_')
+            and os.path.dirname(directorio) == os.path.realpath(tempfile.gettempdir()))
+
+
+@pytest.fixture
+def base_vacia():
+    """App con la base temporal sin tablas (ni alembic_version) y el registro de eventos y el
+    archivo del historial dentro de DIRECTORIO_PRUEBAS"""
+    from app import app, db
+
+    app.config['TESTING'] = True
+    app.config['EVENTOS_DB'] = os.path.join(DIRECTORIO_PRUEBAS, 'eventos.db')
+    app.config['HISTORIAL_ARCHIVO_DIR'] = os.path.join(DIRECTORIO_PRUEBAS, 'historial')
+    shutil.rmtree(app.config['HISTORIAL_ARCHIVO_DIR'], ignore_errors=True)
+    with app.app_context():
+        assert _es_temporal(db.engine.url.database), 'La app no usa una base de datos temporal'
+        db.drop_all()
+        db.session.execute(db.text('DROP TABLE IF EXISTS alembic_version'))
+        db.session.commit()
+        yield app
+        db.session.remove()
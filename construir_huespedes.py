@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Construye los perfiles de huéspedes (tabla Huesped) a partir de las reservaciones y
+el historial existentes, y asigna huesped_id a cada registro.
+
+Recorre ambas tablas (y las particiones archivadas del historial) una sola vez en
+bloques, acumula los contadores en memoria por teléfono normalizado y escribe
+huéspedes y asignaciones con inserciones y actualizaciones en lote. Reemplaza los
+perfiles que ya existan conservando sus ids, así que puede ejecutarse de nuevo en
+cualquier momento. En bases de datos anteriores al modelo ejecutar antes
+flask db upgrade.
+
+Uso:
+    python construir_huespedes.py
+"""
+
+from datetime import datetime
+
+from app import app, db, archivo_historial, Huesped, Reservacion, HistorialReservacion
+from huespedes import normalizar_telefono, contadores_liberacion
+
+TAMANO_LOTE = 1000
+
+
+def _nuevo_perfil(telefono, nombre):
+    return {
+        'telefono': telefono,
+        'nombre': nombre,
+        'reservaciones': 0,
+        'visitas': 0,
+        'no_presentados': 0,
+        'total_personas': 0,
+        'minutos_estancia': 0,
+        'estancias_medidas': 0,
+        'ultima_visita': None,
+        'fecha_creacion': datetime.utcnow()
+    }
+
+
+def _en_lotes(filas):
+    for inicio in range(0, len(filas), TAMANO_LOTE):
+        yield filas[inicio:inicio + TAMANO_LOTE]
+
+
+def construir_huespedes():
+    """Reconstruye la tabla de huéspedes. Retorna el total de huéspedes y de registros
+    asociados. Debe llamarse dentro de un contexto de aplicación"""
+    perfiles = {}
+    asignaciones = {HistorialReservacion: [], Reservacion: []}
+    # Se conservan los ids de los huéspedes existentes: las particiones archivadas del
+    # historial son de solo lectura y sus huesped_id deben seguir siendo válidos
+    ids_anteriores = dict(db.session.execute(db.select(Huesped.telefono, Huesped.id)).all())
+
+    consulta_historial = db.select(
+        HistorialReservacion.id, HistorialReservacion.telefono, HistorialReservacion.nombre_reservador,
+        HistorialReservacion.cantidad_personas, HistorialReservacion.hora_reservacion,
+        HistorialReservacion.hora_liberacion, HistorialReservacion.motivo_liberacion,
+        HistorialReservacion.fecha_reservacion
+    ).where(HistorialReservacion.telefono.isnot(None)).order_by(HistorialReservacion.fecha_reservacion)
+    consulta_reservaciones = db.select(
+        Reservacion.id, Reservacion.telefono, Reservacion.nombre_reservador
+    ).where(Reservacion.telefono.isnot(None)).order_by(Reservacion.fecha_reservacion)
+
+    # Del registro más antiguo al más reciente (particiones archivadas, historial activo,
+    # reservaciones), así el nombre final es el más reciente
+    fuentes = (
+        (HistorialReservacion, archivo_historial.filas_archivadas(consulta_historial), False),
+        (HistorialReservacion, db.session.execute(consulta_historial.execution_options(yield_per=TAMANO_LOTE)), True),
+        (Reservacion, db.session.execute(consulta_reservaciones.execution_options(yield_per=TAMANO_LOTE)), True)
+    )
+
+    for modelo, filas, asignar in fuentes:
+        for fila in filas:
+            telefono = normalizar_telefono(fila.telefono)
+            if telefono is None:
+                continue
+            perfil = perfiles.get(telefono)
+            if perfil is None:
+                perfil = perfiles[telefono] = _nuevo_perfil(telefono, fila.nombre_reservador)
+            perfil['nombre'] = fila.nombre_reservador
+            perfil['reservaciones'] += 1
+            if modelo is HistorialReservacion:
+                contadores = contadores_liberacion(
+                    fila.cantidad_personas, fila.hora_reservacion,
+                    fila.hora_liberacion, fila.motivo_liberacion
+                )
+                for campo, incremento in contadores.items():
+                    perfil[campo] += incremento
+                if 'visitas' in contadores:
+                    perfil['ultima_visita'] = fila.fecha_reservacion
+            if asignar:
+                asignaciones[modelo].append((fila.id, telefono))
+
+    # Reemplazar los perfiles anteriores
+    for modelo in asignaciones:
+        db.session.execute(db.update(modelo).values(huesped_id=None))
+    db.session.execute(db.delete(Huesped))
+
+    # Ids explícitos para poder asignarlos sin volver a leer la tabla
+    siguiente_id = max(ids_anteriores.values(), default=0) + 1
+    filas_huespedes = []
+    for telefono, perfil in perfiles.items():
+        perfil['id'] = ids_anteriores.get(telefono)
+        if perfil['id'] is None:
+            perfil['id'] = siguiente_id
+            siguiente_id += 1
+        filas_huespedes.append(perfil)
+    for lote in _en_lotes(filas_huespedes):
+        db.session.execute(db.insert(Huesped), lote)
+
+    asociados = 0
+    for modelo, filas in asignaciones.items():
+        actualizaciones = [{'id': registro_id, 'huesped_id': perfiles[telefono]['id']} for registro_id, telefono in filas]
+        for lote in _en_lotes(actualizaciones):
+            db.session.execute(db.update(modelo), lote)
+        asociados += len(actualizaciones)
+
+    db.session.commit()
+    return {'huespedes': len(perfiles), 'asociados': asociados}
+
+
+if __name__ == '__main__':
+    with app.app_context():
+        print("👥 Construyendo perfiles de huéspedes...")
+        inicio = datetime.now()
+        totales = construir_huespedes()
+        segundos = (datetime.now() - inicio).total_seconds()
+
+        print("✅ Perfiles construidos exitosamente!")
+        print(f"   - Huéspedes: {totales['huespedes']}")
+        print(f"   - Registros asociados: {totales['asociados']}")
+        print(f"   - Tiempo: {segundos:.1f}s")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Compila el layout estático de mesas_config.py en un archivo JSON con huella
+(static/build/layout.<huella>.json) y un manifiesto que apunta a él.
+
+La aplicación lee el manifiesto al iniciar, incrusta el layout en index.html y
+sirve el archivo con cache permanente, así que el plano se dibuja sin pedir la
+geometría a la API. Ejecutar después de cada cambio en mesas_config.py:
+    python construir_layout.py
+"""
+
+import json
+import os
+
+from mesas_config import get_layout_compacto
+
+DIRECTORIO_BUILD = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'build')
+MANIFIESTO = 'manifest.json'
+
+
+def construir_layout(directorio=DIRECTORIO_BUILD):
+    """Escribe el layout y el manifiesto; elimina layouts anteriores. Retorna el manifiesto"""
+    layout = get_layout_compacto()
+    nombre = f"layout.{layout['huella']}.json"
+    os.makedirs(directorio, exist_ok=True)
+
+    with open(os.path.join(directorio, nombre), 'w', encoding='utf-8') as archivo:
+        json.dump(layout, archivo, ensure_ascii=False, separators=(',', ':'))
+
+    for anterior in os.listdir(directorio):
+        if anterior.startswith('layout.') and anterior.endswith('.json') and anterior != nombre:
+            os.remove(os.path.join(directorio, anterior))
+
+    manifiesto = {'huella': layout['huella'], 'layout': nombre}
+    with open(os.path.join(directorio, MANIFIESTO), 'w', encoding='utf-8') as archivo:
+        json.dump(manifiesto, archivo, indent=2)
+    return manifiesto
+
+
+def cargar_layout_build(directorio=DIRECTORIO_BUILD):
+    """Retorna (manifiesto, contenido JSON del layout) si el build existe y corresponde
+    a la configuración actual; None si falta o quedó desactualizado"""
+    try:
+        with open(os.path.join(directorio, MANIFIESTO), encoding='utf-8') as archivo:
+            manifiesto = json.load(archivo)
+        if manifiesto['huella'] != get_layout_compacto()['huella']:
+            return None
+        with open(os.path.join(directorio, manifiesto['layout']), encoding='utf-8') as archivo:
+            return manifiesto, archivo.read()
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+if __name__ == '__main__':
+    manifiesto = construir_layout()
+    print(f"✅ Layout compilado: static/build/{manifiesto['layout']}")
@@ -0,0 +1,99 @@
+# Estimación del tiempo de espera de la lista de espera (modelo ListaEspera en app.py).
+# La duración de las visitas se guarda como histograma en cubetas de 15 minutos por área
+# y tamaño de grupo (tabla estancia_cubeta). El histograma se construye una vez a partir
+# del historial y después se actualiza con cada liberación (un incremento), así que
+# estimar nunca recorre el historial. Con el histograma se calcula cuánto le falta en
+# promedio a una mesa ocupada dado el tiempo que lleva ocupada, y la cola se simula con
+# un heap de mesas ordenado por la hora en que se espera que queden libres.
+
+import heapq
+from datetime import timedelta
+
+MINUTOS_CUBETA = 15
+CUBETAS = 24  # hasta 6 horas; las estancias más largas caen en la última cubeta
+MUESTRAS_MINIMAS = 20  # con menos visitas se usa una distribución más general
+ESTANCIA_POR_DEFECTO = 120  # minutos, sin historial (DURACION_RESERVACION)
+
+
+def grupo_personas(personas):
+    """Tamaño de grupo del histograma: 2, 4, 6 u 8 (8 o más)"""
+    return min(8, max(2, personas + personas % 2))
+
+
+def cubeta_minutos(minutos):
+    return min(CUBETAS - 1, minutos // MINUTOS_CUBETA)
+
+
+class EstimadorEspera:
+    """Distribuciones de estancia en memoria y simulación de la cola"""
+
+    def __init__(self, filas=()):
+        """`filas` son (area, grupo, cubeta, cantidad) de la tabla estancia_cubeta"""
+        self.histogramas = {}
+        for area, grupo, cubeta, cantidad in filas:
+            for clave in ((area, grupo), (area, None), (None, None)):
+                self._histograma(clave)[cubeta] += cantidad
+
+    def _histograma(self, clave):
+        if clave not in self.histogramas:
+            self.histogramas[clave] = [0] * CUBETAS
+        return self.histogramas[clave]
+
+    def registrar(self, area, personas, minutos):
+        """Agrega una visita terminada (el mismo incremento que se guarda en la tabla)"""
+        cubeta = cubeta_minutos(minutos)
+        for clave in ((area, grupo_personas(personas)), (area, None), (None, None)):
+            self._histograma(clave)[cubeta] += 1
+
+    def _distribucion(self, area, personas):
+        for clave in ((area, grupo_personas(personas)), (area, None), (None, None)):
+            histograma = self.histogramas.get(clave)
+            if histograma and sum(histograma) >= MUESTRAS_MINIMAS:
+                return histograma
+        return None
+
+    def restante(self, area, personas, transcurridos=0):
+        """Minutos que faltan en promedio para liberar una mesa ocupada hace `transcurridos`
+        minutos: E[T - t | T > t], tomando el centro de cada cubeta"""
+        histograma = self._distribucion(area, personas)
+        if histograma is None:
+            return max(ESTANCIA_POR_DEFECTO - transcurridos, MINUTOS_CUBETA)
+        total = suma = 0
+        for cubeta, cantidad in enumerate(histograma):
+            centro = cubeta * MINUTOS_CUBETA + MINUTOS_CUBETA / 2
+            if centro > transcurridos:
+                total += cantidad
+                suma += cantidad * (centro - transcurridos)
+        # Ya rebasó todas las estancias registradas: se espera que se libere pronto
+        return suma / total if total else MINUTOS_CUBETA / 2
+
+    def estimar(self, cola, mesas, ahora):
+        """Minutos de espera estimados para cada grupo de la cola.
+
+        `cola` son los grupos en orden de atención: (id, personas, area o None).
+        `mesas` son (mesa_id, capacidad, area, libre_desde) con libre_desde = `ahora`
+        para las mesas disponibles y la hora estimada de salida para las ocupadas.
+        Retorna {id: minutos o None si ninguna mesa tiene capacidad para el grupo}."""
+        heap = [(libre_desde, mesa_id, capacidad, area) for mesa_id, capacidad, area, libre_desde in mesas]
+        heapq.heapify(heap)
+        estimaciones = {}
+        for grupo_id, personas, area_preferida in cola:
+            # La mesa que se libera primero entre las que le quedan al grupo
+            descartadas, elegida = [], None
+            while heap:
+                mesa = heapq.heappop(heap)
+                if mesa[2] >= personas and (area_preferida is None or mesa[3] == area_preferida):
+                    elegida = mesa
+                    break
+                descartadas.append(mesa)
+            for mesa in descartadas:
+                heapq.heappush(heap, mesa)
+            if elegida is None:
+                estimaciones[grupo_id] = None
+                continue
+            libre_desde, mesa_id, capacidad, area = elegida
+            sentado = max(libre_desde, ahora)
+            estimaciones[grupo_id] = round((sentado - ahora).total_seconds() / 60)
+            # La mesa vuelve a la simulación cuando este grupo se vaya
+            heapq.heappush(heap, (sentado + timedelta(minutes=self.restante(area, personas)), mesa_id, capacidad, area))
+        return estimaciones
@@ -0,0 +1,321 @@
+# Registro de eventos de solo inserción con cada cambio de estado de mesas y reservaciones.
+# Los cambios se detectan en la sesión de SQLAlchemy (estado, fecha y grupo_id de Mesa;
+# alta, baja y cambio de mesas de Reservacion) y, al confirmarse la transacción, se encolan en una cola
+# acotada en memoria. Un hilo en segundo plano los escribe por lotes en una base SQLite
+# aparte (EVENTOS_DB), así que la petición no espera la escritura. Si la cola se llena
+# los eventos se descartan y se cuentan, nunca se bloquea la petición. Cada sucursal
+# (espacio) tiene su propio archivo: eventos.db para la principal, eventos_<clave>.db el resto.
+# reproducir_estado() y ocupacion_por_hora() reconstruyen el pasado a partir del registro.
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import timedelta
+
+from flask import has_request_context, request
+from sqlalchemy import (Column, Integer, MetaData, String, Table, Text, create_engine, event, func,
+                        inspect, select)
+
+metadata_eventos = MetaData()
+
+tabla_eventos = Table(
+    'evento', metadata_eventos,
+    Column('id', Integer, primary_key=True),
+    Column('momento_ms', Integer, nullable=False, index=True),  # UTC, milisegundos desde epoch
+    Column('tipo', String(50), nullable=False),  # mesa, reservacion_creada/eliminada/liberada/movida
+    Column('origen', String(100), nullable=False),  # endpoint o tarea que hizo el cambio
+    Column('mesa_id', Integer, nullable=True, index=True),
+    Column('estado', String(20), nullable=True),  # estado de la mesa después del cambio
+    Column('fecha', String(10), nullable=True),
+    Column('grupo_id', Integer, nullable=True),
+    Column('datos', Text, nullable=True)  # JSON con el detalle (reservación, valores anteriores)
+)
+
+# Solo inserción: la base rechaza cualquier modificación o borrado del registro
+_TRIGGERS_SOLO_INSERCION = (
+    "CREATE TRIGGER IF NOT EXISTS evento_sin_update BEFORE UPDATE ON evento "
+    "BEGIN SELECT RAISE(ABORT, 'el registro de eventos es de solo inserción'); END",
+    "CREATE TRIGGER IF NOT EXISTS evento_sin_delete BEFORE DELETE ON evento "
+    "BEGIN SELECT RAISE(ABORT, 'el registro de eventos es de solo inserción'); END"
+)
+
+CAMPOS_MESA = ('estado', 'fecha', 'grupo_id')
+CAMPOS_MESAS_RESERVACION = ('mesa_id', 'mesas_unidas')
+
+
+def crear_motor_eventos(ruta):
+    motor = create_engine(f'sqlite:///{ruta}')
+    metadata_eventos.create_all(motor)
+    with motor.begin() as conexion:
+        for sentencia in _TRIGGERS_SOLO_INSERCION:
+            conexion.exec_driver_sql(sentencia)
+    return motor
+
+
+class RegistroEventos:
+    """Captura los cambios de estado confirmados y los escribe en segundo plano por lotes"""
+
+    def __init__(self, app=None, db=None, modelos=None, espacio=None):
+        self._cola = None
+        self._hilo = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._motores = {}
+        self.descartados = 0
+        if app is not None:
+            self.init_app(app, db, modelos, espacio)
+
+    def init_app(self, app, db, modelos, espacio=None):
+        """`modelos` es un diccionario con las clases Mesa, Reservacion e HistorialReservacion;
+        `espacio` retorna la sucursal actual (None para EVENTOS_DB)"""
+        app.config.setdefault('EVENTOS_DB', os.path.join(app.instance_path, 'eventos.db'))
+        app.config.setdefault('EVENTOS_TAMANO_COLA', 10000)
+        app.config.setdefault('EVENTOS_TAMANO_LOTE', 500)
+        app.config.setdefault('EVENTOS_HABILITADO', True)
+        self.app = app
+        self.modelos = modelos
+        self.espacio = espacio or (lambda: None)
+        if app.config['EVENTOS_HABILITADO']:
+            event.listen(db.session, 'after_flush', self._capturar)
+            event.listen(db.session, 'after_commit', self._encolar_pendientes)
+            event.listen(db.session, 'after_rollback', self._descartar_pendientes)
+            atexit.register(self.vaciar)
+
+    @property
+    def motor(self):
+        """Motor del registro de la sucursal actual"""
+        return self._motor_de(self.espacio())
+
+    def _motor_de(self, espacio):
+        if espacio not in self._motores:
+            ruta = self.app.config['EVENTOS_DB']
+            if espacio:
+                base, extension = os.path.splitext(ruta)
+                ruta = f'{base}_{espacio}{extension}'
+            os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+            self._motores[espacio] = crear_motor_eventos(ruta)
+        return self._motores[espacio]
+
+    # ----- Captura en la sesión -----
+
+    def _capturar(self, sesion, contexto):
+        """Registra (sin escribir todavía) los cambios de este flush"""
+        Mesa = self.modelos['Mesa']
+        Reservacion = self.modelos['Reservacion']
+        HistorialReservacion = self.modelos['HistorialReservacion']
+        origen = (request.endpoint or 'sin_ruta') if has_request_context() else 'tarea'
+        momento = int(time.time() * 1000)
+        pendientes = sesion.info.setdefault('eventos_pendientes', [])
+
+        liberadas = {
+            registro.reservacion_id_original for registro in sesion.new
+            if isinstance(registro, HistorialReservacion)
+        }
+        for registro in sesion.new:
+            if isinstance(registro, Reservacion):
+                pendientes.append(self._evento(momento, 'reservacion_creada', origen, registro.mesa_id, datos={
+                    'reservacion_id': registro.id,
+                    'fecha_reservacion': str(registro.fecha_reservacion),
+                    'hora_reservacion': registro.hora_reservacion.strftime('%H:%M'),
+                    'cantidad_personas': registro.cantidad_personas
+                }))
+        for registro in sesion.deleted:
+            if isinstance(registro, Reservacion):
+                tipo = 'reservacion_liberada' if registro.id in liberadas else 'reservacion_eliminada'
+                pendientes.append(self._evento(momento, tipo, origen, registro.mesa_id, datos={
+                    'reservacion_id': registro.id,
+                    'fecha_reservacion': str(registro.fecha_reservacion)
+                }))
+        for registro in sesion.dirty:
+            if not isinstance(registro, Reservacion):
+                continue
+            estado = inspect(registro)
+            anteriores = {}
+            for campo in CAMPOS_MESAS_RESERVACION:
+                historia = estado.attrs[campo].history
+                if historia.has_changes():
+                    anteriores[campo] = historia.deleted[0] if historia.deleted else None
+            if anteriores:
+                pendientes.append(self._evento(momento, 'reservacion_movida', origen, registro.mesa_id, datos={
+                    'reservacion_id': registro.id,
+                    'fecha_reservacion': str(registro.fecha_reservacion),
+                    'mesas_unidas': registro.mesas_unidas,
+                    'anterior': {campo: anteriores.get(campo, getattr(registro, campo))
+                                 for campo in CAMPOS_MESAS_RESERVACION}
+                }))
+
+        for registro in list(sesion.new) + list(sesion.dirty):
+            if not isinstance(registro, Mesa):
+                continue
+            estado = inspect(registro)
+            anteriores = {}
+            for campo in CAMPOS_MESA:
+                historia = estado.attrs[campo].history
+                if historia.has_changes():
+                    anteriores[campo] = historia.deleted[0] if historia.deleted else None
+            if anteriores or registro in sesion.new:
+                pendientes.append(self._evento(
+                    momento, 'mesa', origen, registro.id,
+                    estado=registro.estado, fecha=registro.fecha, grupo_id=registro.grupo_id,
+                    datos={'anterior': {campo: str(valor) if valor is not None else None
+                                        for campo, valor in anteriores.items()}}
+                ))
+
+    def registrar_mesas(self, sesion, filas, grupo_id, anterior):
+        """Eventos de una actualización masiva de mesas (que no pasa por el flush). `filas`
+        son (id, estado, fecha) de las mesas afectadas, p. ej. de un UPDATE ... RETURNING"""
+        origen = (request.endpoint or 'sin_ruta') if has_request_context() else 'tarea'
+        momento = int(time.time() * 1000)
+        pendientes = sesion.info.setdefault('eventos_pendientes', [])
+        for mesa_id, estado, fecha in filas:
+            pendientes.append(self._evento(
+                momento, 'mesa', origen, mesa_id, estado=estado, fecha=fecha, grupo_id=grupo_id,
+                datos={'anterior': anterior}
+            ))
+
+    def registrar_reservaciones(self, sesion, tipo, filas):
+        """Eventos `tipo` de reservaciones dadas de alta o de baja con una sentencia masiva.
+        `filas` son (id, mesa_id, fecha_reservacion) de las reservaciones afectadas"""
+        origen = (request.endpoint or 'sin_ruta') if has_request_context() else 'tarea'
+        momento = int(time.time() * 1000)
+        pendientes = sesion.info.setdefault('eventos_pendientes', [])
+        for reservacion_id, mesa_id, fecha in filas:
+            pendientes.append(self._evento(momento, tipo, origen, mesa_id, datos={
+                'reservacion_id': reservacion_id,
+                'fecha_reservacion': str(fecha)
+            }))
+
+    @staticmethod
+    def _evento(momento, tipo, origen, mesa_id, estado=None, fecha=None, grupo_id=None, datos=None):
+        return {
+            'momento_ms': momento,
+            'tipo': tipo,
+            'origen': origen,
+            'mesa_id': mesa_id,
+            'estado': estado,
+            'fecha': str(fecha) if fecha is not None else None,
+            'grupo_id': grupo_id,
+            'datos': json.dumps(datos, ensure_ascii=False) if datos else None
+        }
+
+    def _descartar_pendientes(self, sesion):
+        sesion.info.pop('eventos_pendientes', None)
+
+    def _encolar_pendientes(self, sesion):
+        pendientes = sesion.info.pop('eventos_pendientes', None)
+        if not pendientes:
+            return
+        cola = self._cola_activa()
+        espacio = self.espacio()
+        for evento_pendiente in pendientes:
+            try:
+                cola.put_nowait((espacio, evento_pendiente))
+            except queue.Full:
+                self.descartados += 1
+                if self.descartados == 1 or self.descartados % 1000 == 0:
+                    self.app.logger.warning(f'Cola de eventos llena: {self.descartados} eventos descartados')
+
+    # ----- Escritura en segundo plano -----
+
+    def _cola_activa(self):
+        """Crea la cola y el hilo escritor en el primer uso (y de nuevo en cada proceso hijo)"""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._cola = queue.Queue(maxsize=self.app.config['EVENTOS_TAMANO_COLA'])
+                    self._motores = {}
+                    self._hilo = threading.Thread(target=self._escribir, name='registro-eventos', daemon=True)
+                    self._pid = os.getpid()
+                    self._hilo.start()
+        return self._cola
+
+    def _escribir(self):
+        cola = self._cola
+        tamano_lote = self.app.config['EVENTOS_TAMANO_LOTE']
+        while True:
+            lote = [cola.get()]
+            # Juntar lo que ya esté en la cola para escribirlo en una sola transacción
+            while len(lote) < tamano_lote:
+                try:
+                    lote.append(cola.get_nowait())
+                except queue.Empty:
+                    break
+            por_espacio = {}
+            for espacio, evento_pendiente in lote:
+                por_espacio.setdefault(espacio, []).append(evento_pendiente)
+            try:
+                for espacio, eventos in por_espacio.items():
+                    with self._motor_de(espacio).begin() as conexion:
+                        conexion.execute(tabla_eventos.insert(), eventos)
+            except Exception:
+                self.app.logger.exception(f'No se pudieron escribir {len(lote)} eventos')
+            finally:
+                for _ in lote:
+                    cola.task_done()
+
+    def vaciar(self):
+        """Espera a que todos los eventos encolados estén escritos"""
+        if self._cola is not None and self._pid == os.getpid():
+            self._cola.join()
+
+
+# ----- Reproducción -----
+
+def _ms(momento):
+    return int(momento.timestamp() * 1000)
+
+
+def reproducir_estado(motor, momento):
+    """Estado de cada mesa ({mesa_id: {estado, fecha, grupo_id}}) en `momento` (datetime con
+    zona horaria): el último evento de cada mesa hasta ese instante. Las mesas sin eventos
+    previos no aparecen (conservaban su estado inicial, disponible)"""
+    ultimo = select(
+        tabla_eventos.c.mesa_id, func.max(tabla_eventos.c.id).label('id')
+    ).where(
+        tabla_eventos.c.tipo == 'mesa', tabla_eventos.c.momento_ms <= _ms(momento)
+    ).group_by(tabla_eventos.c.mesa_id).subquery()
+    consulta = select(
+        tabla_eventos.c.mesa_id, tabla_eventos.c.estado, tabla_eventos.c.fecha, tabla_eventos.c.grupo_id
+    ).join(ultimo, tabla_eventos.c.id == ultimo.c.id)
+    with motor.connect() as conexion:
+        return {
+            fila.mesa_id: {'estado': fila.estado, 'fecha': fila.fecha, 'grupo_id': fila.grupo_id}
+            for fila in conexion.execute(consulta)
+        }
+
+
+def ocupacion_por_hora(motor, inicio_dia, estado='ocupada'):
+    """Para cada hora del día que empieza en `inicio_dia` (datetime con zona horaria):
+    mesas en `estado` al inicio de la hora y mesas distintas que estuvieron en ese
+    estado en algún momento de la hora. Un solo recorrido por los eventos del día"""
+    estados = {mesa_id: datos['estado'] for mesa_id, datos in reproducir_estado(motor, inicio_dia).items()}
+    consulta = select(
+        tabla_eventos.c.momento_ms, tabla_eventos.c.mesa_id, tabla_eventos.c.estado
+    ).where(
+        tabla_eventos.c.tipo == 'mesa',
+        tabla_eventos.c.momento_ms > _ms(inicio_dia),
+        tabla_eventos.c.momento_ms <= _ms(inicio_dia + timedelta(days=1))
+    ).order_by(tabla_eventos.c.id)
+
+    horas = []
+    with motor.connect() as conexion:
+        eventos = iter(conexion.execute(consulta))
+        siguiente = next(eventos, None)
+        for hora in range(24):
+            fin_hora = _ms(inicio_dia + timedelta(hours=hora + 1))
+            al_inicio = {mesa_id for mesa_id, valor in estados.items() if valor == estado}
+            durante = set(al_inicio)
+            while siguiente is not None and siguiente.momento_ms <= fin_hora:
+                estados[siguiente.mesa_id] = siguiente.estado
+                if siguiente.estado == estado:
+                    durante.add(siguiente.mesa_id)
+                siguiente = next(eventos, None)
+            horas.append({
+                'hora': (inicio_dia + timedelta(hours=hora)).strftime('%H:%M'),
+                'al_inicio': len(al_inicio),
+                'durante': len(durante)
+            })
+    return horas
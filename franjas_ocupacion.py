@@ -0,0 +1,51 @@
+# Ocupación de cada mesa por día en franjas de 15 minutos (tabla ocupacion_mesa de app.py).
+# Las 96 franjas del día se guardan como un entero de 96 bits (12 bytes, el bit i es la
+# franja que empieza en el minuto i * 15) por fecha y mesa. Una reservación ocupa las
+# franjas que toca su intervalo [inicio, inicio + DURACION_RESERVACION), así que comparar
+# contra una mesa o contra el piso completo es un AND/OR de enteros en lugar de recorrer
+# reservaciones. Si dos reservaciones se traslapan, sus franjas también; lo contrario solo
+# falla por redondeo cuando ninguna de las dos empieza en múltiplo de 15 minutos (ver
+# libre_exacto). El bitmap se recalcula desde las reservaciones de la fecha en cada cambio.
+
+DURACION_RESERVACION = 120  # minutos que una reservación bloquea la mesa
+MINUTOS_FRANJA = 15
+FRANJAS_DIA = 24 * 60 // MINUTOS_FRANJA
+BYTES_FRANJAS = FRANJAS_DIA // 8
+
+
+def franjas(minuto, duracion):
+    """Bits de las franjas que toca el intervalo [minuto, minuto + duracion) del día"""
+    fin = min(minuto + duracion, 24 * 60)
+    primera = minuto // MINUTOS_FRANJA
+    ultima = -(-fin // MINUTOS_FRANJA)  # la franja del último minuto, redondeando hacia arriba
+    return ((1 << ultima) - 1) & ~((1 << primera) - 1) if ultima > primera else 0
+
+
+def a_bytes(bits):
+    return bits.to_bytes(BYTES_FRANJAS, 'big')
+
+
+def de_bytes(datos):
+    return int.from_bytes(datos, 'big') if datos else 0
+
+
+def ocupacion_por_mesa(filas, duracion):
+    """{(fecha, mesa_id): bits} a partir de filas (fecha, mesa_id, mesas_unidas, minuto),
+    contando las mesas unidas de cada reservación"""
+    ocupacion = {}
+    for fecha, mesa_id, mesas_unidas, minuto in filas:
+        bits = franjas(minuto, duracion)
+        for mesa in [mesa_id] + [int(unida) for unida in (mesas_unidas or '').split(',') if unida]:
+            ocupacion[(fecha, mesa)] = ocupacion.get((fecha, mesa), 0) | bits
+    return ocupacion
+
+
+def libre_exacto(bits, minuto, duracion):
+    """True o False si las franjas bastan para decidir si la mesa está libre en `minuto`;
+    None si hay que revisar las reservaciones (coincidencia sin alinear a la franja)"""
+    if not bits & franjas(minuto, duracion):
+        return True
+    if minuto % MINUTOS_FRANJA == 0 and duracion % MINUTOS_FRANJA == 0:
+        # Con un intervalo alineado, tocar una franja ocupada es traslaparse
+        return False
+    return None
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Generador de datos sintéticos para pruebas de escala.
+
+Inserta en bloque meses o años de reservaciones (días futuros) e historial
+(días pasados) sobre el esquema existente, con tamaños de grupo y horarios
+realistas por área de MESAS_CONFIG. Con la misma semilla siempre genera los
+mismos datos.
+
+Uso:
+    DATABASE_URL=sqlite:////tmp/carga.db python generador_datos.py --dias-pasados 365 --dias-futuros 60
+"""
+
+import argparse
+import random
+from datetime import datetime, timedelta, time
+
+from app import (app, db, Mesa, Reservacion, HistorialReservacion, OcupacionMesa, get_restaurant_now,
+                 reconciliar_mesas_config, actualizar_ocupacion)
+from franjas_ocupacion import DURACION_RESERVACION
+from mesas_config import get_mesas_config
+
+# Distribución de horas de llegada por área (hora -> peso)
+HORAS_POR_AREA = {
+    'interior': {13: 6, 14: 10, 15: 6, 16: 3, 17: 4, 18: 8, 19: 14, 20: 16, 21: 10, 22: 4},
+    'jardin': {13: 4, 14: 6, 15: 5, 16: 4, 17: 6, 18: 10, 19: 15, 20: 14, 21: 8, 22: 3},
+    'reservados': {14: 3, 15: 2, 18: 4, 19: 6, 20: 5}
+}
+
+# Distribución de tamaño de grupo por área (personas -> peso)
+PERSONAS_POR_AREA = {
+    'interior': {1: 2, 2: 30, 3: 15, 4: 30, 5: 8, 6: 10, 7: 3, 8: 2},
+    'jardin': {2: 25, 3: 12, 4: 28, 5: 10, 6: 15, 7: 5, 8: 5},
+    'reservados': {10: 3, 12: 4, 15: 5, 18: 3, 20: 4, 25: 2}
+}
+
+# Peso de cada área sobre el total de reservaciones del día
+PESO_AREA = {'interior': 55, 'jardin': 40, 'reservados': 5}
+
+# Factor de demanda por día de la semana (lunes = 0)
+FACTOR_DIA_SEMANA = {0: 0.6, 1: 0.6, 2: 0.7, 3: 0.85, 4: 1.35, 5: 1.5, 6: 1.1}
+
+# Proporción de reservaciones del historial que nunca registraron hora de salida
+PROPORCION_SIN_SALIDA = 0.12
+
+TAMANO_LOTE = 5000
+
+
+def _elegir(rng, distribucion):
+    opciones = list(distribucion)
+    return rng.choices(opciones, weights=[distribucion[opcion] for opcion in opciones])[0]
+
+
+def _duracion_estancia(rng, personas):
+    """Minutos de estancia: ~75 min para parejas, más largo para grupos grandes"""
+    media = 70 + 6 * min(personas, 12)
+    return max(25, int(rng.gauss(media, 20)))
+
+
+def asegurar_mesas():
+    """Sincroniza la tabla Mesa con la configuración. Retorna las mesas creadas"""
+    return len(reconciliar_mesas_config()['insertar'])
+
+
+def _insertar_en_lotes(modelo, filas):
+    for inicio in range(0, len(filas), TAMANO_LOTE):
+        db.session.execute(db.insert(modelo), filas[inicio:inicio + TAMANO_LOTE])
+
+
+def generar_datos(dias_pasados=90, dias_futuros=30, reservaciones_dia=40, mesas=None,
+                  semilla=42, fecha_base=None):
+    """Genera reservaciones para `dias_futuros` días (incluido hoy) e historial para
+    `dias_pasados` días. `mesas` limita cuántas mesas de la configuración se usan.
+
+    Retorna un diccionario con el total de filas insertadas por tabla.
+    Debe llamarse dentro de un contexto de aplicación.
+    """
+    rng = random.Random(semilla)
+    hoy = fecha_base or get_restaurant_now().date()
+
+    asegurar_mesas()
+    numeros_config = [
+        mesa_config['numero']
+        for mesas_area in get_mesas_config().values()
+        for mesa_config in mesas_area
+    ][:mesas]
+    mesas_db = Mesa.query.filter(Mesa.numero.in_(numeros_config), Mesa.activa).order_by(Mesa.numero).all()
+
+    # Mesas utilizables por área (las de capacidad 0 no tienen capacidad definida)
+    mesas_por_area = {}
+    for mesa in mesas_db:
+        if mesa.capacidad > 0:
+            mesas_por_area.setdefault(mesa.ubicacion, []).append(mesa)
+    pesos_area = {area: PESO_AREA.get(area, 10) for area in mesas_por_area}
+    if not pesos_area:
+        return {'reservaciones': 0, 'historial': 0}
+
+    reservaciones, historial = [], []
+    id_original = 0
+    for desplazamiento in range(-dias_pasados, dias_futuros):
+        fecha = hoy + timedelta(days=desplazamiento)
+        objetivo = round(reservaciones_dia * FACTOR_DIA_SEMANA[fecha.weekday()])
+        ocupacion = {}  # mesa_id -> minutos de inicio ya reservados ese día
+
+        for _ in range(objetivo):
+            area = _elegir(rng, pesos_area)
+            personas = _elegir(rng, PERSONAS_POR_AREA.get(area, {2: 1, 4: 1}))
+            minuto = _elegir(rng, HORAS_POR_AREA.get(area, {20: 1})) * 60 + rng.choice((0, 15, 30, 45))
+
+            # Mesa más ajustada al grupo sin conflicto de horario
+            candidatas = sorted(
+                (mesa for mesa in mesas_por_area[area] if mesa.capacidad >= personas),
+                key=lambda mesa: (mesa.capacidad, rng.random())
+            ) or mesas_por_area[area]
+            mesa = next((
+                candidata for candidata in candidatas
+                if all(abs(minuto - otro) >= DURACION_RESERVACION for otro in ocupacion.get(candidata.id, ()))
+            ), None)
+            if mesa is None:
+                continue
+            ocupacion.setdefault(mesa.id, []).append(minuto)
+
+            hora = time(minuto // 60, minuto % 60)
+            id_original += 1
+            fila = {
+                'mesa_id': mesa.id,
+                'hora_reservacion': hora,
+                'area': area,
+                'cantidad_personas': personas,
+                'nombre_reservador': f'Cliente {id_original}',
+                'telefono': f'602{rng.randrange(10 ** 7):07d}' if rng.random() < 0.8 else None,
+                'nota': None,
+                'fecha_reservacion': fecha
+            }
+            creacion = min(
+                datetime.combine(fecha - timedelta(days=rng.randint(0, 14)), time(rng.randint(9, 21), 0)),
+                datetime.utcnow()
+            )
+
+            if desplazamiento < 0:
+                if rng.random() < PROPORCION_SIN_SALIDA:
+                    hora_liberacion = None
+                    motivo = 'Liberación automática por fecha pasada'
+                else:
+                    salida = minuto + _duracion_estancia(rng, personas)
+                    hora_liberacion = time((salida // 60) % 24, salida % 60)
+                    motivo = 'Liberada manualmente por el usuario'
+                historial.append({
+                    **fila,
+                    'reservacion_id_original': id_original,
+                    'mesa_numero': mesa.numero,
+                    'fecha_creacion_original': creacion,
+                    'fecha_liberacion': datetime.combine(fecha, hora_liberacion or time(23, 59)),
+                    'hora_liberacion': hora_liberacion,
+                    'motivo_liberacion': motivo
+                })
+            else:
+                reservaciones.append({**fila, 'fecha_creacion': creacion})
+
+    _insertar_en_lotes(Reservacion, reservaciones)
+    _insertar_en_lotes(HistorialReservacion, historial)
+    actualizar_ocupacion({fila['fecha_reservacion'] for fila in reservaciones})
+    db.session.commit()
+    return {'reservaciones': len(reservaciones), 'historial': len(historial)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera reservaciones e historial sintéticos')
+    parser.add_argument('--dias-pasados', type=int, default=90, help='Días de historial a generar')
+    parser.add_argument('--dias-futuros', type=int, default=30, help='Días de reservaciones a partir de hoy')
+    parser.add_argument('--reservaciones-dia', type=int, default=40, help='Reservaciones en un día promedio')
+    parser.add_argument('--mesas', type=int, default=None, help='Limitar a las primeras N mesas de la configuración')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--limpiar', action='store_true', help='Eliminar reservaciones e historial antes de generar')
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        if args.limpiar:
+            print("🗑️ Eliminando reservaciones e historial existentes...")
+            Reservacion.query.delete()
+            HistorialReservacion.query.delete()
+            OcupacionMesa.query.delete()
+            db.session.commit()
+
+        print("📅 Generando datos sintéticos...")
+        inicio = datetime.now()
+        totales = generar_datos(
+            dias_pasados=args.dias_pasados,
+            dias_futuros=args.dias_futuros,
+            reservaciones_dia=args.reservaciones_dia,
+            mesas=args.mesas,
+            semilla=args.semilla
+        )
+        segundos = (datetime.now() - inicio).total_seconds()
+
+        print("✅ Datos generados exitosamente!")
+        print(f"   - Reservaciones: {totales['reservaciones']}")
+        print(f"   - Historial: {totales['historial']}")
+        print(f"   - Tiempo: {segundos:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+# Utilidades del perfil de huéspedes (modelo Huesped en app.py).
+# Un huésped se identifica por su teléfono normalizado: solo dígitos y, si trae lada
+# internacional, los últimos 10. Así "(662) 555-1234", "662.555.1234" y
+# "+52 662 555 1234" son la misma persona y la búsqueda es por un índice único.
+
+import re
+
+DIGITOS_TELEFONO = 10
+
+# Motivo con el que limpiar_reservaciones_pasadas mueve al historial las reservaciones
+# que nadie liberó: el cliente no llegó (o no se registró su salida)
+MOTIVO_NO_PRESENTADO = 'Liberación automática por fecha pasada'
+
+
+def normalizar_telefono(telefono):
+    """Retorna la clave del huésped para un teléfono, o None si no tiene dígitos suficientes"""
+    if not telefono:
+        return None
+    digitos = re.sub(r'\D', '', telefono)
+    if len(digitos) < 7:
+        return None
+    return digitos[-DIGITOS_TELEFONO:]
+
+
+def minutos_estancia(hora_reservacion, hora_liberacion):
+    """Duración de la visita en minutos; si la salida es menor que la llegada se asume el día siguiente"""
+    if not hora_reservacion or not hora_liberacion:
+        return None
+    inicio = hora_reservacion.hour * 60 + hora_reservacion.minute
+    fin = hora_liberacion.hour * 60 + hora_liberacion.minute
+    if fin < inicio:
+        fin += 24 * 60
+    return fin - inicio if fin > inicio else None
+
+
+def contadores_liberacion(cantidad_personas, hora_reservacion, hora_liberacion, motivo):
+    """Incrementos de los contadores del huésped al pasar una reservación al historial"""
+    if motivo == MOTIVO_NO_PRESENTADO:
+        return {'no_presentados': 1}
+    contadores = {'visitas': 1, 'total_personas': cantidad_personas}
+    estancia = minutos_estancia(hora_reservacion, hora_liberacion)
+    if estancia is not None:
+        contadores['minutos_estancia'] = estancia
+        contadores['estancias_medidas'] = 1
+    return contadores
@@ -0,0 +1,198 @@
+# Importación masiva de reservaciones (eventos, agencias) desde CSV, XLSX o un arreglo JSON.
+# Las filas se leen completas a memoria y se validan contra la agenda de cada fecha
+# (AsignadorMesas de asignacion_mesas.py): las reservaciones existentes y las filas válidas
+# anteriores del mismo archivo, con la regla de DURACION_RESERVACION. Cada fila inválida se
+# reporta con su número y el motivo; las válidas se insertan después por lotes.
+# Los encabezados aceptan los nombres de la API (fecha_reservacion, hora_reservacion, ...)
+# o los cortos (fecha, hora, personas, nombre, mesa), sin importar mayúsculas ni acentos.
+# 'mesa' es el número de mesa; sin mesa se asigna una automáticamente.
+
+import csv
+import io
+import unicodedata
+from datetime import date, datetime, time
+
+from openpyxl import load_workbook
+
+ALIAS = {
+    'fecha': 'fecha_reservacion',
+    'hora': 'hora_reservacion',
+    'personas': 'cantidad_personas',
+    'nombre': 'nombre_reservador',
+    'numero_mesa': 'mesa',
+    'mesa_numero': 'mesa',
+    'ubicacion': 'area'
+}
+
+
+def _sin_acentos(texto):
+    return unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode()
+
+
+def normalizar_encabezado(encabezado):
+    clave = '_'.join(_sin_acentos(str(encabezado or '')).lower().split())
+    return ALIAS.get(clave, clave)
+
+
+def _filas_con_encabezado(filas, primera=2):
+    """(número de fila, dict) a partir de filas de valores con los encabezados en la primera"""
+    filas = iter(filas)
+    encabezados = [normalizar_encabezado(valor) for valor in next(filas, ())]
+    for numero, valores in enumerate(filas, start=primera):
+        if all(valor is None or str(valor).strip() == '' for valor in valores):
+            continue
+        yield numero, dict(zip(encabezados, valores))
+
+
+def leer_csv(contenido):
+    """Filas de un CSV (bytes, UTF-8 con o sin BOM); detecta ',' o ';' como separador"""
+    texto = contenido.decode('utf-8-sig')
+    try:
+        dialecto = csv.Sniffer().sniff(texto[:4096], delimiters=',;\t')
+    except csv.Error:
+        dialecto = csv.excel
+    return list(_filas_con_encabezado(csv.reader(io.StringIO(texto), dialecto)))
+
+
+def leer_xlsx(contenido):
+    """Filas de la primera hoja de un XLSX; en modo solo lectura openpyxl no carga el libro completo"""
+    libro = load_workbook(io.BytesIO(contenido), read_only=True, data_only=True)
+    try:
+        return list(_filas_con_encabezado(libro.worksheets[0].iter_rows(values_only=True)))
+    finally:
+        libro.close()
+
+
+def leer_json(datos):
+    """Filas de un arreglo JSON de objetos (la fila es la posición, desde 1)"""
+    return [(numero, {normalizar_encabezado(clave): valor for clave, valor in fila.items()}
+             if isinstance(fila, dict) else None)
+            for numero, fila in enumerate(datos, start=1)]
+
+
+def _texto(valor):
+    if valor is None:
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    texto = str(valor).strip()
+    return texto or None
+
+
+def _fecha(valor):
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    texto = _texto(valor)
+    for formato in ('%Y-%m-%d', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except (TypeError, ValueError):
+            pass
+    raise ValueError('Fecha inválida (AAAA-MM-DD o DD/MM/AAAA)')
+
+
+def _hora(valor):
+    if isinstance(valor, datetime):
+        return valor.time().replace(second=0, microsecond=0)
+    if isinstance(valor, time):
+        return valor.replace(second=0, microsecond=0)
+    texto = _texto(valor)
+    for formato in ('%H:%M', '%H:%M:%S'):
+        try:
+            return datetime.strptime(texto, formato).time().replace(second=0)
+        except (TypeError, ValueError):
+            pass
+    raise ValueError('Hora inválida (HH:MM)')
+
+
+def convertir_fila(datos):
+    """Valores tipados de una fila (sin validar mesas ni horarios). Lanza ValueError"""
+    if datos is None:
+        raise ValueError('La fila debe ser un objeto')
+    for campo in ('fecha_reservacion', 'hora_reservacion', 'cantidad_personas', 'nombre_reservador'):
+        if _texto(datos.get(campo)) is None:
+            raise ValueError(f'Campo requerido: {campo}')
+    try:
+        personas = int(float(_texto(datos['cantidad_personas'])))
+    except ValueError:
+        raise ValueError('cantidad_personas debe ser un número')
+    if personas < 1:
+        raise ValueError('La cantidad de personas debe ser mayor a 0')
+    mesa = _texto(datos.get('mesa'))
+    if mesa is not None and not mesa.isdigit():
+        raise ValueError('mesa debe ser el número de mesa')
+    return {
+        'fecha_reservacion': _fecha(datos['fecha_reservacion']),
+        'hora_reservacion': _hora(datos['hora_reservacion']),
+        'cantidad_personas': personas,
+        'nombre_reservador': _texto(datos['nombre_reservador'])[:100],
+        'telefono': (_texto(datos.get('telefono')) or '')[:20] or None,
+        'nota': _texto(datos.get('nota')),
+        'area': _sin_acentos(_texto(datos.get('area')) or '').lower() or None,
+        'mesa': int(mesa) if mesa is not None else None
+    }
+
+
+def validar_filas(filas, mesas, asignadores_para, bloqueadas=None):
+    """Valida las filas leídas y elige sus mesas.
+
+    `mesas` son dicts (id, numero, area) de las mesas activas; `asignadores_para(fechas)`
+    retorna un AsignadorMesas por fecha con la agenda existente, que se va ocupando con cada
+    fila válida; `bloqueadas` {fecha: mesas_ids} que no aceptan otra reservación por su estado.
+    Retorna (válidas, errores): las válidas son dicts listos para Reservacion y los errores
+    {'fila', 'error'}"""
+    por_numero = {mesa['numero']: mesa for mesa in mesas}
+    areas = {mesa['area'] for mesa in mesas}
+    bloqueadas = bloqueadas or {}
+    validas, errores = [], []
+
+    convertidas = []
+    for numero, datos in filas:
+        try:
+            valores = convertir_fila(datos)
+        except ValueError as error:
+            errores.append({'fila': numero, 'error': str(error)})
+            continue
+        if valores['area'] is not None and valores['area'] not in areas:
+            errores.append({'fila': numero, 'error': f"Área no válida: {valores['area']}"})
+            continue
+        convertidas.append((numero, valores))
+    asignadores = asignadores_para({valores['fecha_reservacion'] for _, valores in convertidas})
+
+    for numero, valores in convertidas:
+        asignador = asignadores[valores['fecha_reservacion']]
+        minuto = valores['hora_reservacion'].hour * 60 + valores['hora_reservacion'].minute
+        bloqueadas_fecha = bloqueadas.get(valores['fecha_reservacion'], ())
+        numero_mesa = valores.pop('mesa')
+        if numero_mesa is None:
+            candidato = asignador.mejor(valores['cantidad_personas'], minuto, valores['area'], bloqueadas=bloqueadas_fecha)
+            if candidato is None:
+                errores.append({'fila': numero, 'error': 'No hay mesas disponibles para ese grupo en ese horario'})
+                continue
+            mesas_ids, valores['area'] = list(candidato.mesas_ids), candidato.area
+        else:
+            mesa = por_numero.get(numero_mesa)
+            if mesa is None:
+                errores.append({'fila': numero, 'error': f'Mesa {numero_mesa} no encontrada'})
+                continue
+            if valores['area'] and valores['area'] != mesa['area']:
+                errores.append({'fila': numero, 'error': f"La mesa {numero_mesa} no está en el área {valores['area']}"})
+                continue
+            if mesa['id'] in bloqueadas_fecha:
+                errores.append({'fila': numero, 'error': f'La mesa {numero_mesa} está ocupada o ya reservada hoy'})
+                continue
+            if not asignador.libre(mesa['id'], minuto):
+                errores.append({'fila': numero, 'error': f'Ya existe una reservación para la mesa {numero_mesa} en ese horario'})
+                continue
+            mesas_ids, valores['area'] = [mesa['id']], mesa['area']
+
+        # Las filas siguientes del archivo ya ven esta reservación
+        asignador.ocupar(mesas_ids, minuto)
+        valores['mesa_id'] = mesas_ids[0]
+        valores['mesas_unidas'] = ','.join(str(mesa_id) for mesa_id in mesas_ids[1:])
+        valores['fila'] = numero
+        validas.append(valores)
+    errores.sort(key=lambda error: error['fila'])
+    return validas, errores
@@ -1,11 +1,14 @@
-from app import app, db, Mesa, Reservacion
+from flask_migrate import upgrade
+
+from app import app, db, Mesa, Reservacion, reconciliar_mesas_config, actualizar_ocupacion
+from reconciliacion_mesas import total_cambios
 from mesas_config import get_mesas_config
 from datetime import datetime, time
 
 def init_database():
     with app.app_context():
-        # Crear todas las tablas
-        db.create_all()
+        # Crear o actualizar el esquema con la cadena de migraciones
+        upgrade()
         
         # Verificar si ya existen mesas
         if Mesa.query.first() is None:
@@ -18,16 +21,7 @@ def init_database():
             print("➕ Creando mesas...")
             for area, mesas_area in mesas_config.items():
                 print(f"   - Área {area}: {len(mesas_area)} mesas")
-                for mesa_config in mesas_area:
-                    mesa = Mesa(
-                        numero=mesa_config['numero'],
-                        capacidad=mesa_config['capacidad'],
-                        ubicacion=area,
-                        posicion_x=mesa_config['posicion_x'],
-                        posicion_y=mesa_config['posicion_y'],
-                        estado='disponible'
-                    )
-                    db.session.add(mesa)
+            reconciliar_mesas_config()
             
             # Crear algunas reservaciones de ejemplo
             print("📅 Creando reservaciones de ejemplo...")
@@ -77,6 +71,8 @@ def init_database():
                 mesa28.estado = 'reservada'
                 mesa28.fecha = datetime.now().date()
             
+            # Franjas de ocupación de las reservaciones de ejemplo (como en crear_reservacion)
+            actualizar_ocupacion({reservacion.fecha_reservacion for reservacion in reservaciones_ejemplo})
             db.session.commit()
             
             # Mostrar estadísticas
@@ -94,6 +90,10 @@ def init_database():
                 print(f"   - {area.capitalize()}: {mesas_area} mesas")
         else:
             print("ℹ️ La base de datos ya contiene datos")
+            cambios = reconciliar_mesas_config()
+            if total_cambios(cambios):
+                print(f"🔄 Mesas sincronizadas con mesas_config: {len(cambios['insertar'])} nuevas, "
+                      f"{len(cambios['actualizar'])} actualizadas, {len(cambios['desactivar'])} desactivadas")
 
 if __name__ == '__main__':
     init_database() 
\ No newline at end of file
@@ -1,6 +1,9 @@
 # Configuración estática de todas las mesas del restaurante
 # Este archivo define la estructura fija de las mesas para optimizar la carga
 
+import hashlib
+import json
+
 MESAS_CONFIG = {
     'interior': [
         # Columna 1: Mesas 101, 102, 103, 104, 105
@@ -65,37 +68,104 @@ LAYOUT_CONFIG = {
     }
 }
 
-def get_mesas_config():
-    """Retorna la configuración completa de todas las mesas"""
-    return MESAS_CONFIG
-
-def get_layout_config():
-    """Retorna la configuración de layout por área"""
-    return LAYOUT_CONFIG
-
-def get_mesas_por_area(area):
-    """Retorna la configuración de mesas para un área específica"""
-    return MESAS_CONFIG.get(area, [])
-
-def get_mesa_config(numero):
-    """Retorna la configuración de una mesa específica por número"""
-    for area, mesas in MESAS_CONFIG.items():
-        for mesa in mesas:
-            if mesa['numero'] == numero:
-                return {**mesa, 'ubicacion': area}
-    return None
-
-def get_total_mesas():
-    """Retorna el total de mesas en el restaurante"""
-    total = 0
-    for area, mesas in MESAS_CONFIG.items():
-        total += len(mesas)
-    return total
-
-def get_mesas_disponibles_por_area(area):
-    """Retorna solo las mesas disponibles para un área (sin estado de BD)"""
-    return MESAS_CONFIG.get(area, [])
-
-def get_mesa_ids_por_area(area):
-    """Retorna los números de mesa para un área específica"""
-    return [mesa['numero'] for mesa in MESAS_CONFIG.get(area, [])] 
\ No newline at end of file
+# Horario en que se aceptan reservaciones (turnos cada intervalo_minutos, fin incluido)
+HORARIO_RESERVACIONES = {
+    'inicio': '13:00',
+    'fin': '22:00',
+    'intervalo_minutos': 30
+}
+
+class ConfiguracionMesas:
+    """Mesas, layout y horario de un restaurante. Cada sucursal (sucursales.py) tiene la
+    suya; las funciones de este módulo usan la del restaurante principal (CONFIGURACION)"""
+
+    def __init__(self, mesas, layout, horario):
+        self.mesas = mesas
+        self.layout = layout
+        self.horario = horario
+        self._layout_compacto = None
+
+    @classmethod
+    def desde_modulo(cls, modulo):
+        """Configuración de un módulo con MESAS_CONFIG, LAYOUT_CONFIG y (opcional) HORARIO_RESERVACIONES"""
+        if isinstance(getattr(modulo, 'CONFIGURACION', None), cls):
+            return modulo.CONFIGURACION
+        return cls(modulo.MESAS_CONFIG, modulo.LAYOUT_CONFIG,
+                   getattr(modulo, 'HORARIO_RESERVACIONES', HORARIO_RESERVACIONES))
+
+    def get_mesas_config(self):
+        """Retorna la configuración completa de todas las mesas"""
+        return self.mesas
+
+    def get_layout_config(self):
+        """Retorna la configuración de layout por área"""
+        return self.layout
+
+    def get_mesas_por_area(self, area):
+        """Retorna la configuración de mesas para un área específica"""
+        return self.mesas.get(area, [])
+
+    def get_mesa_config(self, numero):
+        """Retorna la configuración de una mesa específica por número"""
+        for area, mesas in self.mesas.items():
+            for mesa in mesas:
+                if mesa['numero'] == numero:
+                    return {**mesa, 'ubicacion': area}
+        return None
+
+    def get_total_mesas(self):
+        """Retorna el total de mesas en el restaurante"""
+        total = 0
+        for area, mesas in self.mesas.items():
+            total += len(mesas)
+        return total
+
+    def get_mesas_disponibles_por_area(self, area):
+        """Retorna solo las mesas disponibles para un área (sin estado de BD)"""
+        return self.mesas.get(area, [])
+
+    def get_mesa_ids_por_area(self, area):
+        """Retorna los números de mesa para un área específica"""
+        return [mesa['numero'] for mesa in self.mesas.get(area, [])]
+
+    def get_turnos_reservacion(self):
+        """Retorna los turnos reservables como minutos desde medianoche"""
+        inicio_h, inicio_m = map(int, self.horario['inicio'].split(':'))
+        fin_h, fin_m = map(int, self.horario['fin'].split(':'))
+        return list(range(inicio_h * 60 + inicio_m, fin_h * 60 + fin_m + 1, self.horario['intervalo_minutos']))
+
+    def get_layout_compacto(self):
+        """Retorna el layout estático en formato columnar (arreglos paralelos en el orden
+        de la configuración) junto con su huella, que cambia solo si cambia la configuración"""
+        if self._layout_compacto is None:
+            layout = {
+                'areas': self.layout,
+                'numeros': [],
+                'capacidades': [],
+                'ubicaciones': [],
+                'posiciones_x': [],
+                'posiciones_y': []
+            }
+            for area, mesas in self.mesas.items():
+                for mesa in mesas:
+                    layout['numeros'].append(mesa['numero'])
+                    layout['capacidades'].append(mesa['capacidad'])
+                    layout['ubicaciones'].append(area)
+                    layout['posiciones_x'].append(mesa['posicion_x'])
+                    layout['posiciones_y'].append(mesa['posicion_y'])
+            contenido = json.dumps(layout, sort_keys=True, separators=(',', ':'))
+            layout['huella'] = hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:12]
+            self._layout_compacto = layout
+        return self._layout_compacto
+
+CONFIGURACION = ConfiguracionMesas(MESAS_CONFIG, LAYOUT_CONFIG, HORARIO_RESERVACIONES)
+
+get_mesas_config = CONFIGURACION.get_mesas_config
+get_layout_config = CONFIGURACION.get_layout_config
+get_mesas_por_area = CONFIGURACION.get_mesas_por_area
+get_mesa_config = CONFIGURACION.get_mesa_config
+get_total_mesas = CONFIGURACION.get_total_mesas
+get_mesas_disponibles_por_area = CONFIGURACION.get_mesas_disponibles_por_area
+get_mesa_ids_por_area = CONFIGURACION.get_mesa_ids_por_area
+get_turnos_reservacion = CONFIGURACION.get_turnos_reservacion
+get_layout_compacto = CONFIGURACION.get_layout_compacto
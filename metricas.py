@@ -0,0 +1,157 @@
+# Instrumentación de peticiones: latencia por endpoint, consultas SQL por petición
+# y tamaño de respuesta. Las métricas se exponen en formato de texto de Prometheus
+# y, opcionalmente, en el encabezado Server-Timing de cada respuesta.
+
+import threading
+import time
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Límites superiores de los buckets de cada histograma
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BUCKETS_CONSULTAS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+BUCKETS_TAMANO = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class Histograma:
+    """Histograma acumulativo por conjunto de etiquetas, seguro entre hilos"""
+
+    def __init__(self, nombre, descripcion, buckets, etiquetas):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.buckets = buckets
+        self.etiquetas = etiquetas
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valores_etiquetas, valor):
+        with self._lock:
+            serie = self._series.get(valores_etiquetas)
+            if serie is None:
+                serie = self._series[valores_etiquetas] = {
+                    'buckets': [0] * len(self.buckets),
+                    'suma': 0.0,
+                    'cuenta': 0
+                }
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie['buckets'][i] += 1
+            serie['suma'] += valor
+            serie['cuenta'] += 1
+
+    def _formatear_etiquetas(self, valores_etiquetas, extra=None):
+        pares = list(zip(self.etiquetas, valores_etiquetas))
+        if extra:
+            pares.append(extra)
+        return ','.join(f'{clave}="{valor}"' for clave, valor in pares)
+
+    def exponer(self):
+        """Devuelve las líneas del histograma en formato de texto de Prometheus"""
+        lineas = [
+            f'# HELP {self.nombre} {self.descripcion}',
+            f'# TYPE {self.nombre} histogram'
+        ]
+        with self._lock:
+            series = {clave: {**serie, 'buckets': list(serie['buckets'])} for clave, serie in self._series.items()}
+        for valores_etiquetas, serie in sorted(series.items()):
+            for limite, acumulado in zip(self.buckets, serie['buckets']):
+                etiquetas = self._formatear_etiquetas(valores_etiquetas, ('le', limite))
+                lineas.append(f'{self.nombre}_bucket{{{etiquetas}}} {acumulado}')
+            etiquetas = self._formatear_etiquetas(valores_etiquetas, ('le', '+Inf'))
+            lineas.append(f'{self.nombre}_bucket{{{etiquetas}}} {serie["cuenta"]}')
+            etiquetas = self._formatear_etiquetas(valores_etiquetas)
+            lineas.append(f'{self.nombre}_sum{{{etiquetas}}} {serie["suma"]:.6f}')
+            lineas.append(f'{self.nombre}_count{{{etiquetas}}} {serie["cuenta"]}')
+        return lineas
+
+
+class Metricas:
+    """Registra latencia, consultas SQL y tamaño de respuesta de cada petición.
+
+    Las métricas viven en memoria del proceso: con varios workers cada uno
+    expone las suyas y Prometheus las agrega al consultar cada instancia.
+    """
+
+    def __init__(self, app=None):
+        etiquetas = ('endpoint', 'metodo')
+        self.latencia = Histograma(
+            'monaco_peticion_segundos', 'Latencia de las peticiones HTTP por endpoint',
+            BUCKETS_LATENCIA, etiquetas
+        )
+        self.consultas = Histograma(
+            'monaco_sql_consultas_por_peticion', 'Consultas SQL ejecutadas por petición',
+            BUCKETS_CONSULTAS, etiquetas
+        )
+        self.tiempo_sql = Histograma(
+            'monaco_sql_segundos_por_peticion', 'Tiempo total en consultas SQL por petición',
+            BUCKETS_LATENCIA, etiquetas
+        )
+        self.tamano = Histograma(
+            'monaco_respuesta_bytes', 'Tamaño del cuerpo de las respuestas por endpoint',
+            BUCKETS_TAMANO, etiquetas
+        )
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('METRICAS_SERVER_TIMING', False)
+        app.before_request(self._inicio_peticion)
+        app.after_request(self._fin_peticion)
+        # Se escucha sobre la clase Engine para cubrir cualquier motor que cree la app
+        if not event.contains(Engine, 'before_cursor_execute', _antes_de_consulta):
+            event.listen(Engine, 'before_cursor_execute', _antes_de_consulta)
+            event.listen(Engine, 'after_cursor_execute', _despues_de_consulta)
+
+    def _inicio_peticion(self):
+        g.metricas_inicio = time.perf_counter()
+        g.metricas_consultas = 0
+        g.metricas_tiempo_sql = 0.0
+
+    def _fin_peticion(self, response):
+        inicio = g.pop('metricas_inicio', None)
+        if inicio is None:
+            return response
+        duracion = time.perf_counter() - inicio
+        consultas = g.get('metricas_consultas', 0)
+        tiempo_sql = g.get('metricas_tiempo_sql', 0.0)
+        etiquetas = (request.endpoint or 'sin_ruta', request.method)
+
+        self.latencia.observar(etiquetas, duracion)
+        self.consultas.observar(etiquetas, consultas)
+        self.tiempo_sql.observar(etiquetas, tiempo_sql)
+        if not response.direct_passthrough:
+            self.tamano.observar(etiquetas, response.calculate_content_length() or 0)
+
+        if current_app.config['METRICAS_SERVER_TIMING']:
+            response.headers['Server-Timing'] = (
+                f'app;dur={duracion * 1000:.1f}, '
+                f'db;dur={tiempo_sql * 1000:.1f};desc="{consultas} consultas"'
+            )
+        return response
+
+    def exponer(self):
+        """Todas las métricas en formato de texto de Prometheus"""
+        lineas = []
+        for histograma in (self.latencia, self.consultas, self.tiempo_sql, self.tamano):
+            lineas.extend(histograma.exponer())
+        return '\n'.join(lineas) + '\n'
+
+    def respuesta_prometheus(self):
+        return Response(self.exponer(), mimetype='text/plain; version=0.0.4')
+
+
+def _antes_de_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metricas_inicio_consulta', []).append(time.perf_counter())
+
+
+def _despues_de_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get('metricas_inicio_consulta')
+    if not inicios:
+        return
+    duracion = time.perf_counter() - inicios.pop()
+    # Las consultas fuera de una petición (scripts, tareas) no se contabilizan
+    if has_request_context() and 'metricas_consultas' in g:
+        g.metricas_consultas += 1
+        g.metricas_tiempo_sql += duracion
@@ -0,0 +1,98 @@
+# Utilidades para las revisiones de migrations/versions.
+# Cada paso comprueba lo que ya existe antes de crearlo, así una base creada con
+# db.create_all() o actualizada con los antiguos scripts add_*/update_* avanza por la
+# cadena sin errores y sin perder datos. Las migraciones de datos se hacen por lotes de
+# ids, confirmando cada lote por separado para no bloquear la base durante el servicio.
+
+import sqlalchemy as sa
+from alembic import op
+
+TAMANO_LOTE = 5000
+
+
+def tabla_existe(tabla):
+    return sa.inspect(op.get_bind()).has_table(tabla)
+
+
+def columna_existe(tabla, columna):
+    return any(c['name'] == columna for c in sa.inspect(op.get_bind()).get_columns(tabla))
+
+
+def indice_existe(tabla, indice):
+    return any(i['name'] == indice for i in sa.inspect(op.get_bind()).get_indexes(tabla))
+
+
+def crear_tabla(tabla, *columnas):
+    """op.create_table solo si la tabla no existe. Retorna True si la creó"""
+    if tabla_existe(tabla):
+        return False
+    op.create_table(tabla, *columnas)
+    return True
+
+
+def agregar_columna(tabla, columna):
+    """op.add_column solo si la columna no existe"""
+    if columna_existe(tabla, columna.name):
+        return
+    dialecto = op.get_bind().dialect
+    if dialecto.name == 'sqlite' and columna.foreign_keys:
+        # SQLite acepta REFERENCES en ADD COLUMN sin recrear la tabla; Alembic pediría
+        # el modo batch, que copia la tabla completa y elimina sus triggers
+        tabla_ref, columna_ref = next(iter(columna.foreign_keys)).target_fullname.split('.')
+        op.execute(
+            f'ALTER TABLE {tabla} ADD COLUMN {columna.name} {columna.type.compile(dialect=dialecto)} '
+            f'REFERENCES {tabla_ref} ({columna_ref})'
+        )
+    else:
+        op.add_column(tabla, columna)
+
+
+def quitar_columna(tabla, columna):
+    if not columna_existe(tabla, columna):
+        return
+    conexion = op.get_bind()
+    inspector = sa.inspect(conexion)
+    sencilla = (
+        not any(columna in indice['column_names'] for indice in inspector.get_indexes(tabla))
+        and not any(columna in fk['constrained_columns'] for fk in inspector.get_foreign_keys(tabla))
+    )
+    if conexion.dialect.name == 'sqlite' and conexion.dialect.dbapi.sqlite_version_info >= (3, 35) and sencilla:
+        # DROP COLUMN nativo (SQLite 3.35+): sin copiar la tabla, conserva sus triggers
+        op.execute(f'ALTER TABLE {tabla} DROP COLUMN {columna}')
+    else:
+        with op.batch_alter_table(tabla) as batch:
+            batch.drop_column(columna)
+
+
+def crear_indice(indice, tabla, columnas, unique=False, **kw):
+    if not indice_existe(tabla, indice):
+        op.create_index(indice, tabla, columnas, unique=unique, **kw)
+
+
+def quitar_indice(indice, tabla):
+    if tabla_existe(tabla) and indice_existe(tabla, indice):
+        op.drop_index(indice, table_name=tabla)
+
+
+def actualizar_en_lotes(tabla, valores, condicion=None, tamano_lote=TAMANO_LOTE):
+    """UPDATE `tabla` SET `valores` [WHERE `condicion`] recorriendo la tabla por rangos de id.
+
+    `tabla` es un sa.table() con una columna 'id'; `valores` y `condicion` pueden ser
+    expresiones sobre sus columnas. Cada lote se confirma por separado (autocommit), así
+    que otras conexiones pueden escribir entre lotes y una interrupción solo deja
+    pendientes los lotes no procesados: la sentencia debe poder repetirse sin efecto
+    (la condición debe excluir las filas ya migradas). Retorna las filas actualizadas.
+    """
+    conexion = op.get_bind()
+    minimo, maximo = conexion.execute(sa.select(sa.func.min(tabla.c.id), sa.func.max(tabla.c.id))).one()
+    if minimo is None:
+        return 0
+
+    actualizadas = 0
+    with op.get_context().autocommit_block():
+        for desde in range(minimo, maximo + 1, tamano_lote):
+            sentencia = tabla.update().where(tabla.c.id >= desde, tabla.c.id < desde + tamano_lote)
+            if condicion is not None:
+                sentencia = sentencia.where(condicion)
+            actualizadas += conexion.execute(sentencia.values(valores)).rowcount
+    return actualizadas
@@ -0,0 +1,69 @@
+"""Esquema inicial: mesas, reservaciones e historial
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-06-01 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migraciones import crear_tabla
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    crear_tabla(
+        'mesa',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('numero', sa.Integer(), nullable=False),
+        sa.Column('capacidad', sa.Integer(), nullable=False),
+        sa.Column('estado', sa.String(length=20), nullable=True),
+        sa.Column('ubicacion', sa.String(length=50), nullable=True),
+        sa.Column('posicion_x', sa.Integer(), nullable=True),
+        sa.Column('posicion_y', sa.Integer(), nullable=True),
+        sa.Column('grupo_id', sa.Integer(), nullable=True),
+        sa.Column('fecha', sa.Date(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    crear_tabla(
+        'reservacion',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('mesa_id', sa.Integer(), nullable=False),
+        sa.Column('hora_reservacion', sa.Time(), nullable=False),
+        sa.Column('area', sa.String(length=50), nullable=False),
+        sa.Column('cantidad_personas', sa.Integer(), nullable=False),
+        sa.Column('nombre_reservador', sa.String(length=100), nullable=False),
+        sa.Column('fecha_reservacion', sa.Date(), nullable=False),
+        sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['mesa_id'], ['mesa.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    crear_tabla(
+        'historial_reservacion',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('reservacion_id_original', sa.Integer(), nullable=False),
+        sa.Column('mesa_id', sa.Integer(), nullable=False),
+        sa.Column('mesa_numero', sa.Integer(), nullable=False),
+        sa.Column('hora_reservacion', sa.Time(), nullable=False),
+        sa.Column('area', sa.String(length=50), nullable=False),
+        sa.Column('cantidad_personas', sa.Integer(), nullable=False),
+        sa.Column('nombre_reservador', sa.String(length=100), nullable=False),
+        sa.Column('fecha_reservacion', sa.Date(), nullable=False),
+        sa.Column('fecha_creacion_original', sa.DateTime(), nullable=False),
+        sa.Column('fecha_liberacion', sa.DateTime(), nullable=True),
+        sa.Column('motivo_liberacion', sa.String(length=200), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('historial_reservacion')
+    op.drop_table('reservacion')
+    op.drop_table('mesa')
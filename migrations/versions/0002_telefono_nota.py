@@ -0,0 +1,30 @@
+"""Teléfono y nota en reservaciones e historial (antes add_columns.py)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-06-15 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migraciones import agregar_columna, quitar_columna
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for tabla in ('reservacion', 'historial_reservacion'):
+        agregar_columna(tabla, sa.Column('telefono', sa.String(length=20), nullable=True))
+        agregar_columna(tabla, sa.Column('nota', sa.Text(), nullable=True))
+
+
+def downgrade():
+    for tabla in ('reservacion', 'historial_reservacion'):
+        quitar_columna(tabla, 'nota')
+        quitar_columna(tabla, 'telefono')
@@ -0,0 +1,26 @@
+"""Hora de liberación en el historial (antes add_hora_liberacion_column.py)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-07-01 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migraciones import agregar_columna, quitar_columna
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    agregar_columna('historial_reservacion', sa.Column('hora_liberacion', sa.Time(), nullable=True))
+
+
+def downgrade():
+    quitar_columna('historial_reservacion', 'hora_liberacion')
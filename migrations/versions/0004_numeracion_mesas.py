@@ -0,0 +1,88 @@
+"""Numeración por área de las mesas
+
+Reemplaza update_mesa_numbers.py, update_jardin_mesa_numbers.py y
+add_jardin_new_mesas.py. Interior 1-15 pasa a 101-109 y 201-206, jardín 16-21 a 301-306, se eliminan las
+mesas 22-27 del jardín y se agregan las mesas 401-406. Solo toca bases que todavía
+tienen la numeración anterior; en una base nueva o ya renumerada no hace nada.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-07-15 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+mesa = sa.table(
+    'mesa',
+    sa.column('id', sa.Integer), sa.column('numero', sa.Integer), sa.column('capacidad', sa.Integer),
+    sa.column('estado', sa.String), sa.column('ubicacion', sa.String),
+    sa.column('posicion_x', sa.Integer), sa.column('posicion_y', sa.Integer)
+)
+reservacion = sa.table('reservacion', sa.column('mesa_id', sa.Integer))
+
+NUMEROS_INTERIOR = {
+    1: 101, 2: 102, 3: 103, 4: 104, 5: 105,
+    6: 106, 7: 107, 8: 108, 9: 109,
+    10: 201, 11: 202, 12: 203,
+    13: 204, 14: 205, 15: 206
+}
+NUMEROS_JARDIN = {16: 301, 17: 302, 18: 303, 19: 304, 20: 305, 21: 306}
+JARDIN_ELIMINADAS = (22, 23, 24, 25, 26, 27)
+JARDIN_NUEVAS = [(401, 3, 1), (402, 3, 2), (403, 3, 3), (404, 4, 1), (405, 4, 2), (406, 4, 3)]
+
+
+def _renumerar(conexion, ubicacion, numeros):
+    for anterior, nuevo in numeros.items():
+        ocupado = sa.exists().where(mesa.c.ubicacion == ubicacion, mesa.c.numero == nuevo)
+        conexion.execute(
+            mesa.update()
+            .where(mesa.c.ubicacion == ubicacion, mesa.c.numero == anterior, ~ocupado)
+            .values(numero=nuevo)
+        )
+
+
+def upgrade():
+    conexion = op.get_bind()
+    numeracion_anterior = conexion.execute(
+        sa.select(sa.func.count()).select_from(mesa).where(
+            mesa.c.numero.in_(list(NUMEROS_INTERIOR) + list(NUMEROS_JARDIN) + list(JARDIN_ELIMINADAS))
+        )
+    ).scalar()
+    if not numeracion_anterior:
+        return
+
+    _renumerar(conexion, 'interior', NUMEROS_INTERIOR)
+
+    # Las mesas retiradas del jardín se eliminan solo si no tienen reservaciones
+    conexion.execute(
+        mesa.delete().where(
+            mesa.c.ubicacion == 'jardin',
+            mesa.c.numero.in_(JARDIN_ELIMINADAS),
+            ~sa.exists().where(reservacion.c.mesa_id == mesa.c.id)
+        )
+    )
+    _renumerar(conexion, 'jardin', NUMEROS_JARDIN)
+
+    existentes = set(conexion.execute(
+        sa.select(mesa.c.numero).where(mesa.c.ubicacion == 'jardin')
+    ).scalars())
+    nuevas = [
+        {'numero': numero, 'capacidad': 0, 'estado': 'disponible', 'ubicacion': 'jardin',
+         'posicion_x': posicion_x, 'posicion_y': posicion_y}
+        for numero, posicion_x, posicion_y in JARDIN_NUEVAS if numero not in existentes
+    ]
+    if nuevas:
+        op.bulk_insert(mesa, nuevas)
+
+
+def downgrade():
+    # Migración de datos: la numeración anterior no se restaura
+    pass
@@ -0,0 +1,50 @@
+"""Tabla grupo_mesas con miembros y capacidad precalculados
+
+Los grupos que ya existían solo como Mesa.grupo_id se crean a partir de sus mesas,
+con el mismo id, en una sola sentencia.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-09-01 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migraciones import crear_tabla
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    crear_tabla(
+        'grupo_mesas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('ubicacion', sa.String(length=50), nullable=False),
+        sa.Column('mesa_principal_id', sa.Integer(), nullable=False),
+        sa.Column('mesas_ids', sa.String(length=200), nullable=False),
+        sa.Column('mesas_numeros', sa.String(length=200), nullable=False),
+        sa.Column('capacidad_total', sa.Integer(), nullable=False),
+        sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    # group_concat sobre una subconsulta ordenada conserva el orden por número de mesa
+    op.execute("""
+        INSERT INTO grupo_mesas (id, ubicacion, mesa_principal_id, mesas_ids, mesas_numeros,
+                                 capacidad_total, fecha_creacion)
+        SELECT grupo_id, MIN(ubicacion), MIN(id), group_concat(id, ','), group_concat(numero, ','),
+               SUM(capacidad), CURRENT_TIMESTAMP
+        FROM (SELECT * FROM mesa WHERE grupo_id IS NOT NULL ORDER BY numero)
+        GROUP BY grupo_id
+        HAVING grupo_id NOT IN (SELECT id FROM grupo_mesas)
+    """)
+
+
+def downgrade():
+    op.drop_table('grupo_mesas')
@@ -0,0 +1,26 @@
+"""Índice (fecha_reservacion, mesa_id) en reservacion (antes add_indice_reservaciones.py)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-01 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migraciones import crear_indice, quitar_indice
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    crear_indice('ix_reservacion_fecha_mesa', 'reservacion', ['fecha_reservacion', 'mesa_id'])
+
+
+def downgrade():
+    quitar_indice('ix_reservacion_fecha_mesa', 'reservacion')
@@ -0,0 +1,35 @@
+"""Índice FTS5 de búsqueda sobre reservaciones e historial (antes add_indice_busqueda.py)
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-10 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from busqueda import TABLA_BUSQUEDA, crear_indice_busqueda, eliminar_indice_busqueda
+from migraciones import tabla_existe
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    # Si el índice es nuevo se llena con las filas existentes; los triggers lo mantienen después
+    crear_indice_busqueda(op.get_bind(), reconstruir=not tabla_existe(TABLA_BUSQUEDA))
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for tabla in ('reservacion', 'historial_reservacion'):
+        for sufijo in ('ai', 'ad', 'au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {tabla}_busqueda_{sufijo}')
+    eliminar_indice_busqueda(op.get_bind())
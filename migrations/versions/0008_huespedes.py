@@ -0,0 +1,53 @@
+"""Perfiles de huéspedes y huesped_id en reservaciones e historial (antes add_huesped_table.py)
+
+Los perfiles se llenan con construir_huespedes.py.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-15 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from busqueda import crear_indice_busqueda
+from migraciones import crear_tabla, agregar_columna, quitar_columna, crear_indice, quitar_indice, tabla_existe
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    crear_tabla(
+        'huesped',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('telefono', sa.String(length=20), nullable=False),
+        sa.Column('nombre', sa.String(length=100), nullable=False),
+        sa.Column('reservaciones', sa.Integer(), nullable=False),
+        sa.Column('visitas', sa.Integer(), nullable=False),
+        sa.Column('no_presentados', sa.Integer(), nullable=False),
+        sa.Column('total_personas', sa.Integer(), nullable=False),
+        sa.Column('minutos_estancia', sa.Integer(), nullable=False),
+        sa.Column('estancias_medidas', sa.Integer(), nullable=False),
+        sa.Column('ultima_visita', sa.Date(), nullable=True),
+        sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('telefono')
+    )
+    for tabla in ('reservacion', 'historial_reservacion'):
+        agregar_columna(tabla, sa.Column('huesped_id', sa.Integer(), sa.ForeignKey('huesped.id'), nullable=True))
+        crear_indice(f'ix_{tabla}_huesped_id', tabla, ['huesped_id'])
+
+
+def downgrade():
+    for tabla in ('reservacion', 'historial_reservacion'):
+        quitar_indice(f'ix_{tabla}_huesped_id', tabla)
+        quitar_columna(tabla, 'huesped_id')
+    op.drop_table('huesped')
+    # En SQLite quitar la columna recrea la tabla y con ella se pierden los triggers de búsqueda
+    if op.get_bind().dialect.name == 'sqlite' and tabla_existe('busqueda_reservaciones'):
+        crear_indice_busqueda(op.get_bind())
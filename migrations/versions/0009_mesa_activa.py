@@ -0,0 +1,39 @@
+"""Mesas desactivadas en lugar de borradas e índice único por número
+
+Las mesas que ya no están en mesas_config quedan con activa = False (conservan su
+id, reservaciones e historial). Si un número tenía varias filas se conserva activa
+la de menor id; reconciliar_mesas.py completa el resto de la sincronización.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migraciones import agregar_columna, quitar_columna, crear_indice, quitar_indice, actualizar_en_lotes
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    agregar_columna('mesa', sa.Column('activa', sa.Boolean(), nullable=False, server_default=sa.text('1')))
+
+    mesa = sa.table('mesa', sa.column('id', sa.Integer()), sa.column('numero', sa.Integer()),
+                    sa.column('activa', sa.Boolean()))
+    otra = mesa.alias()
+    primeras = sa.select(sa.func.min(otra.c.id)).where(otra.c.activa).group_by(otra.c.numero)
+    actualizar_en_lotes(mesa, {'activa': False}, sa.and_(mesa.c.activa, mesa.c.id.not_in(primeras)))
+
+    crear_indice('ux_mesa_numero_activa', 'mesa', ['numero'], unique=True, sqlite_where=sa.text('activa'))
+
+
+def downgrade():
+    quitar_indice('ux_mesa_numero_activa', 'mesa')
+    quitar_columna('mesa', 'activa')
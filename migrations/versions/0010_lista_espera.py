@@ -0,0 +1,77 @@
+"""Lista de espera, histograma de estancias y hora de ocupación de las mesas
+
+El histograma (estancia_cubeta) se llena una sola vez a partir del historial activo en
+una sentencia; después lo actualiza la aplicación con cada liberación.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migraciones import crear_tabla, agregar_columna, quitar_columna, crear_indice
+from estimador_espera import CUBETAS, MINUTOS_CUBETA
+from huespedes import MOTIVO_NO_PRESENTADO
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    agregar_columna('mesa', sa.Column('ocupada_desde', sa.DateTime(), nullable=True))
+
+    crear_tabla(
+        'lista_espera',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('nombre', sa.String(length=100), nullable=False),
+        sa.Column('telefono', sa.String(length=20), nullable=True),
+        sa.Column('cantidad_personas', sa.Integer(), nullable=False),
+        sa.Column('area', sa.String(length=50), nullable=True),
+        sa.Column('prioridad', sa.Integer(), nullable=False),
+        sa.Column('nota', sa.Text(), nullable=True),
+        sa.Column('estado', sa.String(length=20), nullable=False),
+        sa.Column('hora_llegada', sa.DateTime(), nullable=False),
+        sa.Column('hora_asignacion', sa.DateTime(), nullable=True),
+        sa.Column('hora_salida', sa.DateTime(), nullable=True),
+        sa.Column('mesa_id', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    crear_indice('ix_lista_espera_estado', 'lista_espera', ['estado'])
+
+    creada = crear_tabla(
+        'estancia_cubeta',
+        sa.Column('area', sa.String(length=50), nullable=False),
+        sa.Column('grupo', sa.Integer(), nullable=False),
+        sa.Column('cubeta', sa.Integer(), nullable=False),
+        sa.Column('cantidad', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('area', 'grupo', 'cubeta')
+    )
+    if creada:
+        # Misma cuenta que huespedes.minutos_estancia y estimador_espera (grupo y cubeta)
+        op.get_bind().execute(sa.text(f"""
+            INSERT INTO estancia_cubeta (area, grupo, cubeta, cantidad)
+            SELECT area, grupo, MIN({CUBETAS - 1}, minutos / {MINUTOS_CUBETA}) AS cubeta, COUNT(*)
+            FROM (
+                SELECT area,
+                       MIN(8, MAX(2, cantidad_personas + cantidad_personas % 2)) AS grupo,
+                       ((strftime('%s', '2000-01-01 ' || substr(hora_liberacion, 1, 5))
+                         - strftime('%s', '2000-01-01 ' || substr(hora_reservacion, 1, 5))) / 60 + 1440) % 1440 AS minutos
+                FROM historial_reservacion
+                WHERE hora_liberacion IS NOT NULL
+                  AND (motivo_liberacion IS NULL OR motivo_liberacion != :no_presentado)
+            )
+            WHERE minutos > 0
+            GROUP BY area, grupo, cubeta
+        """), {'no_presentado': MOTIVO_NO_PRESENTADO})
+
+
+def downgrade():
+    op.drop_table('estancia_cubeta')
+    op.drop_table('lista_espera')
+    quitar_columna('mesa', 'ocupada_desde')
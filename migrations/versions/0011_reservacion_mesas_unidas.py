@@ -0,0 +1,26 @@
+"""Mesas unidas en reservaciones (asignación automática de grupos de mesas vecinas)
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migraciones import agregar_columna, quitar_columna
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    agregar_columna('reservacion', sa.Column('mesas_unidas', sa.String(length=200), nullable=False, server_default=''))
+
+
+def downgrade():
+    quitar_columna('reservacion', 'mesas_unidas')
@@ -0,0 +1,62 @@
+"""Franjas de ocupación por mesa y fecha (bitmap de 96 franjas de 15 minutos)
+
+La tabla se llena una sola vez con las reservaciones existentes; después la mantiene la
+aplicación (actualizar_ocupacion) con cada alta, baja o movimiento de reservaciones.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migraciones import crear_tabla
+from franjas_ocupacion import DURACION_RESERVACION, a_bytes, ocupacion_por_mesa
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+reservacion = sa.table(
+    'reservacion',
+    sa.column('fecha_reservacion', sa.Date()),
+    sa.column('mesa_id', sa.Integer()),
+    sa.column('mesas_unidas', sa.String()),
+    sa.column('hora_reservacion', sa.Time())
+)
+
+
+def upgrade():
+    creada = crear_tabla(
+        'ocupacion_mesa',
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('mesa_id', sa.Integer(), nullable=False),
+        sa.Column('franjas', sa.LargeBinary(length=12), nullable=False),
+        sa.ForeignKeyConstraint(['mesa_id'], ['mesa.id']),
+        sa.PrimaryKeyConstraint('fecha', 'mesa_id')
+    )
+    if creada:
+        filas = op.get_bind().execute(sa.select(
+            reservacion.c.fecha_reservacion, reservacion.c.mesa_id, reservacion.c.mesas_unidas,
+            reservacion.c.hora_reservacion
+        ))
+        ocupacion = ocupacion_por_mesa(
+            ((fecha, mesa_id, mesas_unidas, hora.hour * 60 + hora.minute) for fecha, mesa_id, mesas_unidas, hora in filas),
+            DURACION_RESERVACION
+        )
+        if ocupacion:
+            op.bulk_insert(sa.table(
+                'ocupacion_mesa', sa.column('fecha', sa.Date()), sa.column('mesa_id', sa.Integer()),
+                sa.column('franjas', sa.LargeBinary())
+            ), [
+                {'fecha': fecha, 'mesa_id': mesa_id, 'franjas': a_bytes(bits)}
+                for (fecha, mesa_id), bits in ocupacion.items()
+            ])
+
+
+def downgrade():
+    op.drop_table('ocupacion_mesa')
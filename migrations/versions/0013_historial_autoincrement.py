@@ -0,0 +1,75 @@
+"""AUTOINCREMENT en historial_reservacion para no reutilizar ids archivados
+
+SQLite asigna max(id) + 1 a las filas nuevas, así que al archivar los registros con los ids
+más altos esos ids volvían a salir: chocaban con el índice de búsqueda (que conserva los
+archivados) y con las particiones. La tabla se reconstruye con AUTOINCREMENT y la secuencia
+empieza después del mayor id conocido (tabla, índice de búsqueda y particiones).
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+from flask import current_app
+
+from busqueda import TABLA_BUSQUEDA, crear_indice_busqueda
+from migraciones import tabla_existe
+
+
+# revision identifiers, used by Alembic.
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+historial = sa.table('historial_reservacion', sa.column('id', sa.Integer()))
+
+
+def _con_autoincrement():
+    sql = op.get_bind().exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'historial_reservacion'"
+    ).scalar()
+    return 'AUTOINCREMENT' in (sql or '').upper()
+
+
+def _reconstruir(autoincrement):
+    # El modo batch copia la tabla y elimina sus triggers: se vuelven a crear los del índice
+    with op.batch_alter_table('historial_reservacion', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': autoincrement}):
+        pass
+    crear_indice_busqueda(op.get_bind())
+
+
+def _mayor_id_archivado():
+    """Mayor id de las particiones de la base que se migra (archivo_historial.py)"""
+    archivo = current_app.extensions.get('archivo_historial')
+    if archivo is None:
+        return 0
+    clave = context.get_x_argument(as_dictionary=True).get('sucursal')
+    if clave:
+        current_app.extensions['sucursales'].activar(clave)
+    return archivo.mayor_id(historial)
+
+
+def upgrade():
+    conexion = op.get_bind()
+    if conexion.dialect.name != 'sqlite' or _con_autoincrement():
+        return
+    _reconstruir(True)
+
+    mayor = conexion.execute(sa.select(sa.func.max(historial.c.id))).scalar() or 0
+    if tabla_existe(TABLA_BUSQUEDA):
+        # rowid impar = id * 2 + 1 de historial_reservacion (ver busqueda.py)
+        rowid = conexion.exec_driver_sql(f'SELECT max(rowid) FROM {TABLA_BUSQUEDA} WHERE rowid % 2 = 1').scalar()
+        mayor = max(mayor, (rowid or 1) // 2)
+    mayor = max(mayor, _mayor_id_archivado())
+    conexion.exec_driver_sql("DELETE FROM sqlite_sequence WHERE name = 'historial_reservacion'")
+    conexion.exec_driver_sql(f"INSERT INTO sqlite_sequence (name, seq) VALUES ('historial_reservacion', {int(mayor)})")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite' or not _con_autoincrement():
+        return
+    _reconstruir(False)
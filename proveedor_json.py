@@ -0,0 +1,69 @@
+# Proveedor JSON de Flask basado en orjson (si está instalado, si no usa json de la
+# biblioteca estándar). Serializa date, time y datetime directamente con los mismos
+# formatos que usaba to_dict(): '2025-07-14', '20:30' y '2025-07-14 20:30:00'.
+
+import decimal
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional
+    orjson = None
+
+
+def serializar_valor(valor):
+    """Convierte los tipos que el codificador no maneja por sí mismo"""
+    # datetime es subclase de date, así que se revisa primero
+    if isinstance(valor, datetime):
+        return valor.replace(tzinfo=None).isoformat(' ', 'seconds')
+    if isinstance(valor, date):
+        return valor.isoformat()
+    if isinstance(valor, time):
+        return valor.isoformat('minutes')
+    if isinstance(valor, decimal.Decimal):
+        return str(valor)
+    if hasattr(valor, '__html__'):
+        return str(valor.__html__())
+    raise TypeError(f'Object of type {type(valor).__name__} is not JSON serializable')
+
+
+class ProveedorOrjson(JSONProvider):
+    """Serializa con orjson; las fechas pasan por serializar_valor para conservar el formato"""
+
+    compact = None  # None: con sangría solo en modo debug, igual que el proveedor de Flask
+    mimetype = 'application/json'
+
+    def _opciones(self):
+        opciones = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            opciones |= orjson.OPT_INDENT_2
+        return opciones
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=serializar_valor, option=self._opciones()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # orjson produce bytes, así que se evita pasar por str
+        datos = orjson.dumps(obj, default=serializar_valor, option=self._opciones())
+        return self._app.response_class(datos, mimetype=self.mimetype)
+
+
+class ProveedorEstandar(DefaultJSONProvider):
+    """Respaldo sin orjson: el proveedor de Flask con los mismos formatos de fecha"""
+
+    default = staticmethod(serializar_valor)
+    sort_keys = False
+
+
+def instalar_proveedor_json(app):
+    """Reemplaza el proveedor JSON de la aplicación; retorna la clase usada"""
+    proveedor = ProveedorOrjson if orjson is not None else ProveedorEstandar
+    app.json_provider_class = proveedor
+    app.json = proveedor(app)
+    return proveedor
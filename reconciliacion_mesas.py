@@ -0,0 +1,78 @@
+# Reconciliación de MESAS_CONFIG (fuente de verdad del layout) con la tabla Mesa.
+# Compara por número de mesa y aplica el mínimo de cambios en una sola transacción:
+# inserta las mesas nuevas, actualiza capacidad/área/posición de las que cambiaron,
+# reactiva las que regresaron a la configuración y desactiva (activa = False) las que
+# ya no están. Las mesas desactivadas conservan su id y sus reservaciones e historial.
+# Si un número aparece en varias filas activas se conserva la de menor id.
+
+from sqlalchemy import select, update, insert
+from sqlalchemy.exc import IntegrityError
+
+CAMPOS_CONFIG = ('capacidad', 'ubicacion', 'posicion_x', 'posicion_y')
+
+
+def calcular_cambios(config, filas):
+    """Diferencias entre la configuración ({area: [mesa]}) y las filas de Mesa
+    (id, numero, activa y CAMPOS_CONFIG). Retorna {'insertar', 'actualizar', 'desactivar'}"""
+    esperadas = {}
+    for area, mesas_area in config.items():
+        for mesa_config in mesas_area:
+            esperadas[mesa_config['numero']] = {
+                'capacidad': mesa_config['capacidad'],
+                'ubicacion': area,
+                'posicion_x': mesa_config['posicion_x'],
+                'posicion_y': mesa_config['posicion_y']
+            }
+
+    # Por número: la fila activa de menor id o, si no hay activas, la inactiva de menor id
+    elegidas = {}
+    for fila in sorted(filas, key=lambda fila: (not fila.activa, fila.id)):
+        elegidas.setdefault(fila.numero, fila)
+
+    cambios = {'insertar': [], 'actualizar': [], 'desactivar': []}
+    for fila in filas:
+        if fila.activa and (fila.numero not in esperadas or elegidas[fila.numero] is not fila):
+            cambios['desactivar'].append(fila.id)
+
+    for numero, valores in esperadas.items():
+        fila = elegidas.get(numero)
+        if fila is None:
+            cambios['insertar'].append({'numero': numero, **valores, 'estado': 'disponible', 'activa': True})
+            continue
+        diferentes = {campo: valor for campo, valor in valores.items() if getattr(fila, campo) != valor}
+        if not fila.activa:
+            diferentes['activa'] = True
+        if diferentes:
+            cambios['actualizar'].append({'id': fila.id, **diferentes})
+    return cambios
+
+
+def reconciliar_mesas(sesion, Mesa, config, simular=False):
+    """Aplica calcular_cambios() sobre la tabla Mesa y confirma (o revierte si `simular`).
+    Retorna los cambios calculados"""
+    columnas = [Mesa.id, Mesa.numero, Mesa.activa] + [getattr(Mesa, campo) for campo in CAMPOS_CONFIG]
+    # Un segundo intento por si otro proceso insertó las mismas mesas al mismo tiempo
+    # (el índice único parcial sobre las mesas activas rechaza el duplicado)
+    for intento in range(2):
+        cambios = calcular_cambios(config, sesion.execute(select(*columnas)).all())
+        if simular:
+            sesion.rollback()
+            return cambios
+        try:
+            # Primero desactivar, para que el índice único no choque con las mesas que se reactivan
+            if cambios['desactivar']:
+                sesion.execute(update(Mesa), [{'id': mesa_id, 'activa': False} for mesa_id in cambios['desactivar']])
+            if cambios['actualizar']:
+                sesion.execute(update(Mesa), cambios['actualizar'])
+            if cambios['insertar']:
+                sesion.execute(insert(Mesa), cambios['insertar'])
+            sesion.commit()
+            return cambios
+        except IntegrityError:
+            sesion.rollback()
+            if intento:
+                raise
+
+
+def total_cambios(cambios):
+    return sum(len(filas) for filas in cambios.values())
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Sincroniza la tabla Mesa con mesas_config.py: crea las mesas nuevas, actualiza
+capacidad, área y posición de las que cambiaron y desactiva las que ya no están
+(sin borrarlas, para conservar sus reservaciones e historial). La aplicación lo
+hace también con la primera petición de cada proceso. Ejecutar después de cada
+cambio en mesas_config.py:
+    python reconciliar_mesas.py
+    python reconciliar_mesas.py --simular   # solo muestra los cambios
+    python reconciliar_mesas.py --sucursal centro   # otra sucursal (sucursales.py)
+"""
+
+import argparse
+
+from app import app, sucursales, reconciliar_mesas_config
+from reconciliacion_mesas import total_cambios
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sincroniza la tabla Mesa con mesas_config.py')
+    parser.add_argument('--simular', action='store_true', help='Muestra los cambios sin aplicarlos')
+    parser.add_argument('--sucursal', default=None, help='Clave de la sucursal (por defecto la principal)')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.sucursal:
+            sucursales.activar(args.sucursal)
+        print("🔄 Comparando mesas_config.py con la base de datos...")
+        cambios = reconciliar_mesas_config(simular=args.simular)
+        for fila in cambios['insertar']:
+            print(f"   + Mesa {fila['numero']} ({fila['ubicacion']}, {fila['capacidad']} personas)")
+        for fila in cambios['actualizar']:
+            detalle = ', '.join(f'{campo}={valor}' for campo, valor in fila.items() if campo != 'id')
+            print(f"   ~ Mesa id {fila['id']}: {detalle}")
+        for mesa_id in cambios['desactivar']:
+            print(f"   - Mesa id {mesa_id}: desactivada")
+
+        if not total_cambios(cambios):
+            print("✅ La base de datos ya coincide con mesas_config.py")
+        elif args.simular:
+            print(f"ℹ️ {total_cambios(cambios)} cambios pendientes (no se aplicaron)")
+        else:
+            print("✅ Mesas sincronizadas exitosamente!")
+            print(f"   - Creadas: {len(cambios['insertar'])}")
+            print(f"   - Actualizadas: {len(cambios['actualizar'])}")
+            print(f"   - Desactivadas: {len(cambios['desactivar'])}")
+
+
+if __name__ == '__main__':
+    main()
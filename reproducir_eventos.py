@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Reconstruye el pasado a partir del registro de eventos (instance/eventos.db).
+
+Estado de todas las mesas en un momento dado (hora del restaurante):
+    python reproducir_eventos.py --momento "2026-10-18 20:30"
+Ocupación por hora de un día:
+    python reproducir_eventos.py --ocupacion 2026-10-18
+    python reproducir_eventos.py --ocupacion 2026-10-18 --estado reservada
+Con varias sucursales, --sucursal <clave> elige el registro y la zona horaria.
+"""
+
+import argparse
+from datetime import datetime
+
+from app import app, registro_eventos, sucursales
+from eventos import reproducir_estado, ocupacion_por_hora
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reproduce el registro de eventos de mesas')
+    grupo = parser.add_mutually_exclusive_group(required=True)
+    grupo.add_argument('--momento', help='Fecha y hora "AAAA-MM-DD HH:MM" en la zona del restaurante')
+    grupo.add_argument('--ocupacion', help='Fecha "AAAA-MM-DD" para el resumen por hora')
+    parser.add_argument('--estado', default='ocupada', help='Estado a contar en --ocupacion (por defecto ocupada)')
+    parser.add_argument('--sucursal', default=None, help='Clave de la sucursal (por defecto la principal)')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.sucursal:
+            sucursales.activar(args.sucursal)
+        zona_horaria = sucursales.actual.zona_horaria
+        motor = registro_eventos.motor
+        if args.momento:
+            momento = zona_horaria.localize(datetime.strptime(args.momento, '%Y-%m-%d %H:%M'))
+            estados = reproducir_estado(motor, momento)
+            print(f"🕐 Estado de las mesas al {momento.strftime('%d/%m/%Y %H:%M')}:")
+            if not estados:
+                print("   Sin eventos registrados hasta ese momento")
+            for mesa_id, estado in sorted(estados.items()):
+                grupo_texto = f" (grupo {estado['grupo_id']})" if estado['grupo_id'] else ''
+                print(f"   - Mesa {mesa_id}: {estado['estado']}{grupo_texto}")
+        else:
+            inicio_dia = zona_horaria.localize(datetime.strptime(args.ocupacion, '%Y-%m-%d'))
+            print(f"📊 Mesas en estado '{args.estado}' por hora, {args.ocupacion}:")
+            for hora in ocupacion_por_hora(motor, inicio_dia, args.estado):
+                print(f"   {hora['hora']}  al inicio: {hora['al_inicio']:3d}  durante la hora: {hora['durante']:3d}")
+
+
+if __name__ == '__main__':
+    main()
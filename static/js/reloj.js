@@ -0,0 +1,86 @@
+// Reloj sincronizado con el servidor.
+// Un solo intercambio con /api/reloj obtiene la hora del restaurante y su zona
+// horaria; después la fecha se calcula localmente. El encabezado Server-Time de
+// cada respuesta corrige la deriva del reloj del dispositivo.
+
+const relojServidor = {
+    desfase: 0,              // ms que hay que sumar a Date.now() para obtener la hora del servidor
+    offsetMinutos: null,     // desfase UTC del restaurante (p. ej. -420 para GMT-7)
+    zonaHoraria: undefined,  // zona IANA para toLocaleString
+    mejorLatencia: Infinity
+};
+
+function registrarMuestraReloj(horaServidor, inicio, fin) {
+    // La hora del servidor corresponde aproximadamente al punto medio de la petición;
+    // las muestras con menor latencia son más confiables
+    const latencia = fin - inicio;
+    const desfase = horaServidor - (inicio + fin) / 2;
+    if (latencia <= relojServidor.mejorLatencia) {
+        relojServidor.mejorLatencia = latencia;
+        relojServidor.desfase = desfase;
+    } else if (latencia < 2000) {
+        relojServidor.desfase = relojServidor.desfase * 0.8 + desfase * 0.2;
+    }
+}
+
+async function sincronizarReloj() {
+    try {
+        const inicio = Date.now();
+        const response = await fetchSinReloj('/api/reloj');
+        const fin = Date.now();
+        const data = await response.json();
+        relojServidor.offsetMinutos = data.offset_minutos;
+        relojServidor.zonaHoraria = data.zona_horaria;
+        registrarMuestraReloj(data.epoch_ms, inicio, fin);
+    } catch (error) {
+        console.error('Error al sincronizar el reloj con el servidor:', error);
+    }
+}
+
+// Corregir la deriva con el encabezado Server-Time de todas las respuestas
+const fetchSinReloj = window.fetch.bind(window);
+window.fetch = async function(...args) {
+    const inicio = Date.now();
+    const response = await fetchSinReloj(...args);
+    const horaServidor = Number(response.headers.get('Server-Time'));
+    if (horaServidor) {
+        registrarMuestraReloj(horaServidor, inicio, Date.now());
+    }
+    return response;
+};
+
+const relojListo = sincronizarReloj();
+
+function ahoraServidor() {
+    return new Date(Date.now() + relojServidor.desfase);
+}
+
+// Fecha actual (YYYY-MM-DD) en la zona horaria del restaurante, sin llamar al servidor
+function fechaRestaurante() {
+    const ahora = ahoraServidor();
+    if (relojServidor.offsetMinutos === null) {
+        // Aún sin sincronizar: usar la fecha local del dispositivo
+        const year = ahora.getFullYear();
+        const month = String(ahora.getMonth() + 1).padStart(2, '0');
+        const day = String(ahora.getDate()).padStart(2, '0');
+        return `${year}-${month}-${day}`;
+    }
+    const local = new Date(ahora.getTime() + relojServidor.offsetMinutos * 60000);
+    return local.toISOString().split('T')[0];
+}
+
+async function getCurrentDate() {
+    await relojListo;
+    return fechaRestaurante();
+}
+
+function actualizarFechaHora() {
+    const fechaHoraActual = document.getElementById('fechaHoraActual');
+    if (fechaHoraActual) {
+        fechaHoraActual.textContent = ahoraServidor().toLocaleString('es-ES', {
+            dateStyle: 'full',
+            timeStyle: 'short',
+            timeZone: relojServidor.zonaHoraria
+        });
+    }
+}
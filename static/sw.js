@@ -0,0 +1,289 @@
+// Service worker de las tabletas de hostess.
+// - Archivos estáticos, páginas y lecturas de la API (/api/mesas..., /api/dia/, /api/reservaciones?fecha=)
+//   se sirven con stale-while-revalidate: respuesta inmediata desde el cache y
+//   actualización en segundo plano; si cambió, se avisa a la página.
+// - Los PUT de estado de mesa que fallan por falta de red se guardan en una cola de
+//   IndexedDB y se reenvían en orden al recuperar la conexión. Si el servidor responde
+//   409 (la mesa cambió en otro dispositivo) el cambio se descarta y se avisa a la página.
+// Se sirve desde /sw.js para que su alcance cubra toda la aplicación.
+
+const VERSION = 'v1';
+const CACHE_ESTATICO = `monaco-estatico-${VERSION}`;
+const CACHE_API = `monaco-api-${VERSION}`;
+
+const PRECACHE = [
+    '/',
+    '/reservaciones-futuras',
+    '/static/js/reloj.js',
+    '/static/images/logo.svg',
+    '/static/images/table.svg'
+];
+
+const HOSTS_EXTERNOS = ['cdn.jsdelivr.net', 'cdnjs.cloudflare.com', 'fonts.googleapis.com', 'fonts.gstatic.com'];
+
+// ----- IndexedDB: cola de escrituras pendientes -----
+
+const BD_NOMBRE = 'monaco-offline';
+const BD_ALMACEN = 'escrituras';
+
+function abrirBD() {
+    return new Promise((resolve, reject) => {
+        const peticion = indexedDB.open(BD_NOMBRE, 1);
+        peticion.onupgradeneeded = () => {
+            peticion.result.createObjectStore(BD_ALMACEN, { keyPath: 'id', autoIncrement: true });
+        };
+        peticion.onsuccess = () => resolve(peticion.result);
+        peticion.onerror = () => reject(peticion.error);
+    });
+}
+
+async function operacionCola(modo, operacion) {
+    const bd = await abrirBD();
+    return new Promise((resolve, reject) => {
+        const transaccion = bd.transaction(BD_ALMACEN, modo);
+        const peticion = operacion(transaccion.objectStore(BD_ALMACEN));
+        transaccion.oncomplete = () => resolve(peticion.result);
+        transaccion.onerror = () => reject(transaccion.error);
+    });
+}
+
+const encolar = (escritura) => operacionCola('readwrite', almacen => almacen.add(escritura));
+const pendientes = () => operacionCola('readonly', almacen => almacen.getAll());
+const desencolar = (id) => operacionCola('readwrite', almacen => almacen.delete(id));
+
+// ----- Utilidades -----
+
+async function avisarClientes(mensaje) {
+    const clientes = await self.clients.matchAll({ includeUncontrolled: true });
+    clientes.forEach(cliente => cliente.postMessage(mensaje));
+}
+
+function respuestaJSON(datos, status) {
+    return new Response(JSON.stringify(datos), {
+        status: status,
+        headers: { 'Content-Type': 'application/json' }
+    });
+}
+
+function esLecturaApi(url) {
+    return url.pathname.startsWith('/api/mesas')
+        || url.pathname.startsWith('/api/dia/')
+        || (url.pathname === '/api/reservaciones' && url.searchParams.has('fecha'));
+}
+
+async function guardarEnCache(nombreCache, request, response) {
+    // Sin Server-Time: una respuesta vieja no debe usarse para sincronizar el reloj
+    const headers = new Headers(response.headers);
+    headers.delete('Server-Time');
+    const copia = new Response(await response.clone().blob(), {
+        status: response.status,
+        statusText: response.statusText,
+        headers: headers
+    });
+    const cache = await caches.open(nombreCache);
+    await cache.put(request, copia);
+}
+
+// ----- Stale-while-revalidate -----
+
+async function staleWhileRevalidate(event, nombreCache, avisarCambios) {
+    const cache = await caches.open(nombreCache);
+    const enCache = await cache.match(event.request);
+
+    const actualizacion = fetch(event.request).then(async response => {
+        if (response.ok || response.type === 'opaque') {
+            const anterior = avisarCambios && enCache ? await enCache.clone().text() : null;
+            await guardarEnCache(nombreCache, event.request, response);
+            if (anterior !== null && anterior !== await response.clone().text()) {
+                avisarClientes({ tipo: 'actualizado', url: event.request.url });
+            }
+        }
+        reenviarPendientes().catch(() => null);
+        return response;
+    });
+
+    if (enCache) {
+        event.waitUntil(actualizacion.catch(() => null));
+        return enCache;
+    }
+    return actualizacion;
+}
+
+// ----- Escrituras -----
+
+function aplicarCambio(datos, mesaId, cambios) {
+    if (Array.isArray(datos)) {
+        datos.forEach(mesa => {
+            if (mesa && mesa.id === mesaId) {
+                Object.assign(mesa, cambios);
+            }
+        });
+    } else if (datos && Array.isArray(datos.ids)) {
+        // Formato compacto de /api/mesas
+        const indice = datos.ids.indexOf(mesaId);
+        if (indice !== -1) {
+            if ('estado' in cambios) datos.estados[indice] = cambios.estado;
+            if ('fecha' in cambios) datos.fechas[indice] = cambios.fecha;
+        }
+    } else if (datos && datos.id === mesaId) {
+        Object.assign(datos, cambios);
+    }
+    return datos;
+}
+
+async function aplicarCambioEnSnapshots(mesaId, cuerpo) {
+    // Reflejar el cambio encolado en las lecturas guardadas para que la página lo vea sin conexión
+    const cambios = {};
+    if ('estado' in cuerpo) {
+        cambios.estado = cuerpo.estado;
+        cambios.fecha = cuerpo.estado === 'disponible' ? null : (cuerpo.fecha || null);
+    }
+    const cache = await caches.open(CACHE_API);
+    for (const request of await cache.keys()) {
+        if (!new URL(request.url).pathname.startsWith('/api/mesas')) {
+            continue;
+        }
+        const response = await cache.match(request);
+        try {
+            const datos = aplicarCambio(await response.json(), mesaId, cambios);
+            await cache.put(request, new Response(JSON.stringify(datos), { headers: response.headers }));
+        } catch (error) {
+            // No es JSON (p. ej. un error guardado); se deja como está
+        }
+    }
+}
+
+async function escrituraMesa(event, mesaId) {
+    const cuerpo = await event.request.clone().text();
+    try {
+        const response = await fetch(event.request);
+        // Cualquier escritura exitosa deja obsoletas las lecturas guardadas
+        await caches.delete(CACHE_API);
+        return response;
+    } catch (error) {
+        await encolar({ url: event.request.url, cuerpo: cuerpo, mesaId: mesaId, fecha: Date.now() });
+        await aplicarCambioEnSnapshots(mesaId, JSON.parse(cuerpo || '{}'));
+        if (self.registration.sync) {
+            self.registration.sync.register('reenviar-escrituras').catch(() => null);
+        }
+        return respuestaJSON({
+            mensaje: 'Sin conexión: el cambio se enviará al reconectar',
+            encolado: true
+        }, 202);
+    }
+}
+
+let reenvioEnCurso = null;
+
+function reenviarPendientes() {
+    if (!reenvioEnCurso) {
+        reenvioEnCurso = reenviar().finally(() => {
+            reenvioEnCurso = null;
+        });
+    }
+    return reenvioEnCurso;
+}
+
+async function reenviar() {
+    const escrituras = await pendientes();
+    if (escrituras.length === 0) {
+        return;
+    }
+
+    let enviadas = 0;
+    for (const escritura of escrituras) {
+        let response;
+        try {
+            response = await fetch(escritura.url, {
+                method: 'PUT',
+                headers: { 'Content-Type': 'application/json' },
+                body: escritura.cuerpo
+            });
+        } catch (error) {
+            break;  // Sigue sin conexión; se reintenta más tarde en el mismo orden
+        }
+        if (response.status >= 500) {
+            break;
+        }
+
+        await desencolar(escritura.id);
+        enviadas++;
+        if (response.status === 409) {
+            const datos = await response.json().catch(() => ({}));
+            avisarClientes({ tipo: 'conflicto', mesa_id: escritura.mesaId, estado_actual: datos.estado_actual });
+        } else if (!response.ok) {
+            avisarClientes({ tipo: 'rechazado', mesa_id: escritura.mesaId, status: response.status });
+        }
+    }
+
+    if (enviadas > 0) {
+        await caches.delete(CACHE_API);
+        avisarClientes({ tipo: 'sincronizado', enviadas: enviadas });
+    }
+}
+
+// ----- Eventos -----
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(CACHE_ESTATICO)
+            .then(cache => Promise.all(PRECACHE.map(url => cache.add(url).catch(() => null))))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(nombres => Promise.all(
+                nombres
+                    .filter(nombre => nombre.startsWith('monaco-') && ![CACHE_ESTATICO, CACHE_API].includes(nombre))
+                    .map(nombre => caches.delete(nombre))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const url = new URL(event.request.url);
+
+    if (url.origin !== self.location.origin) {
+        if (event.request.method === 'GET' && HOSTS_EXTERNOS.includes(url.hostname)) {
+            event.respondWith(staleWhileRevalidate(event, CACHE_ESTATICO, false));
+        }
+        return;
+    }
+
+    const escritura = url.pathname.match(/^\/api\/mesas\/(\d+)$/);
+    if (event.request.method === 'PUT' && escritura) {
+        event.respondWith(escrituraMesa(event, parseInt(escritura[1])));
+        return;
+    }
+
+    if (event.request.method !== 'GET') {
+        // Otras escrituras van directo a la red y dejan obsoletas las lecturas guardadas
+        event.respondWith(fetch(event.request).then(async response => {
+            await caches.delete(CACHE_API);
+            return response;
+        }));
+        return;
+    }
+
+    if (esLecturaApi(url)) {
+        event.respondWith(staleWhileRevalidate(event, CACHE_API, true));
+    } else if (event.request.mode === 'navigate' || url.pathname.startsWith('/static/') || url.pathname.startsWith('/build/')) {
+        event.respondWith(staleWhileRevalidate(event, CACHE_ESTATICO, false));
+    }
+});
+
+self.addEventListener('sync', event => {
+    if (event.tag === 'reenviar-escrituras') {
+        event.waitUntil(reenviarPendientes());
+    }
+});
+
+self.addEventListener('message', event => {
+    if (event.data && event.data.tipo === 'reenviar') {
+        event.waitUntil(reenviarPendientes());
+    }
+});
@@ -0,0 +1,117 @@
+# Sucursales (restaurantes) atendidas por el mismo despliegue.
+# Cada sucursal tiene su layout (un módulo como mesas_config.py), su zona horaria y su
+# base de datos. Las bases de las sucursales adicionales se registran como binds de
+# Flask-SQLAlchemy, así que sus motores y pools de conexiones se crean una vez al iniciar
+# y cada sucursal conserva el suyo. SesionSucursal envía cada consulta al motor de la
+# sucursal de la petición; la principal sigue usando SQLALCHEMY_DATABASE_URI.
+#
+# SUCURSALES_ARCHIVO apunta a un JSON {clave: {nombre, zona_horaria, mesas_config, base_datos}}
+# con las sucursales adicionales (o datos de la principal, salvo su base de datos).
+# La sucursal de cada petición sale de ?sucursal=, del encabezado X-Sucursal o de la
+# cookie 'sucursal' (que se guarda al abrir /?sucursal=<clave>).
+
+import importlib
+import json
+
+import pytz
+from flask import g, has_app_context, jsonify, request
+from flask_sqlalchemy.session import Session
+
+from mesas_config import ConfiguracionMesas
+
+CLAVE_PRINCIPAL = 'monaco'
+
+
+class Sucursal:
+    def __init__(self, clave, nombre, zona_horaria, mesas_config, base_datos=None, principal=False):
+        self.clave = clave
+        self.nombre = nombre
+        self.zona_horaria = pytz.timezone(zona_horaria)
+        self.config = ConfiguracionMesas.desde_modulo(importlib.import_module(mesas_config))
+        self.base_datos = base_datos
+        self.principal = principal
+        # Bind de Flask-SQLAlchemy (None = SQLALCHEMY_DATABASE_URI)
+        self.bind_key = None if principal else f'sucursal_{clave}'
+        # Los archivos propios (historial archivado, eventos) de la principal quedan donde estaban
+        self.subdirectorio = None if principal else clave
+
+    def to_dict(self):
+        return {'clave': self.clave, 'nombre': self.nombre, 'zona_horaria': self.zona_horaria.zone}
+
+
+class SesionSucursal(Session):
+    """Sesión de Flask-SQLAlchemy que elige el motor según la sucursal activa"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            sucursal = g.get('sucursal')
+            if sucursal is not None and sucursal.bind_key is not None:
+                return self._db.engines[sucursal.bind_key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class Sucursales:
+    """Registro de sucursales y selección de la sucursal de cada petición.
+    Debe inicializarse antes que SQLAlchemy para registrar los binds"""
+
+    def __init__(self, app=None):
+        self.por_clave = {}
+        self.principal = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SUCURSALES_ARCHIVO', None)
+        app.config.setdefault('SUCURSAL_PRINCIPAL', {
+            'nombre': 'Monaco',
+            'zona_horaria': 'America/Phoenix',  # GMT-7 (sin horario de verano)
+            'mesas_config': 'mesas_config'
+        })
+        definiciones = {CLAVE_PRINCIPAL: dict(app.config['SUCURSAL_PRINCIPAL'])}
+        if app.config['SUCURSALES_ARCHIVO']:
+            with open(app.config['SUCURSALES_ARCHIVO'], encoding='utf-8') as archivo:
+                for clave, datos in json.load(archivo).items():
+                    definiciones.setdefault(clave, {}).update(datos)
+
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        for clave, datos in definiciones.items():
+            principal = clave == CLAVE_PRINCIPAL
+            sucursal = Sucursal(
+                clave, datos.get('nombre', clave), datos['zona_horaria'], datos['mesas_config'],
+                base_datos=None if principal else datos['base_datos'], principal=principal
+            )
+            self.por_clave[clave] = sucursal
+            if not principal:
+                binds[sucursal.bind_key] = sucursal.base_datos
+        self.principal = self.por_clave[CLAVE_PRINCIPAL]
+
+        app.extensions['sucursales'] = self
+        app.before_request(self._seleccionar)
+        app.after_request(self._recordar)
+
+    @property
+    def actual(self):
+        """Sucursal de la petición (o la activada con activar()); la principal por defecto"""
+        if has_app_context():
+            return g.get('sucursal') or self.principal
+        return self.principal
+
+    def activar(self, clave):
+        """Fija la sucursal del contexto de aplicación actual (scripts y tareas)"""
+        g.sucursal = self.por_clave[clave]
+        return g.sucursal
+
+    def _seleccionar(self):
+        clave = request.args.get('sucursal') or request.headers.get('X-Sucursal') or request.cookies.get('sucursal')
+        if clave is None:
+            return None
+        if clave not in self.por_clave:
+            return jsonify({'error': 'Sucursal no encontrada', 'sucursales': list(self.por_clave)}), 404
+        g.sucursal = self.por_clave[clave]
+        return None
+
+    def _recordar(self, response):
+        clave = request.args.get('sucursal')
+        if clave in self.por_clave and request.cookies.get('sucursal') != clave:
+            response.set_cookie('sucursal', clave, max_age=365 * 24 * 3600, samesite='Lax')
+        return response
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Pruebas del archivo del historial por meses (archivo_historial.py) contra una base
+SQLite temporal (conftest.py): el historial archivado se sigue encontrando con /api/buscar.
+
+    python -m pytest test_archivo_historial.py -q
+"""
+
+from datetime import datetime, time
+
+import pytest
+
+from app import app, archivo_historial, db, get_restaurant_now, HistorialReservacion, Mesa, Reservacion
+from archivo_historial import inicio_de_mes
+
+
+def _historial(id, nombre, telefono, fecha):
+    return HistorialReservacion(
+        id=id, reservacion_id_original=id, mesa_id=1, mesa_numero=101, hora_reservacion=time(20, 0),
+        area='terraza', cantidad_personas=2, nombre_reservador=nombre, telefono=telefono,
+        nota='aniversario', fecha_reservacion=fecha, fecha_creacion_original=datetime(2020, 1, 1),
+        fecha_liberacion=datetime(2020, 1, 1), hora_liberacion=time(22, 0)
+    )
+
+
+@pytest.fixture
+def cliente(base_vacia):
+    """Base temporal de conftest.py con las tablas de los modelos"""
+    db.create_all()
+    return base_vacia.test_client()
+
+
+def test_historial_archivado_sigue_en_la_busqueda(cliente):
+    hoy = get_restaurant_now().date()
+    antiguo = inicio_de_mes(hoy, app.config['HISTORIAL_MESES_ACTIVOS'] + 1).replace(day=10)
+    db.session.add_all([
+        _historial(1, 'Zacarías Peñuelas', '662-555-0101', antiguo),
+        _historial(2, 'Zacarías Ochoa', '662-555-0202', hoy)
+    ])
+    db.session.commit()
+
+    movidos = archivo_historial.archivar(HistorialReservacion, hoy)
+    assert movidos == {inicio_de_mes(antiguo): 1}
+    assert db.session.get(HistorialReservacion, 1) is None
+
+    respuesta = cliente.get('/api/buscar?q=penuelas')
+    assert respuesta.status_code == 200
+    resultados = respuesta.get_json()
+    assert [(r['tipo'], r['id'], r['fecha_reservacion']) for r in resultados] == [
+        ('historial', 1, antiguo.isoformat())
+    ]
+
+    # Archivados y activos juntos, también por teléfono
+    ids = {r['id'] for r in cliente.get('/api/buscar?q=zacarias').get_json()}
+    assert ids == {1, 2}
+    assert [r['id'] for r in cliente.get('/api/buscar?q=662-555-0101').get_json()] == [1]
+
+
+def test_archivar_de_nuevo_no_duplica_el_indice(cliente):
+    hoy = get_restaurant_now().date()
+    antiguo = inicio_de_mes(hoy, app.config['HISTORIAL_MESES_ACTIVOS'] + 1)
+    db.session.add(_historial(1, 'Zacarías Peñuelas', None, antiguo))
+    db.session.commit()
+    archivo_historial.archivar(HistorialReservacion, hoy)
+    assert archivo_historial.archivar(HistorialReservacion, hoy) == {}
+
+    assert len(cliente.get('/api/buscar?q=penuelas').get_json()) == 1
+
+
+def test_liberar_despues_de_archivar_no_reutiliza_el_id(cliente):
+    hoy = get_restaurant_now().date()
+    antiguo = inicio_de_mes(hoy, app.config['HISTORIAL_MESES_ACTIVOS'] + 1)
+    db.session.add_all([
+        _historial(1, 'Zacarías Ochoa', None, hoy),
+        _historial(2, 'Zacarías Peñuelas', None, antiguo),
+        Mesa(id=1, numero=101, capacidad=4, ubicacion='terraza'),
+        Reservacion(id=7, mesa_id=1, hora_reservacion=time(20, 0), area='terraza', cantidad_personas=2,
+                    nombre_reservador='Zacarías Valdez', fecha_reservacion=hoy)
+    ])
+    db.session.commit()
+    # Se archiva el de id más alto: SQLite sin AUTOINCREMENT le daría el 2 al siguiente
+    assert archivo_historial.archivar(HistorialReservacion, hoy) == {inicio_de_mes(antiguo): 1}
+
+    respuesta = cliente.post('/api/reservaciones/7/liberar')
+    assert respuesta.status_code == 200, respuesta.get_json()
+    assert respuesta.get_json()['historial']['id'] == 3
+
+    resultados = cliente.get('/api/buscar?q=zacarias').get_json()
+    assert sorted((r['id'], r['nombre_reservador']) for r in resultados) == [
+        (1, 'Zacarías Ochoa'), (2, 'Zacarías Peñuelas'), (3, 'Zacarías Valdez')
+    ]
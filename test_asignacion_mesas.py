@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Pruebas del asignador de mesas (asignacion_mesas.py): mejor ajuste y reacomodo
+de una noche con optimizar().
+
+    python -m pytest test_asignacion_mesas.py -q
+"""
+
+import random
+
+import pytest
+
+from asignacion_mesas import AsignadorMesas
+
+DURACION = 120
+VENTANA = (13 * 60, 23 * 60)
+
+
+def _layout():
+    """Dos áreas en cuadrícula con mesas de 2, 4 y 6 personas"""
+    mesas = []
+    for area, filas in (('interior', 4), ('terraza', 3)):
+        for y in range(filas):
+            for x in range(4):
+                numero = len(mesas) + 101
+                mesas.append({'id': len(mesas) + 1, 'numero': numero, 'capacidad': (2, 4, 4, 6)[x],
+                              'area': area, 'posicion_x': x, 'posicion_y': y})
+    return mesas
+
+
+def _sin_traslapes(asignaciones):
+    """`asignaciones` son (mesas_ids, minuto); ninguna mesa tiene dos reservaciones a menos de DURACION"""
+    por_mesa = {}
+    for mesas_ids, minuto in asignaciones:
+        for mesa_id in mesas_ids:
+            por_mesa.setdefault(mesa_id, []).append(minuto)
+    for inicios in por_mesa.values():
+        inicios.sort()
+        assert all(b - a >= DURACION for a, b in zip(inicios, inicios[1:])), inicios
+
+
+def test_mejor_ajuste():
+    asignador = AsignadorMesas(_layout(), DURACION, VENTANA)
+    assert asignador.mejor(2, 20 * 60, 'interior').capacidad == 2
+    assert asignador.mejor(5, 20 * 60, 'terraza').capacidad == 6
+    # Más personas que cualquier mesa sola: mesas vecinas unidas
+    assert len(asignador.mejor(9, 20 * 60, 'interior').mesas_ids) > 1
+    assert asignador.mejor(2, 20 * 60, 'azotea') is None
+
+
+def test_mejor_respeta_agenda_y_bloqueadas():
+    asignador = AsignadorMesas(_layout(), DURACION, VENTANA)
+    dos_personas = [c for c in asignador.candidatos if c.capacidad == 2 and c.area == 'interior']
+    for candidato in dos_personas[:-1]:
+        asignador.ocupar(candidato.mesas_ids, 19 * 60)
+    libre = dos_personas[-1]
+    assert asignador.mejor(2, 20 * 60, 'interior').mesas_ids == libre.mesas_ids
+    assert asignador.mejor(2, 20 * 60, 'interior', bloqueadas=libre.mesas_ids).capacidad > 2
+    # A DURACION minutos de distancia la mesa vuelve a estar libre
+    assert asignador.mejor(2, 21 * 60, 'interior').capacidad == 2
+
+
+def test_optimizar_mueve_a_la_mesa_justa():
+    asignador = AsignadorMesas(_layout(), DURACION, VENTANA)
+    seis = next(c for c in asignador.candidatos if c.capacidad == 6 and c.area == 'interior')
+    plan = asignador.optimizar([
+        {'id': 1, 'personas': 2, 'minuto': 20 * 60, 'area': 'interior', 'mesas_ids': seis.mesas_ids, 'fija': False}
+    ])
+    assert plan[1].capacidad == 2
+
+
+def test_optimizar_no_mueve_fijas_ni_excedidas():
+    asignador = AsignadorMesas(_layout(), DURACION, VENTANA)
+    seis = next(c for c in asignador.candidatos if c.capacidad == 6 and c.area == 'interior')
+    cuatro = next(c for c in asignador.candidatos if c.capacidad == 4 and c.area == 'terraza')
+    plan = asignador.optimizar([
+        # Ya iniciada en una mesa demasiado grande
+        {'id': 1, 'personas': 2, 'minuto': 19 * 60, 'area': 'interior', 'mesas_ids': seis.mesas_ids, 'fija': True},
+        # Asignada a mano con más personas que asientos (optimizar_reservaciones la marca fija)
+        {'id': 2, 'personas': 7, 'minuto': 20 * 60, 'area': 'terraza', 'mesas_ids': cuatro.mesas_ids, 'fija': True},
+        # Comparte mesa con la 1, que es fija: la que se mueve es esta
+        {'id': 3, 'personas': 2, 'minuto': 20 * 60, 'area': 'interior', 'mesas_ids': seis.mesas_ids, 'fija': False}
+    ])
+    assert set(plan) == {3}
+    assert plan[3].capacidad == 2 and not set(plan[3].mesas_ids) & set(seis.mesas_ids)
+
+
+def _noche(semilla, asignador):
+    """Reservaciones con un acomodo actual válido pero malo (candidato libre al azar), algunas
+    fijas y algunas fijas en una mesa con menos asientos que personas"""
+    azar = random.Random(semilla)
+    plano = asignador.copia_vacia()
+    reservaciones = []
+    for reservacion_id in range(1, 80):
+        personas = azar.choice((1, 2, 2, 3, 4, 5, 6, 8))
+        minuto = azar.randrange(VENTANA[0], VENTANA[1] + 1, 5)
+        area = azar.choice(('interior', 'terraza'))
+        excedida = azar.random() < 0.1
+        libres = [c for c in plano.candidatos if c.area == area
+                  and (c.capacidad < personas if excedida else c.capacidad >= personas)
+                  and all(plano.libre(mesa_id, minuto) for mesa_id in c.mesas_ids)]
+        if not libres:
+            continue
+        candidato = azar.choice(libres)
+        plano.ocupar(candidato.mesas_ids, minuto)
+        reservaciones.append({
+            'id': reservacion_id, 'personas': personas, 'minuto': minuto, 'area': area,
+            'mesas_ids': candidato.mesas_ids, 'fija': excedida or azar.random() < 0.15
+        })
+    return reservaciones
+
+
+@pytest.mark.parametrize('semilla', range(20))
+def test_optimizar_sin_traslapes_y_fijas_en_su_lugar(semilla):
+    asignador = AsignadorMesas(_layout(), DURACION, VENTANA)
+    reservaciones = _noche(semilla, asignador)
+    _sin_traslapes((r['mesas_ids'], r['minuto']) for r in reservaciones)
+
+    plan = asignador.copia_vacia().optimizar(reservaciones)
+
+    fijas = [r for r in reservaciones if r['fija']]
+    assert not {r['id'] for r in fijas} & set(plan)
+    assert set(plan) == {r['id'] for r in reservaciones if not r['fija']}
+    for reservacion in reservaciones:
+        if reservacion['id'] in plan:
+            candidato = plan[reservacion['id']]
+            assert candidato.capacidad >= reservacion['personas']
+            assert candidato.area == reservacion['area']
+    _sin_traslapes(
+        (plan[r['id']].mesas_ids if r['id'] in plan else r['mesas_ids'], r['minuto']) for r in reservaciones
+    )
+
+    antes = sum(asignador.por_mesas[frozenset(r['mesas_ids'])].capacidad - r['personas']
+                for r in reservaciones if r['id'] in plan)
+    despues = sum(plan[r['id']].capacidad - r['personas'] for r in reservaciones if r['id'] in plan)
+    assert despues <= antes
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Pruebas del cache del servidor (cache.py).
+
+El backend Redis se prueba contra REDIS_URL si está definida (p. ej. un
+redis-server local) o contra fakeredis si está instalado; si no, se omite.
+
+    python -m pytest test_cache.py -q
+"""
+
+import os
+import time
+
+import pytest
+
+from cache import CacheLRU, CachePorEspacio, CacheRedis, crear_cache
+
+
+def _cliente_redis():
+    if os.environ.get('REDIS_URL'):
+        redis = pytest.importorskip('redis')
+        return redis.Redis.from_url(os.environ['REDIS_URL'])
+    fakeredis = pytest.importorskip('fakeredis')
+    return fakeredis.FakeRedis()
+
+
+@pytest.fixture(params=['lru', 'redis'])
+def cache(request):
+    if request.param == 'lru':
+        yield CacheLRU(max_entradas=3)
+    else:
+        backend = CacheRedis(_cliente_redis(), prefijo='monaco_test:')
+        backend.limpiar()
+        yield backend
+        backend.limpiar()
+
+
+def test_get_set(cache):
+    assert cache.get('mesas:todas') is None
+    cache.set('mesas:todas', [{'numero': 101, 'estado': 'ocupada'}])
+    assert cache.get('mesas:todas') == [{'numero': 101, 'estado': 'ocupada'}]
+
+
+def test_ttl(cache):
+    cache.set('corta', {'valor': 1}, ttl=1)
+    assert cache.get('corta') == {'valor': 1}
+    time.sleep(1.1)
+    assert cache.get('corta') is None
+
+
+def test_invalidar_por_etiqueta(cache):
+    cache.set('reservaciones:fecha:2025-07-14', [1], tags=('reservaciones', 'reservaciones:2025-07-14'))
+    cache.set('reservaciones:fecha:2025-07-15', [2], tags=('reservaciones', 'reservaciones:2025-07-15'))
+    cache.set('mesas:todas', [3], tags=('mesas',))
+
+    cache.invalidar('reservaciones:2025-07-14')
+    assert cache.get('reservaciones:fecha:2025-07-14') is None
+    assert cache.get('reservaciones:fecha:2025-07-15') == [2]
+
+    cache.invalidar('reservaciones')
+    assert cache.get('reservaciones:fecha:2025-07-15') is None
+    assert cache.get('mesas:todas') == [3]
+
+
+def test_lru_expulsa_la_menos_usada():
+    cache = CacheLRU(max_entradas=2)
+    cache.set('a', 1, tags=('t',))
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    # La etiqueta solo debe seguir apuntando a claves vivas
+    cache.invalidar('t')
+    assert cache.get('a') is None
+
+
+def test_espacios_separados(cache):
+    actual = ['monaco']
+    por_espacio = CachePorEspacio(cache, lambda: actual[0])
+    por_espacio.set('mesas:todas', [1], tags=('mesas',))
+    actual[0] = 'centro'
+    assert por_espacio.get('mesas:todas') is None
+    por_espacio.set('mesas:todas', [2], tags=('mesas',))
+
+    por_espacio.invalidar('mesas')
+    assert por_espacio.get('mesas:todas') is None
+    actual[0] = 'monaco'
+    assert por_espacio.get('mesas:todas') == [1]
+
+
+def test_crear_cache_por_defecto_en_memoria():
+    assert isinstance(crear_cache(None), CacheLRU)
+    assert isinstance(crear_cache('memoria'), CacheLRU)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Pruebas de las franjas de ocupación (franjas_ocupacion.py): libre_exacto coincide con
+AsignadorMesas.libre y las inserciones por fuera de app.py (init_db.py, generador_datos.py)
+dejan el bitmap igual al que sale de las reservaciones (en la base temporal de conftest.py).
+
+    python -m pytest test_franjas_ocupacion.py -q
+"""
+
+import random
+
+import pytest
+
+from app import db, OcupacionMesa, Reservacion
+from asignacion_mesas import AsignadorMesas
+from franjas_ocupacion import (DURACION_RESERVACION, MINUTOS_FRANJA, de_bytes, franjas, libre_exacto,
+                               ocupacion_por_mesa)
+
+
+def test_franjas():
+    assert franjas(0, MINUTOS_FRANJA) == 0b1
+    assert franjas(20 * 60, 120) == ((1 << 8) - 1) << 80
+    # Sin alinear toca una franja más al final
+    assert franjas(20 * 60 + 5, 120) == ((1 << 9) - 1) << 80
+    # Se corta a medianoche
+    assert franjas(23 * 60, 120) == ((1 << 4) - 1) << 92
+
+
+@pytest.mark.parametrize('semilla', range(10))
+@pytest.mark.parametrize('paso', [1, 5, 15])
+def test_libre_exacto_coincide_con_el_asignador(semilla, paso):
+    azar = random.Random(semilla * 100 + paso)
+    mesa = {'id': 1, 'numero': 101, 'capacidad': 4, 'area': 'interior', 'posicion_x': 0, 'posicion_y': 0}
+    asignador = AsignadorMesas([mesa], DURACION_RESERVACION, (0, 24 * 60 - 1))
+    for _ in range(azar.randint(0, 6)):
+        minuto = azar.randrange(0, 24 * 60, paso)
+        if asignador.libre(1, minuto):
+            asignador.ocupar([1], minuto)
+    bits = ocupacion_por_mesa(
+        (('hoy', 1, '', minuto) for minuto in asignador.agenda.get(1, ())), DURACION_RESERVACION
+    ).get(('hoy', 1), 0)
+
+    for minuto in range(0, 24 * 60, paso):
+        libre = libre_exacto(bits, minuto, DURACION_RESERVACION)
+        if minuto % MINUTOS_FRANJA == 0:
+            assert libre is not None
+        if libre is not None:
+            assert libre == asignador.libre(1, minuto), (minuto, asignador.agenda)
+
+
+def _franjas_de_las_reservaciones():
+    filas = db.session.query(
+        Reservacion.fecha_reservacion, Reservacion.mesa_id, Reservacion.mesas_unidas, Reservacion.hora_reservacion
+    )
+    return ocupacion_por_mesa(
+        ((fecha, mesa_id, mesas_unidas, hora.hour * 60 + hora.minute) for fecha, mesa_id, mesas_unidas, hora in filas),
+        DURACION_RESERVACION
+    )
+
+
+def _franjas_guardadas():
+    return {(fecha, mesa_id): de_bytes(datos) for fecha, mesa_id, datos
+            in db.session.query(OcupacionMesa.fecha, OcupacionMesa.mesa_id, OcupacionMesa.franjas)}
+
+
+def test_init_db_llena_las_franjas(base_vacia):
+    from init_db import init_database
+    init_database()
+
+    esperadas = _franjas_de_las_reservaciones()
+    assert esperadas
+    assert _franjas_guardadas() == esperadas
+
+
+def test_generador_de_datos_llena_las_franjas(base_vacia):
+    from generador_datos import generar_datos
+    db.create_all()
+    generar_datos(dias_pasados=2, dias_futuros=3, reservaciones_dia=30)
+
+    esperadas = _franjas_de_las_reservaciones()
+    assert esperadas
+    assert _franjas_guardadas() == esperadas
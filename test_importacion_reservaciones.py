@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la validación de la importación masiva (importacion_reservaciones.py):
+choques dentro del archivo y con las reservaciones existentes, con su número de fila.
+
+    python -m pytest test_importacion_reservaciones.py -q
+"""
+
+from datetime import date
+
+from asignacion_mesas import AsignadorMesas
+from importacion_reservaciones import leer_csv, leer_json, validar_filas
+
+DURACION = 120
+FECHA = date(2030, 5, 17)
+
+MESAS = [
+    {'id': 1, 'numero': 101, 'capacidad': 2, 'area': 'interior', 'posicion_x': 0, 'posicion_y': 0},
+    {'id': 2, 'numero': 102, 'capacidad': 4, 'area': 'interior', 'posicion_x': 1, 'posicion_y': 0},
+    {'id': 3, 'numero': 201, 'capacidad': 4, 'area': 'terraza', 'posicion_x': 0, 'posicion_y': 0}
+]
+
+
+def _asignadores(existentes=()):
+    """asignadores_para() con la agenda existente: (mesa_id, minuto) el día FECHA"""
+    def asignadores_para(fechas):
+        asignadores = {}
+        for fecha in fechas:
+            asignadores[fecha] = AsignadorMesas(MESAS, DURACION, (13 * 60, 23 * 60))
+            if fecha == FECHA:
+                for mesa_id, minuto in existentes:
+                    asignadores[fecha].ocupar([mesa_id], minuto)
+        return asignadores
+    return asignadores_para
+
+
+def _csv(*lineas):
+    return leer_csv('\n'.join(('fecha,hora,personas,nombre,mesa',) + lineas).encode())
+
+
+def test_choque_dentro_del_archivo():
+    filas = _csv(
+        '2030-05-17,20:00,2,Ana,101',
+        '2030-05-17,21:00,2,Beto,101',   # choca con la fila 2
+        '2030-05-17,22:00,2,Carla,101',  # a 120 minutos de Ana: libre
+    )
+    validas, errores = validar_filas(filas, MESAS, _asignadores())
+    assert [fila['fila'] for fila in validas] == [2, 4]
+    assert errores == [{'fila': 3, 'error': 'Ya existe una reservación para la mesa 101 en ese horario'}]
+
+
+def test_choque_con_reservaciones_existentes():
+    filas = _csv(
+        '2030-05-17,19:30,2,Ana,102',    # la existente de las 20:00 en la 102
+        '17/05/2030,18:00,2,Beto,102',   # termina justo cuando empieza la existente
+        '2030-05-18,20:00,2,Carla,102',  # otra fecha
+    )
+    validas, errores = validar_filas(filas, MESAS, _asignadores([(2, 20 * 60)]))
+    assert [fila['fila'] for fila in validas] == [3, 4]
+    assert [error['fila'] for error in errores] == [2]
+
+
+def test_asignacion_automatica_ve_las_filas_anteriores():
+    filas = leer_json([
+        {'fecha': '2030-05-17', 'hora': '20:00', 'personas': 2, 'nombre': 'Ana', 'area': 'interior'},
+        {'fecha': '2030-05-17', 'hora': '20:30', 'personas': 2, 'nombre': 'Beto', 'area': 'interior'},
+        {'fecha': '2030-05-17', 'hora': '21:00', 'personas': 2, 'nombre': 'Carla', 'area': 'interior'}
+    ])
+    validas, errores = validar_filas(filas, MESAS, _asignadores())
+    assert [(fila['fila'], fila['mesa_id']) for fila in validas] == [(1, 1), (2, 2)]
+    assert errores == [{'fila': 3, 'error': 'No hay mesas disponibles para ese grupo en ese horario'}]
+
+
+def test_errores_ordenados_por_fila():
+    filas = _csv(
+        '2030-05-17,20:00,2,Ana,101',
+        '2030-05-17,20:30,2,Beto,101',   # choque (se detecta después de convertir)
+        '2030-05-17,25:00,2,Carla,101',  # hora inválida
+        '2030-05-17,20:00,2,Daniel,999',
+        '2030-05-17,20:00,2,Elena,201',
+    )
+    filas.append((7, {'fecha_reservacion': '2030-05-17', 'hora_reservacion': '20:00',
+                      'cantidad_personas': 2, 'nombre_reservador': 'Fer', 'area': 'azotea'}))
+    validas, errores = validar_filas(filas, MESAS, _asignadores())
+    assert [fila['fila'] for fila in validas] == [2, 6]
+    assert [error['fila'] for error in errores] == [3, 4, 5, 7]
+    assert errores[2]['error'] == 'Mesa 999 no encontrada'
+
+
+def test_mesas_bloqueadas_de_hoy():
+    filas = _csv('2030-05-17,20:00,2,Ana,101', '2030-05-17,20:00,2,Beto,')
+    validas, errores = validar_filas(filas, MESAS, _asignadores(), bloqueadas={FECHA: {1}})
+    assert errores == [{'fila': 2, 'error': 'La mesa 101 está ocupada o ya reservada hoy'}]
+    assert [(fila['fila'], fila['mesa_id']) for fila in validas] == [(3, 2)]